@@ -0,0 +1,433 @@
+# benchmark.py
+# Reproducējams veiktspējas mērījumu komplekts: utils/indicators.py compute_* funkcijas,
+# pilnā feature aprēķināšana (utils/feature_pipeline.py), train_ai_model, train_feedback_model,
+# viena un pakešu predikcija. Fikstūras: sintētiskas sveces (fiksēts seed) 300/1k/10k/100k
+# garumā + ierakstītās biržas sveces no benchmarks/fixtures/*.npy (ja ir).
+# Rezultāti → JSON; salīdzinājums ar saglabāto bāzi, regresija virs sliekšņa → exit code 1.
+#
+#   python benchmark.py                          # visi izmēri, salīdzina ar bāzi (ja tā ir)
+#   python benchmark.py --sizes 300,1000 --only indicators,predict
+#   python benchmark.py --save-baseline          # pašreizējie rezultāti kļūst par bāzi
+#   python benchmark.py --record BTC/USDT --candles 100000
+
+import io
+import os
+import gc
+import sys
+import json
+import time
+import hashlib
+import inspect
+import argparse
+import platform
+import tempfile
+import subprocess
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+import xgboost as xgb
+
+from config import settings
+from modules.ai_trainer import train_ai_model
+from modules.ohlcv_cache import timeframe_ms
+from train_from_labeled import train_feedback_model
+from utils import indicators
+from utils.feature_pipeline import FEATURE_COLUMNS, OHLCV_COLUMNS, build_feature_frame, get_pipeline
+from utils.model_io import load_model, predict_proba
+
+sys.stdout.reconfigure(encoding='utf-8', line_buffering=True)
+
+GROUPS = ("indicators", "features", "train", "predict")
+START_MS = 1704067200000  # 2024-01-01 UTC — sintētisko sveču sākums
+BENCH_SYMBOL = "BENCH/USDT"
+STRATEGIES = ["simple", "aggressive", "revival", "momentum_safe"]
+LABEL_HORIZON = 72  # 6h 5m svecēs (kā label_candidates.py)
+
+
+# === Fikstūras ===
+
+def synthetic_ohlcv(n, seed, timeframe="5m"):
+    """
+    Deterministiskas sveces: log-cena ar mainīgu volatilitāti (AR(1) log-vol) un
+    smagām astēm (Student t), apjoms korelē ar |atdevi|. Tas pats (n, seed) → tie paši dati.
+    """
+    rng = np.random.default_rng([seed, n])
+    log_vol = np.zeros(n)
+    shocks = rng.normal(0.0, 0.15, n)
+    for i in range(1, n):
+        log_vol[i] = 0.98 * log_vol[i - 1] + shocks[i]
+    sigma = 0.006 * np.exp(log_vol)
+    returns = sigma * rng.standard_t(4, n) / np.sqrt(2.0)
+
+    close = 0.5 * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[close[0] / np.exp(returns[0])], close[:-1]])
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0.0, 0.5, n)) * sigma)
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0.0, 0.5, n)) * sigma)
+    volume = rng.lognormal(10.0, 0.6, n) * (1 + np.abs(returns) / sigma)
+    timestamp = START_MS + np.arange(n, dtype=np.float64) * timeframe_ms(timeframe)
+    return np.column_stack([timestamp, open_, high, low, close, volume])
+
+
+def fixture_path(symbol, config):
+    stem = symbol.replace("/", "").replace(":", "")
+    return os.path.join(config["FIXTURE_DIR"], f"{stem}_{config['TIMEFRAME']}.npy")
+
+
+def record_fixture(symbol, candles, config):
+    """⬇️ Lejupielādē pēdējās `candles` sveces (lapās) un saglabā kā .npy fikstūru."""
+    from modules.exchange_factory import get_exchange
+
+    exchange = get_exchange()
+    tf_ms = timeframe_ms(config["TIMEFRAME"])
+    cursor = int(time.time() * 1000) - candles * tf_ms
+    rows = {}
+    while len(rows) < candles:
+        page = exchange.fetch_ohlcv(symbol, timeframe=config["TIMEFRAME"], since=cursor, limit=1000)
+        page = [row for row in page if row[0] >= cursor]
+        if not page:
+            break
+        for row in page:
+            rows[row[0]] = row[:6]
+        cursor = int(page[-1][0]) + tf_ms
+        print(f"   • {len(rows)}/{candles} sveces")
+
+    if not rows:
+        print(f"❌ {symbol}: birža neatgrieza sveces.")
+        return None
+    ohlcv = np.array([rows[ts] for ts in sorted(rows)], dtype=np.float64)[-candles:]
+    path = fixture_path(symbol, config)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, ohlcv)
+    print(f"💾 {symbol}: {len(ohlcv)} sveces → {path}")
+    return path
+
+
+def load_fixtures(sizes, config):
+    """[(nosaukums, ohlcv)]: sintētiskās katram izmēram + ierakstīto .npy pēdējās N sveces."""
+    fixtures = [(f"synthetic@{n}", synthetic_ohlcv(n, config["SEED"], config["TIMEFRAME"])) for n in sizes]
+    if os.path.isdir(config["FIXTURE_DIR"]):
+        for name in sorted(os.listdir(config["FIXTURE_DIR"])):
+            if not name.endswith(".npy"):
+                continue
+            recorded = np.load(os.path.join(config["FIXTURE_DIR"], name))
+            stem = os.path.splitext(name)[0]
+            fixtures += [(f"{stem}@{n}", recorded[-n:]) for n in sizes if len(recorded) >= n]
+    return fixtures
+
+
+def fixture_digest(ohlcv):
+    return hashlib.sha1(np.ascontiguousarray(ohlcv, dtype=np.float64).tobytes()).hexdigest()[:16]
+
+
+def labeled_candidates(ohlcv, seed):
+    """
+    data/labeled_candidates.csv formāta rindas no svecēm: indikatori no feature pipeline,
+    profit_after_6h = close pēc 72 svecēm, label = profit > 0 (kā label_candidates.py).
+    """
+    rng = np.random.default_rng([seed, len(ohlcv), 1])
+    frame = build_feature_frame(ohlcv)
+    close = frame["close"]
+    profit = (close.shift(-LABEL_HORIZON) / close - 1) * 100
+    if len(frame) > LABEL_HORIZON:
+        profit = profit.fillna(profit.iloc[:-LABEL_HORIZON].mean())
+    else:
+        profit = pd.Series(rng.normal(0.0, 2.0, len(frame)))
+    return pd.DataFrame({
+        "timestamp": frame["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S"),
+        "symbol": BENCH_SYMBOL,
+        "price": close,
+        "rsi": frame["rsi"].fillna(50),
+        "macd": frame["macd"],
+        "macd_signal": frame["macd_signal"],
+        "volume": frame["volume"],
+        "avg_volume": frame["volume"].rolling(20, min_periods=1).mean(),
+        "safety_score": frame["safety_score"],
+        "strategy": [STRATEGIES[i % len(STRATEGIES)] for i in range(len(frame))],
+        "ai_confidence": rng.uniform(0.3, 0.9, len(frame)).round(4),
+        "reject_reason": "",
+        "profit_after_6h": profit.round(4),
+        "label": (profit > 0).astype(int)
+    })
+
+
+# === Mērīšana ===
+
+def _timed(fn, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(fn, config):
+    """
+    Mediāna/minimums ms vienam izsaukumam. Pirmais izsaukums — iesildīšana (netiek skaitīts);
+    ātrām funkcijām vienā mērījumā `number` izsaukumi, lēnām — mazāk atkārtojumu
+    (BUDGET_SECONDS, bet ne mazāk par MIN_REPEAT).
+    GC mērījuma laikā izslēgts (kā timeit).
+    """
+    first = _timed(fn, 1)
+    number = 1
+    while first * number < config["MIN_SAMPLE_SECONDS"] and number < 10000:
+        number *= 10
+    affordable = int(config["BUDGET_SECONDS"] // max(first * number, 1e-9))
+    repeat = min(config["REPEAT"], max(config["MIN_REPEAT"], affordable))
+
+    samples = []
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            samples.append(_timed(fn, number) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {"median_ms": round(float(np.median(samples)) * 1000, 4),
+            "min_ms": round(min(samples) * 1000, 4),
+            "runs": repeat, "number": number}
+
+
+@contextmanager
+def _quiet():
+    sink = io.StringIO()
+    with redirect_stdout(sink), redirect_stderr(sink):
+        yield sink
+
+
+@contextmanager
+def _workdir():
+    """Treniņi raksta models/, logs/, data/ relatīvi → pagaidu mape, lai neaiztiktu īstos."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+# === Gadījumi ===
+
+def _indicator_cases(ohlcv):
+    """Katrai utils.indicators compute_* funkcijai argumenti pēc parametru nosaukumiem."""
+    df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+    upper_bb = indicators.compute_bollinger_bands(df["close"])[0]
+    sources = {
+        "series": df["close"], "close_series": df["close"], "close": df["close"],
+        "open_": df["open"], "high": df["high"], "low": df["low"],
+        "volume_series": df["volume"], "df": df, "upper_bb": upper_bb, "span": 50
+    }
+
+    cases = []
+    for name, fn in inspect.getmembers(indicators, inspect.isfunction):
+        if not name.startswith("compute_") or fn.__module__ != indicators.__name__:
+            continue
+        required = [p.name for p in inspect.signature(fn).parameters.values() if p.default is p.empty]
+        if any(param not in sources for param in required):
+            print(f"⚠️ {name}: nezināmi parametri {required} — izlaižam.")
+            continue
+        args = [sources[param] for param in required]
+        cases.append((f"indicators.{name}", lambda fn=fn, args=args: fn(*args)))
+    return cases
+
+
+def _feature_cases(ohlcv):
+    pipeline = get_pipeline()
+    tail = ohlcv[-pipeline.lookback:]
+    return [
+        ("features.build_feature_frame", lambda: build_feature_frame(ohlcv)),
+        ("features.matrix", lambda: pipeline.matrix(ohlcv)),
+        ("features.last_row", lambda: pipeline.last_row(tail))
+    ]
+
+
+def _train_ai(frame, threads):
+    with _quiet(), xgb.config_context(nthread=threads):
+        result = train_ai_model(BENCH_SYMBOL, n_jobs=threads, df=frame.copy())
+    if not result["ok"]:
+        raise RuntimeError(f"train_ai_model neizdevās: {result.get('error')}")
+
+
+def _train_feedback(threads):
+    with _quiet(), xgb.config_context(nthread=threads):
+        train_feedback_model()
+    if not os.path.exists(os.path.join("models", "feedback_model.ubj")):
+        raise RuntimeError("train_feedback_model nesaglabāja modeli")
+
+
+def run_fixture(name, ohlcv, groups, config, results):
+    def record(case, fn):
+        key = f"{name}/{case}"
+        try:
+            results[key] = measure(fn, config)
+            print(f"   • {case:<45} {results[key]['median_ms']:>12.3f} ms  (x{results[key]['runs']})")
+        except Exception as e:
+            results[key] = {"error": f"{type(e).__name__}: {e}"}
+            print(f"   ❌ {case}: {results[key]['error']}")
+
+    if "indicators" in groups:
+        for case, fn in _indicator_cases(ohlcv):
+            record(case, fn)
+    if "features" in groups:
+        for case, fn in _feature_cases(ohlcv):
+            record(case, fn)
+
+    if "train" not in groups and "predict" not in groups:
+        return
+
+    threads = config["XGB_THREADS"]
+    frame = build_feature_frame(ohlcv)
+    with _workdir():
+        os.makedirs("data", exist_ok=True)
+        os.makedirs("models", exist_ok=True)
+        labeled_candidates(ohlcv, config["SEED"]).to_csv(os.path.join("data", "labeled_candidates.csv"), index=False)
+
+        if "train" in groups:
+            record("train.train_ai_model", lambda: _train_ai(frame, threads))
+            record("train.train_feedback_model", lambda: _train_feedback(threads))
+        elif "predict" in groups:
+            _train_ai(frame, threads)
+
+        if "predict" not in groups:
+            return
+        base_path = os.path.join("models", BENCH_SYMBOL.replace("/", "_"))
+        if not os.path.exists(base_path + "_model.ubj"):
+            print("   ⚠️ Nav modeļa predikcijai — izlaižam.")
+            return
+        bundle = load_model(base_path)
+        features = bundle["features"] or FEATURE_COLUMNS
+        pipeline = get_pipeline(features)
+        tail = ohlcv[-pipeline.lookback:]
+        X = frame[features].dropna().to_numpy(dtype=np.float64)
+
+        with xgb.config_context(nthread=threads):
+            record("predict.single", lambda: predict_proba(bundle, pipeline.last_row(tail)[None, :]))
+            record("predict.batch", lambda: predict_proba(bundle, X))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_benchmarks(sizes, groups, config):
+    fixtures = load_fixtures(sizes, config)
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__, "pandas": pd.__version__,
+            "sklearn": sklearn.__version__, "xgboost": xgb.__version__,
+            "xgb_threads": config["XGB_THREADS"], "seed": config["SEED"]
+        },
+        "fixtures": {name: {"rows": len(ohlcv), "sha1": fixture_digest(ohlcv)} for name, ohlcv in fixtures},
+        "results": {}
+    }
+
+    total_start = time.perf_counter()
+    for name, ohlcv in fixtures:
+        print(f"\n📏 {name}")
+        run_fixture(name, ohlcv, groups, config, report["results"])
+    report["meta"]["seconds"] = round(time.perf_counter() - total_start, 1)
+    return report
+
+
+# === Salīdzinājums ar bāzi ===
+
+def compare(report, baseline, threshold, min_delta_ms):
+    """Atgriež regresiju sarakstu; fikstūras ar citu sha1 netiek salīdzinātas."""
+    for field in ("platform", "cpu_count", "xgboost", "numpy", "pandas"):
+        if baseline["meta"].get(field) != report["meta"].get(field):
+            print(f"⚠️ Bāze mērīta citā vidē ({field}: {baseline['meta'].get(field)} → {report['meta'].get(field)})")
+
+    regressions, improved, compared, skipped = [], 0, 0, set()
+    for key, current in report["results"].items():
+        fixture = key.split("/", 1)[0]
+        base = baseline["results"].get(key)
+        if base is None or "median_ms" not in base or "median_ms" not in current:
+            continue
+        if baseline["fixtures"].get(fixture, {}).get("sha1") != report["fixtures"][fixture]["sha1"]:
+            skipped.add(fixture)
+            continue
+
+        compared += 1
+        ratio = current["median_ms"] / max(base["median_ms"], 1e-9)
+        delta = current["median_ms"] - base["median_ms"]
+        if ratio > 1 + threshold and delta > min_delta_ms:
+            regressions.append((key, base["median_ms"], current["median_ms"], ratio))
+        elif ratio < 1 - threshold and -delta > min_delta_ms:
+            improved += 1
+
+    for fixture in sorted(skipped):
+        print(f"⚠️ {fixture}: fikstūra mainījusies kopš bāzes — netiek salīdzināta.")
+    print(f"\n📊 Salīdzināti: {compared} | Ātrāk: {improved} | Regresijas: {len(regressions)} (slieksnis +{threshold:.0%})")
+    for key, base_ms, current_ms, ratio in sorted(regressions, key=lambda r: -r[3]):
+        print(f"   🐢 {key}: {base_ms:.3f} → {current_ms:.3f} ms (x{ratio:.2f})")
+    return regressions
+
+
+def _save_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    config = settings.get_benchmark_settings()
+    parser = argparse.ArgumentParser(description="AI indikatoru / feature / treniņa / predikcijas mērījumi")
+    parser.add_argument("--sizes", help="Fikstūru izmēri, piem. 300,1000 (noklusējums: SIZES)")
+    parser.add_argument("--only", help=f"Grupas: {','.join(GROUPS)}")
+    parser.add_argument("--output", default=config["RESULTS_FILE"])
+    parser.add_argument("--baseline", default=config["BASELINE_FILE"])
+    parser.add_argument("--threshold", type=float, default=config["THRESHOLD"])
+    parser.add_argument("--save-baseline", action="store_true", help="Saglabā rezultātus kā jauno bāzi")
+    parser.add_argument("--record", metavar="SYMBOL", help="Ieraksta biržas sveces fikstūrai un beidz")
+    parser.add_argument("--candles", type=int, default=max(config["SIZES"]))
+    args = parser.parse_args(argv)
+
+    if args.record:
+        return 0 if record_fixture(args.record, args.candles, config) else 1
+
+    sizes = [int(s) for s in args.sizes.split(",")] if args.sizes else config["SIZES"]
+    groups = set(args.only.split(",")) if args.only else set(GROUPS)
+    unknown = groups - set(GROUPS)
+    if unknown:
+        parser.error(f"nezināmas grupas: {sorted(unknown)}")
+
+    report = run_benchmarks(sizes, groups, config)
+    _save_json(args.output, report)
+    print(f"\n💾 Rezultāti: {args.output} ({report['meta']['seconds']}s)")
+
+    errors = [key for key, value in report["results"].items() if "error" in value]
+    if errors:
+        print(f"❌ Kļūdas: {len(errors)} gadījumi nav izmērīti.")
+
+    if args.save_baseline:
+        _save_json(args.baseline, report)
+        print(f"📌 Bāze saglabāta: {args.baseline}")
+        return 1 if errors else 0
+
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️ Nav bāzes ({args.baseline}) — salīdzinājums izlaists. Izveido ar --save-baseline.")
+        return 1 if errors else 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold, config["MIN_DELTA_MS"])
+    return 1 if regressions or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
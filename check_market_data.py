@@ -1,52 +1,43 @@
 import os
 import json
-import pandas as pd
+from utils.feature_pipeline import FEATURE_COLUMNS
+from utils import market_store
+from utils.model_io import model_exists
+from modules.model_registry import model_base_names
 
-DATA_DIR = "data/market_data"
+DATA_DIR = market_store.DATA_DIR
 MODEL_DIR = "models"
 PENDING_FILE = "data/pending_training.json"
 
-REQUIRED_COLUMNS = [
-    'volume', 'EMA_50', 'EMA_200', 'RSI', 'MACD', 'Signal', 'MACD_HIST',
-    'Upper_BB', 'Lower_BB', 'Middle_BB', 'BB_WIDTH', 'ATR', 'MOMENTUM',
-    'RSI_SLOPE', 'safety_score', 'volume_change_3', 'price_above_ema_50',
-    'bollinger_bandwidth', 'trend_angle', 'volume_spike', 'range_position',
-    'candle_body_ratio', 'upper_wick_ratio', 'lower_wick_ratio', 'relative_volume',
-    'proximity_to_upper_bb', 'volatility'
-]
-
-def extract_symbol(file):
-    return file.replace(".csv", "").replace("USDT", "/USDT")
+# Kolonnas, ko raksta collect_and_save / collect_all_data (utils/feature_pipeline.py)
+REQUIRED_COLUMNS = FEATURE_COLUMNS
 
 print("\n🔍 Pārbaudām market_data...\n")
 valid_symbols = []
 problem_files = {}
 
-for file in os.listdir(DATA_DIR):
-    if not file.endswith(".csv"):
-        continue
-
-    path = os.path.join(DATA_DIR, file)
+for symbol in market_store.list_symbols(DATA_DIR):
+    file = symbol
     try:
-        df = pd.read_csv(path)
+        # Tikai faila metadati (kolonnas + rindu skaits), bez datu nolasīšanas
+        info = market_store.inspect(symbol, DATA_DIR)
+        file = os.path.basename(info["path"])
 
-        if df.empty:
+        if info["rows"] == 0:
             problem_files[file] = ["Tukšs fails"]
             continue
 
-        missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        missing = [col for col in REQUIRED_COLUMNS if col not in info["columns"]]
 
         if missing:
             problem_files[file] = missing
             continue
 
-        symbol = extract_symbol(file)
-        model_path = os.path.join(MODEL_DIR, file.replace(".csv", "_model.pkl"))
-        if not os.path.exists(model_path):
+        if not any(model_exists(os.path.join(MODEL_DIR, base)) for base in model_base_names(symbol)):
             valid_symbols.append(symbol)
 
     except Exception as e:
-        problem_files[file] = [f"CSV kļūda: {e}"]
+        problem_files[file] = [f"Lasīšanas kļūda: {e}"]
 
 if valid_symbols:
     with open(PENDING_FILE, "w", encoding="utf-8") as f:
@@ -1,5 +1,11 @@
 import os
 
+# Natīvie (.ubj/.npz) un vecie (.pkl) modeļu faili
+MODEL_FILE_SUFFIXES = (
+    "_model.ubj", "_scaler.npz", "_schema.json",
+    "_model.pkl", "_scaler.pkl", "_features.pkl", "_metrics.json"
+)
+
 def clear_models():
     model_dir = "models"
 
@@ -14,7 +20,7 @@ def clear_models():
         file_path = os.path.join(model_dir, filename)
 
         # ✅ Dzēš modeļu failus pēc paplašinājuma
-        if filename.endswith(("_model.pkl", "_scaler.pkl", "_features.pkl", "_metrics.json")):
+        if filename.endswith(MODEL_FILE_SUFFIXES):
             os.remove(file_path)
             print(f"🗑️ Izdzēsts: {filename}")
             count += 1
@@ -1,7 +1,9 @@
 import os
 import json
+import time
+import threading
 from dotenv import load_dotenv
-from modules.market_sentiment import get_market_sentiment
+from modules.market_sentiment import get_market_sentiment, get_sentiment_fetched_at
 
 load_dotenv()
 
@@ -11,8 +13,21 @@ MEXC_API_SECRET = os.getenv("MEXC_API_SECRET")
 
 # === TEST MODE: State management ===
 STATE_FILE = "config/state.json"
+STATE_CHECK_INTERVAL = 1.0  # Sekundes starp state.json stat() pārbaudēm
 
-def load_state():
+# state.json tiek turēts atmiņā un pārlasīts tikai, ja mainās mtime/inode/izmērs
+_state_cache = {"state": None, "signature": None, "checked_at": 0.0}
+_state_lock = threading.Lock()
+_state_listeners = []
+
+def _state_signature():
+    try:
+        st = os.stat(STATE_FILE)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+def _read_state_file():
     if not os.path.exists(STATE_FILE):
         return {"TEST_MODE": False}
     try:
@@ -21,6 +36,41 @@ def load_state():
     except json.JSONDecodeError:
         print("❌ Kļūda: Bojāts state.json — ielādēts noklusētais režīms.")
         return {"TEST_MODE": False}
+
+def on_state_change(callback):
+    """
+    Reģistrē callback(old_state, new_state), ko izsauc, kad state.json saturs mainās
+    (piem. TEST_MODE pārslēgts no Telegram). Izsauc tajā pavedienā, kas pamanīja izmaiņas.
+    """
+    _state_listeners.append(callback)
+    return callback
+
+def _notify_state_change(old, new):
+    for callback in list(_state_listeners):
+        try:
+            callback(old, new)
+        except Exception as e:
+            print(f"⚠️ State listener kļūda: {e}")
+
+def load_state(force=False):
+    with _state_lock:
+        now = time.monotonic()
+        cached = _state_cache["state"]
+        if not force and cached is not None and now - _state_cache["checked_at"] < STATE_CHECK_INTERVAL:
+            return dict(cached)
+
+        _state_cache["checked_at"] = now
+        signature = _state_signature()
+        if not force and cached is not None and signature == _state_cache["signature"]:
+            return dict(cached)
+
+        state = _read_state_file()
+        _state_cache["state"] = state
+        _state_cache["signature"] = signature
+
+    if cached is not None and state != cached:
+        _notify_state_change(dict(cached), dict(state))
+    return dict(state)
         
 # === LOG saglabāšanas ilgums (stundās) ===
 def get_log_time_window_hours():
@@ -31,13 +81,23 @@ def save_state(state):
         json.dump(state, f, indent=2, ensure_ascii=False)
     print("📝 State saglabāts:", state)
 
+    with _state_lock:
+        cached = _state_cache["state"]
+        _state_cache["state"] = dict(state)
+        _state_cache["signature"] = _state_signature()
+        _state_cache["checked_at"] = time.monotonic()
+
+    if cached is not None and state != cached:
+        _notify_state_change(dict(cached), dict(state))
+
 def is_test_mode():
     return load_state().get("TEST_MODE", False)
     
-def get_market_criteria():
-    sentiment = get_market_sentiment()
+def get_market_criteria(sentiment=None, test_mode=None):
+    if test_mode is None:
+        test_mode = is_test_mode()
 
-    if is_test_mode():
+    if test_mode:
         # Test režīma iestatījumi paliek fiksēti
         return {
             "MIN_MARKET_CAP": 1_000_000,
@@ -48,6 +108,9 @@ def get_market_criteria():
             "MOMENTUM_GAIN_MULTIPLIER": 1.50
         }
     else:
+        if sentiment is None:
+            sentiment = get_market_sentiment()
+
         if sentiment == 'bullish':
             return {
                 "MIN_MARKET_CAP": 3_000_000,
@@ -87,8 +150,11 @@ def market_momentum_gain_multiplier():
 def get_trailing_stop_loss():
     return 0.98 if is_test_mode() else 0.97
 
-def get_trade_limits():
-    if is_test_mode():
+def get_trade_limits(test_mode=None):
+    if test_mode is None:
+        test_mode = is_test_mode()
+
+    if test_mode:
         return {
             "MAX_USDT_BALANCE": 15,
             "MIN_USDT_PER_TRADE": 3,
@@ -99,13 +165,107 @@ def get_trade_limits():
             "MIN_USDT_PER_TRADE": 5,
         }
 
+# === SKENĒŠANAS PARAMETRI (MEXC klines) ===
+def get_scan_settings():
+    return {
+        "CONCURRENT": True,        # False → vecais secīgais režīms
+        "MAX_WORKERS": 8,          # Paralēlie klines pieprasījumi
+        "WEIGHT_BUDGET": 400,      # MEXC svara budžets logā (limits: 500 / 10s)
+        "WEIGHT_WINDOW": 10,       # Loga garums sekundēs
+        "KLINES_WEIGHT": 1,        # /api/v3/klines svars
+        "TICKER_24H_WEIGHT": 40,   # /api/v3/ticker/24hr (visi simboli) svars
+        "PREFILTER_STRICT": False  # True → klines tikai ja last > 24h open
+    }
+
+# === AI MODEĻI ===
+def get_ai_model_settings():
+    return {
+        "USE_GLOBAL_MODEL": True,    # Simboliem bez individuālā modeļa → globālais modelis
+        "GLOBAL_MODEL_NAME": "global"  # models/global_model.ubj (train_global_model.py)
+    }
+
+# === PARALĒLĀ MODEĻU TRENĒŠANA (modules/parallel_trainer.py) ===
+def get_training_settings():
+    cpus = os.cpu_count() or 2
+    return {
+        "WORKERS": max(1, cpus - 1),         # Darba procesi (viens brīvs kodols sistēmai)
+        "XGB_THREADS": 1,                    # XGBoost pavedieni katrā procesā (WORKERS x XGB_THREADS ≈ kodoli)
+        "TIMEOUT": 600,                      # Sekundes vienam simbolam, pēc tam process tiek apturēts
+        "DATA_SOURCE": "local",              # local → data/market_data (bez tīkla) / exchange → MEXC fetch
+        "INCREMENTAL": True,                 # Turpina esošo Booster uz jaunajām rindām (sk. ai_trainer)
+        "INCREMENTAL_ROUNDS": 20,            # Papildu koki vienā inkrementālajā atjaunošanā
+        "MIN_NEW_ROWS": 48,                  # Mazāk jaunu iezīmētu rindu → modelis netiek aiztikts
+        "INCREMENTAL_HOLDOUT": 0.25,         # Pēdējā jauno rindu daļa tikai vērtēšanai (LogLoss pieaug → vecais modelis paliek)
+        "MAX_TREES": 300,                    # Vairāk koku → pilns pārtreniņš (ierobežo inferences laiku)
+        "DRIFT_Z": 2.0,                      # |jaunā vidējā - slīdošā vidējā| / slīdošā std
+        "DRIFT_SHARE": 0.34,                 # Ja tik liela daļa features pārsniedz DRIFT_Z → pilns pārtreniņš
+        "ERROR_LOG": "logs/train_errors.log",
+        "LOG_TAIL_CHARS": 2000               # Cik daudz no simbola izvades ierakstīt kļūdu logā
+    }
+
+# === TIRGUS DATU GLABĀTUVE (utils/market_store.py) ===
+def get_market_store_settings():
+    return {
+        "FORMAT": "feather",            # feather (Arrow IPC, memory-map) / parquet / csv
+        "COMPRESSION": "uncompressed",  # feather: uncompressed / lz4 / zstd; parquet: zstd / snappy / none
+        "MEMORY_MAP": True              # Feather/Parquet lasīšana ar mmap (bez pilnas kopijas atmiņā)
+    }
+
+# === INKREMENTĀLĀ DATU VĀKŠANA (modules/incremental_collector.py) ===
+def get_collection_settings():
+    return {
+        "TIMEFRAME": "5m",
+        "FULL_LIMIT": 1000,                       # Sveces pilnai ielādei (jauns simbols / pārāk liels robs)
+        "PAGE_LIMIT": 1000,                       # Sveces vienā since=... pieprasījumā
+        "MAX_PAGES": 3,                           # Vairāk lapu, lai panāktu → pilna ielāde
+        "MAX_ROWS": 3000,                         # Rindas failā (vecākās tiek nogrieztas)
+        "CONTEXT_ROWS": 1000,                     # Saglabātās sveces pirms jaunajām indikatoru pārrēķinam (≥ EMA 200 horizonts)
+        "HWM_FILE": "data/market_data_hwm.json"   # Pēdējā saglabātā svece + feature shēmas hash katram simbolam
+    }
+
+# === VEIKTSPĒJAS MĒRĪJUMI (benchmark.py) ===
+def get_benchmark_settings():
+    return {
+        "SIZES": [300, 1000, 10000, 100000],          # Fiksturu garums (sveces / iezīmētie kandidāti)
+        "SEED": 42,                                   # Sintētisko fiksturu ģenerators (tie paši dati katrā palaišanā)
+        "TIMEFRAME": "5m",
+        "REPEAT": 7,                                  # Maks. mērījumu skaits vienam gadījumam (mediāna)
+        "MIN_REPEAT": 3,                              # Arī lēnākajiem gadījumiem (100k treniņš)
+        "BUDGET_SECONDS": 2.0,                        # Mazāk atkārtojumu, ja viens mērījums ir lēns
+        "MIN_SAMPLE_SECONDS": 0.01,                   # Ātrās funkcijas tiek izsauktas vairākas reizes vienā mērījumā
+        "XGB_THREADS": 1,                             # Fiksēti pavedieni → salīdzināmi treniņa laiki
+        "THRESHOLD": 0.20,                            # Mediāna lēnāka par bāzi vairāk nekā 20% → regresija
+        "MIN_DELTA_MS": 0.5,                          # Mazākas absolūtās izmaiņas ir troksnis
+        "FIXTURE_DIR": "benchmarks/fixtures",         # Ierakstītās sveces (python benchmark.py --record BTC/USDT)
+        "BASELINE_FILE": "benchmarks/baseline.json",
+        "RESULTS_FILE": "benchmarks/results/latest.json"
+    }
+
+# === AI FILTRA DIAGNOSTIKA (utils/debug_capture.py) ===
+def get_debug_capture_settings():
+    return {
+        "MODE": "sample",                     # off / sample / rejected / accepted / all
+        "SAMPLE_EVERY": 20,                   # Saglabā 1 no N atlasītajiem ierakstiem
+        "DIR": "debug_data",
+        "FILE": "ai_capture.bin",
+        "MAX_FILE_BYTES": 16 * 1024 * 1024,   # Rotācija pēc izmēra
+        "MAX_FILES": 5,                       # ai_capture.bin + 4 rotētie
+        "QUEUE_SIZE": 256                     # Pilnā rindā jauni ieraksti tiek izmesti
+    }
+
+# === KANDIDĀTU NOVĒRTĒŠANAS PIPELINE ===
+def get_pipeline_settings():
+    return {
+        "MAX_WORKERS": 4  # Paralēli novērtēti kandidāti (AI filtrs, volatilitāte, feedback)
+    }
+
 # === CIKLA INTERVALS ===
-def get_check_interval():
-    return 60 if is_test_mode() else 600
+def get_check_interval(test_mode=None):
+    return 60 if (is_test_mode() if test_mode is None else test_mode) else 600
 
 # === AI PROBABILITY THRESHOLD ===
-def get_min_ai_probability():
-    return 0.01 if is_test_mode() else 0.03
+def get_min_ai_probability(test_mode=None):
+    return 0.01 if (is_test_mode() if test_mode is None else test_mode) else 0.03
 
 def get_stop_loss_threshold():
     return 0.04 if is_test_mode() else 0.05
@@ -132,6 +292,40 @@ def trade_min_usdt():
 def trade_max_usdt():
     return get_trade_limits()["MAX_USDT_BALANCE"]
 
+# === Cikla iestatījumu snapshot ===
+def build_settings_snapshot():
+    """
+    📸 Vienreiz cikla sākumā nolasa visus iestatījumus (TEST_MODE, sentiments,
+    tirgus kritēriji, limiti). Snapshot tiek padots skenerim, klasifikatoram un
+    pirkumam, lai ciklā netiktu atkārtoti pieprasīts BTC ticker.
+    """
+    test_mode = is_test_mode()
+    # Test režīmā kritēriji ir fiksēti → BTC ticker netiek pieprasīts
+    sentiment = None if test_mode else get_market_sentiment()
+    market = get_market_criteria(sentiment=sentiment, test_mode=test_mode)
+
+    return {
+        "TEST_MODE": test_mode,
+        "SENTIMENT": sentiment,
+        "MARKET": market,
+        "MOMENTUM_GAIN_MULTIPLIER": market.get("MOMENTUM_GAIN_MULTIPLIER", 1.05),
+        "MIN_SAFETY": 0.01 if test_mode else 0.05,
+        "AI_THRESHOLD": get_min_ai_probability(test_mode),
+        "TRADE_LIMITS": get_trade_limits(test_mode),
+        "CHECK_INTERVAL": get_check_interval(test_mode),
+        "CREATED_AT": time.time(),
+        "SENTIMENT_FETCHED_AT": None if test_mode else get_sentiment_fetched_at()
+    }
+
+def snapshot_age(snapshot):
+    """Atgriež snapshot un tā sentimenta datu vecumu sekundēs."""
+    now = time.time()
+    fetched_at = snapshot.get("SENTIMENT_FETCHED_AT")
+    return {
+        "snapshot": round(now - snapshot["CREATED_AT"], 1),
+        "sentiment": round(now - fetched_at, 1) if fetched_at else None
+    }
+
 # === Debug helper (pēc izvēles) ===
 def debug_settings():
     return {
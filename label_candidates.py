@@ -1,23 +1,17 @@
 # label_candidates.py
 import csv
 import os
-import ccxt
 import sys
 import json
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from modules.exchange_factory import get_exchange
 
 sys.stdout.reconfigure(encoding='utf-8', line_buffering=True)
 sys.stderr.reconfigure(encoding='utf-8', line_buffering=True)
 
 load_dotenv()
 
-exchange = ccxt.mexc({
-    'apiKey': os.getenv("MEXC_API_KEY"),
-    'secret': os.getenv("MEXC_API_SECRET"),
-    'enableRateLimit': True
-})
-
 INPUT_FILE = "data/candidate_tokens.csv"
 OUTPUT_FILE = "data/labeled_candidates.csv"
 PENDING_FILE = "data/pending_training.json"
@@ -28,7 +22,7 @@ FIELDNAMES = [
     "ai_confidence", "reject_reason", "profit_after_6h", "label"
 ]
 
-def label_candidates():
+def label_candidates(exchange):
     labeled = []
     already_labeled = set()
 
@@ -103,5 +97,9 @@ def label_candidates():
     else:
         print("\n❌ Nav neviena, ko labelot.")
 
+def main():
+    # Klients tiek izveidots tikai palaižot skriptu (imports neielādē tirgus)
+    label_candidates(get_exchange())
+
 if __name__ == "__main__":
-    label_candidates()
+    main()
@@ -6,7 +6,7 @@ import joblib
 import pandas as pd
 from dotenv import load_dotenv
 from filelock import FileLock
-import ccxt
+from modules.exchange_factory import get_exchange
 
 sys.stdout.reconfigure(encoding='utf-8', line_buffering=True)
 sys.stderr.reconfigure(encoding='utf-8', line_buffering=True)
@@ -19,14 +19,8 @@ api_secret = os.getenv("MEXC_API_SECRET")
 if not api_key or not api_secret:
     raise ValueError("❌ API atslēgas nav ielādētas! Pārbaudi .env failu.")
 
-exchange = ccxt.mexc({
-    'apiKey': api_key,
-    'secret': api_secret,
-    'enableRateLimit': True
-})
-
 try:
-    exchange.load_markets()
+    exchange = get_exchange()  # Kopīgs klients + tirgi no diska keša
     supported_symbols = list(exchange.symbols)
     print(f"✅ MEXC atbalsta {len(supported_symbols)} simbolus caur API.")
 except Exception as e:
@@ -35,21 +29,20 @@ except Exception as e:
 
 # == Moduļi ==
 from modules.mexc_fetcher import get_hype_tokens
-from modules.token_filter import classify_token
 from modules.price_tracker import track_token
-from modules.symbol_checker import is_symbol_valid
 from modules.collect_and_save import collect_and_save
 from modules.ai_trainer import train_ai_model
-from modules.ai_predictor import ai_filter
-from utils.feedback_predictor import is_feedback_model_positive
+from modules.ai_predictor import prediction_cache, predict_batcher
 from utils.telegram_alerts import send_telegram_message
 from utils.telegram_commands import check_telegram_commands
-from utils.save_candidate import save_candidate
 from utils.data_helpers import prepare_X_for_model
 from utils.file_helpers import load_json, save_json
 from utils.trade_logger import log_trade, log_test_trade
 import config.settings as settings
-from modules.trade_executor import buy_token, calculate_dynamic_budget, estimate_volatility
+from modules.trade_executor import buy_token, calculate_dynamic_budget
+from modules.candidate_pipeline import evaluate_candidates
+from utils.metrics import timed, observe, flush_metrics, format_cycle
+from modules.model_registry import registry as model_registry
 
 print(f"🔧 STARTA STATUSS — TEST_MODE: {settings.is_test_mode()}")
 
@@ -93,106 +86,47 @@ while True:
             "real_buys": 0
         }
 
-        # 🚨 DYNAMISKA TEST_MODE PARBAUDE
-        test_mode = settings.is_test_mode()
+        # 🚨 DYNAMISKA TEST_MODE PARBAUDE + cikla iestatījumu snapshot
+        with timed("cycle.snapshot"):
+            snapshot = settings.build_settings_snapshot()
+        test_mode = snapshot["TEST_MODE"]
         print("\n🔄 Jauns cikls: skenējam hype tokenus...")
         print("🤙 TEST_MODE AKTĪVS!" if test_mode else "📈 LIVE_MODE AKTĪVS!")
 
-        market_params = settings.get_market_criteria()
-        ai_threshold = settings.get_min_ai_probability()
+        age = settings.snapshot_age(snapshot)
+        sentiment_age = f"{age['sentiment']:.0f}s" if age["sentiment"] is not None else "nav"
+        print(f"🧭 Sentiments: {snapshot['SENTIMENT']} (datu vecums: {sentiment_age})")
+
+        market_params = snapshot["MARKET"]
 
-        hype_tokens = get_hype_tokens()
+        with timed("cycle.scan"):
+            hype_tokens = get_hype_tokens(snapshot=snapshot)
 
         if not hype_tokens:
             print("😴 Nav atrasti hype tokeni.")
+            observe("cycle.total", time.time() - start_time)
+            flush_metrics("main", extra=stats)
             check_telegram_commands()
             time.sleep(settings.get_check_interval())
             continue
 
         print(f"🔥 ATRASTI HYPE TOKENI:")
-        for token in hype_tokens:
-            stats["total_hype"] += 1
-            if token.get("revival"):
-                stats["revivals_found"] += 1
-
-            print(f"🔸 {token['symbol']} | 5m: {token['price_change_5m']:.2f}% | Vol: ${token['volume']:.0f}")
-            strategy = classify_token(token)
-            print(f"   → Stratēģija: {strategy}")
-            token["strategy"] = strategy
-
-            if strategy not in ["simple", "aggressive", "revival", "momentum_safe"]:
-                continue
-
-            if strategy in stats["classified"]:
-                stats["classified"][strategy] += 1
-
-            if not is_symbol_valid(token["symbol"], exchange):
-                print(f"❌ Token {token['symbol']} nav validēts kā tirgojams. Izlaižam.")
-                continue
-
-            current_price = float(token.get("last_price") or token.get("price") or 0)
-            if current_price <= 0:
-                print(f"❌ Token {token['symbol']} cenai nav derīgas vērtības (0 vai mazāk).")
-                continue
-
-            skip_ai_filter_strategies = ["aggressive", "revival", "momentum_safe"]
-            if strategy in skip_ai_filter_strategies:
-                print(f"⚠️ Stratēģija '{strategy}' → izlaižam AI filtru priekš {token['symbol']}")
-                if strategy == "aggressive":
-                    confidence = 0.90
-                    safety_score = 0.10
-                elif strategy == "revival":
-                    confidence = 0.85
-                    safety_score = 0.20
-                elif strategy == "momentum_safe":
-                    confidence = 0.87
-                    safety_score = 0.25
-                prediction = 1
-            else:
-                try:
-                    prediction, confidence, safety_score = ai_filter(token, exchange, return_score=True)
-                    if prediction != 1:
-                        stats["ai_rejected"] += 1
-                        print(f"❌ Individuālais AI atmeta {token['symbol']} → prediction: {prediction}")
-                        save_candidate(token, exchange)
-                        continue
-                    stats["ai_accepted"] += 1
-                    print(f"✅ AI confidence {token['symbol']}: {confidence:.2f} | Safety: {safety_score:.2f}")
-                except Exception as e:
-                    print(f"❌ AI filtrēšana neizdevās {token['symbol']}: {e}")
-                    save_candidate(token, exchange)
-                    continue
-
-            volatility = estimate_volatility(token["symbol"], exchange)
-            feedback_input = {
-                "price": current_price,
-                "volatility": volatility,
-                "ai_confidence": confidence,
-                "strategy_simple": 1 if strategy == "simple" else 0,
-                "strategy_aggressive": 1 if strategy == "aggressive" else 0,
-                "strategy_revival": 1 if strategy == "revival" else 0,
-                "strategy_momentum_safe": 1 if strategy == "momentum_safe" else 0
-            }
-
-            feedback_score = is_feedback_model_positive(feedback_input, return_score=True)
-
-            if feedback_score is None:
-                print(f"⚠️ Feedback modelis nav pieejams – izlaižam {token['symbol']}")
-                save_candidate(token, exchange)
-                continue
-
-            print(f"🧠 Feedback score {token['symbol']}: {feedback_score:.3f}")
-            if feedback_score < ai_threshold:
-                stats["feedback_rejected"] += 1
-                print(f"🧠 Feedback AI atmeta {token['symbol']} (score: {feedback_score:.3f})")
-                save_candidate(token, exchange)
-                continue
+        # AI/volatilitātes/feedback posmi partijās (viens izsaukums uz ciklu); pirkumi secīgi
+        pipeline_start = time.perf_counter()
+        for candidate in evaluate_candidates(hype_tokens, exchange, snapshot, stats):
+            token = candidate["token"]
+            strategy = token["strategy"]
+            current_price = candidate["current_price"]
+            confidence = candidate["confidence"]
+            safety_score = candidate["safety_score"]
+            volatility = candidate["volatility"]
+            feedback_score = candidate["feedback_score"]
 
             # 🚨 ATKĀRTOT TEST_MODE PARBAUDI PIRMS PIRKUMA
             if settings.is_test_mode():
                 stats["test_buys"] += 1
                 print(f"🥚 TEST_MODE: simulēts pirkums {token['symbol']}")
-                usdt_amount = calculate_dynamic_budget(token, confidence, safety_score)
+                usdt_amount = calculate_dynamic_budget(token, confidence, safety_score, snapshot=snapshot)
                 amount = round(usdt_amount / current_price, 6)
 
                 log_test_trade({
@@ -219,7 +153,10 @@ while True:
                 save_json(tracked_test_file, tracked)
                 continue
 
-            if buy_token(token, exchange, confidence=confidence, safety_score=safety_score):
+            with timed("cycle.buy"):
+                bought = buy_token(token, exchange, confidence=confidence, safety_score=safety_score, snapshot=snapshot)
+
+            if bought:
                 stats["real_buys"] += 1
                 send_telegram_message(
                     f"🤝 PIRKUMS: {token['symbol']}\n"
@@ -236,8 +173,12 @@ while True:
                     "ai_decision": True
                 })
 
+        observe("cycle.pipeline", time.perf_counter() - pipeline_start)
+
         # == Cikla beigu statistika ==
         duration = int(time.time() - start_time)
+        observe("cycle.total", time.time() - start_time)
+        metrics_record = flush_metrics("main", extra=stats)
         print("\n📊 CIKLA ATSKAITE:")
         print(f"🔍 Atrasti tokeni: {stats['total_hype']} (revival: {stats['revivals_found']})")
         print("🧠 Stratēģiju sadalījums:")
@@ -247,6 +188,23 @@ while True:
         print(f"🧠 Feedback atmesti: {stats['feedback_rejected']}")
         print(f"🥚 Test trades: {stats['test_buys']} | 💰 Reāli pirkumi: {stats['real_buys']}")
         print(f"⏱️ Cikla ilgums: {duration}s")
+        print("⏱️ Posmu laiki:")
+        print(format_cycle(metrics_record))
+        registry_stats = model_registry.stats()
+        print(
+            f"🗃️ Modeļu registry: {registry_stats['entries']} atmiņā | hit: {registry_stats['hits']} | "
+            f"miss: {registry_stats['misses']} | nav modeļa: {registry_stats['known_missing']}"
+        )
+        cache_stats = prediction_cache.stats()
+        print(
+            f"🔮 AI prognožu kešs: {cache_stats['entries']} ieraksti | hit: {cache_stats['hits']} | "
+            f"miss: {cache_stats['misses']}"
+        )
+        batch_stats = predict_batcher.stats()
+        print(
+            f"📦 AI predict partijas: {batch_stats['calls']} izsaukumi | {batch_stats['rows']} rindas | "
+            f"vid. partija: {batch_stats['avg_batch']}"
+        )
 
         check_telegram_commands()
         interval = settings.get_check_interval()
@@ -254,6 +212,8 @@ while True:
         time.sleep(interval)
 
     except Exception as main_error:
+        observe("cycle.total", time.time() - start_time)
+        flush_metrics("main", extra={"error": str(main_error)})
         send_telegram_message(f"❌ Kļūda galvenajā ciklā: {main_error}")
         print(f"❌ Kļūda galvenajā ciklā: {main_error}")
         time.sleep(60)
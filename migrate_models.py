@@ -0,0 +1,82 @@
+# migrate_models.py
+# Konvertē vecos models/*_model.pkl (+ _scaler.pkl, _features.pkl) uz natīvo
+# XGBoost formātu (_model.ubj + _scaler.npz) un pārbauda, ka prognozes sakrīt.
+#
+#   python migrate_models.py            → konvertē, .pkl atstāj
+#   python migrate_models.py --delete   → konvertē un izdzēš .pkl pēc veiksmīgas pārbaudes
+
+import os
+import sys
+import joblib
+import numpy as np
+import pandas as pd
+from utils.model_io import LEGACY_SUFFIXES, legacy_paths, native_paths, save_model, load_model, predict_proba
+
+sys.stdout.reconfigure(encoding='utf-8', line_buffering=True)
+
+MODEL_DIR = "models"
+CHECK_ROWS = 64  # Nejaušas rindas prognožu salīdzināšanai
+
+
+def migrate(base_path, delete=False):
+    paths = legacy_paths(base_path)
+    if not all(os.path.exists(p) for p in paths.values()):
+        print(f"⚠️ Nepilns komplekts, izlaižam: {base_path}")
+        return False
+
+    model = joblib.load(paths["model"])
+    scaler = joblib.load(paths["scaler"])
+    features = list(joblib.load(paths["features"]))
+
+    save_model(base_path, model, scaler, features)
+
+    # === Pārbaude: sklearn pkl ceļš vs natīvais Booster
+    rng = np.random.default_rng(42)
+    X = rng.normal(scaler.mean_, scaler.scale_, size=(CHECK_ROWS, len(features)))
+    X_check = pd.DataFrame(X, columns=features) if hasattr(scaler, "feature_names_in_") else X
+    expected = model.predict_proba(scaler.transform(X_check))[:, 1]
+    actual = predict_proba(load_model(base_path), X)
+
+    if not np.allclose(expected, actual, atol=1e-5):
+        print(f"❌ Prognozes nesakrīt, natīvie faili izdzēsti: {base_path}")
+        for p in native_paths(base_path).values():
+            os.remove(p)
+        return False
+
+    if delete:
+        for p in paths.values():
+            os.remove(p)
+
+    print(f"✅ {os.path.basename(base_path)} → .ubj/.npz{' (pkl izdzēsti)' if delete else ''}")
+    return True
+
+
+def main():
+    delete = "--delete" in sys.argv
+    if not os.path.exists(MODEL_DIR):
+        print(f"❌ Mape {MODEL_DIR} neeksistē.")
+        return
+
+    suffix = LEGACY_SUFFIXES["model"]
+    bases = sorted(
+        os.path.join(MODEL_DIR, name[:-len(suffix)])
+        for name in os.listdir(MODEL_DIR) if name.endswith(suffix)
+    )
+    print(f"🔁 Atrasti {len(bases)} .pkl modeļi konvertēšanai...\n")
+
+    migrated = failed = 0
+    for base_path in bases:
+        try:
+            if migrate(base_path, delete=delete):
+                migrated += 1
+            else:
+                failed += 1
+        except Exception as e:
+            failed += 1
+            print(f"❌ Kļūda konvertējot {base_path}: {e}")
+
+    print(f"\n🌟 Gatavs! Konvertēti: {migrated} | Neizdevās: {failed}")
+
+
+if __name__ == "__main__":
+    main()
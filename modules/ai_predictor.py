@@ -1,106 +1,144 @@
-import os
-import joblib
-import pandas as pd
+import numpy as np
 from config import settings
-from utils.indicators import (
-    compute_rsi,
-    compute_macd,
-    compute_bollinger_bands,
-    compute_atr,
-    compute_volume_change,
-    compute_price_above_ema,
-    compute_bollinger_bandwidth,
-    compute_trend_angle,
-    compute_volume_spike,
-    compute_range_position,
-    compute_candle_body_ratio,
-    compute_upper_wick_ratio,
-    compute_lower_wick_ratio,
-    compute_relative_volume,
-    compute_proximity_to_upper_bb,
-    compute_rsi_slope,
-    compute_volatility
-)
+from modules.ohlcv_cache import get_ohlcv
+from modules.model_registry import get_model_bundle
+from modules.prediction_cache import PredictionCache, last_closed_candle_ts
+from modules.predict_batcher import PredictBatcher
+from utils.metrics import timed
+from utils.feature_pipeline import get_pipeline
+from utils.debug_capture import capture_ai_decision
+from utils.model_io import predict_proba
 
 MODELS_DIR = "models"
+AI_TIMEFRAME = "5m"
 
-def ai_filter(token, exchange, return_score=False):
-    symbol = token["symbol"]
-    base_name = symbol.replace("/", "_")
-    model_path = os.path.join(MODELS_DIR, f"{base_name}_model.pkl")
-    scaler_path = os.path.join(MODELS_DIR, f"{base_name}_scaler.pkl")
-    features_path = os.path.join(MODELS_DIR, f"{base_name}_features.pkl")
+# Prognoze atkarīga tikai no (simbols, modeļa versija, pēdējā aizvērtā svece)
+prediction_cache = PredictionCache(AI_TIMEFRAME)
 
-    if not all(os.path.exists(p) for p in [model_path, scaler_path, features_path]):
-        print(f"❌ Trūkst AI faili priekš {symbol}.")
-        return False if not return_score else (0, 0, 0)
+# Vienlaicīgi straumētu tokenu prognozes tam pašam modelim → viens inplace_predict
+predict_batcher = PredictBatcher(lambda bundle, rows: predict_proba(bundle, np.vstack(rows)))
 
+def _model_key(bundle):
+    return bundle["base_name"], bundle["version"]
+
+def _feature_row(token, exchange, bundle, candle_ts):
+    """
+    1. posms vienam tokenam: pēdējās derīgās aizvērtās sveces feature vektors.
+    Atgriež (bundle, row, safety_score, ohlcv) vai None, ja datu nav.
+    """
+    symbol = token["symbol"]
+    features = bundle["features"]
+
+    # === Tikai modeļa features (+ safety_score), kanoniskās definīcijas
+    columns = list(dict.fromkeys(list(features) + ["safety_score"]))
+    pipeline = get_pipeline(columns)
+
+    # === OHLCV ielāde (no kopīgā keša): tikai tik sveču, cik prasa garākā feature
+    # (+1 neaizvērtajai svecei, kuru izmetam — prognoze nemainās sveces laikā)
+    with timed("ai.ohlcv"):
+        ohlcv = get_ohlcv(exchange, symbol, timeframe=AI_TIMEFRAME, limit=pipeline.lookback + 1)
+        ohlcv = ohlcv[ohlcv[:, 0] <= candle_ts]
+
+    if len(ohlcv) == 0:
+        print(f"⚠️ Nav aizvērtu sveču: {symbol}")
+        return None
+
+    # === Tikai pēdējā rinda (tail logi, nevis visa matrica)
+    n_features = len(features)
+    with timed("ai.features"):
+        latest = pipeline.last_row(ohlcv)
+
+        # Reti: NaN pēdējā rindā (piem. 0 volume) → pēdējā derīgā rinda, kā iepriekš ar dropna
+        if np.isnan(latest[:n_features]).any():
+            X = pipeline.matrix(ohlcv)
+            valid = np.flatnonzero(~np.isnan(X[:, :n_features]).any(axis=1))
+            if len(valid) == 0:
+                print(f"⚠️ Nav derīgu datu rindu pēc NaN izmešanas: {symbol}")
+                return None
+            latest = X[valid[-1]]
+
+    safety_score = latest[columns.index("safety_score")]
+    return bundle, latest[:n_features], float(0.5 if np.isnan(safety_score) else safety_score), ohlcv
+
+def _resolve_bundle(token, candle_ts, threshold):
+    """
+    Modelis no atmiņas registry (LRU + mtime) + prognožu keša pārbaude.
+    Atgriež (bundle, cached): bundle None → nav modeļa; cached → rezultāts no keša.
+    """
+    symbol = token["symbol"]
     try:
-        # === Ielādē modeļus un feature sarakstu
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
-        features = joblib.load(features_path)
-
-        # === OHLCV ielāde
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe="5m", limit=300)
-        df = pd.DataFrame(ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"])
-
-        # === Indikatoru aprēķins (nepieciešams visiem, bet izmantosim tikai atlasītos)
-        df["ema_50"] = df["close"].ewm(span=50).mean()
-        df["ema_200"] = df["close"].ewm(span=200).mean()
-        df["rsi"] = compute_rsi(df["close"])
-        df["macd"], df["macd_signal"] = compute_macd(df["close"])
-        df["bollinger_upper"], df["bollinger_lower"], df["bollinger_middle"] = compute_bollinger_bands(df["close"])
-        df["atr"] = compute_atr(df)
-        df["macd_hist"] = df["macd"] - df["macd_signal"]
-        df["bb_width"] = df["bollinger_upper"] - df["bollinger_lower"]
-        df["momentum"] = df["close"].diff()
-        df["rsi_slope"] = compute_rsi_slope(df["close"])
-        df["volume_change_3"] = compute_volume_change(df["volume"], period=3)
-        df["price_above_ema_50"] = compute_price_above_ema(df["close"], ema_period=50)
-        df["bollinger_bandwidth"] = compute_bollinger_bandwidth(df["close"])
-        df["trend_angle"] = compute_trend_angle(df["ema_50"])
-        df["volume_spike"] = compute_volume_spike(df["volume"])
-        df["range_position"] = compute_range_position(df["close"], df["high"], df["low"])
-        df["candle_body_ratio"] = compute_candle_body_ratio(df["open"], df["close"], df["high"], df["low"])
-        df["upper_wick_ratio"] = compute_upper_wick_ratio(df["open"], df["close"], df["high"])
-        df["lower_wick_ratio"] = compute_lower_wick_ratio(df["open"], df["close"], df["low"])
-        df["relative_volume"] = compute_relative_volume(df["volume"])
-        df["proximity_to_bollinger_upper"] = compute_proximity_to_upper_bb(df["close"], df["bollinger_upper"])
-        df["volatility"] = compute_volatility(df["close"]).clip(upper=0.2)
-        df["market_cap_proxy"] = df["volume"] * df["close"]
-        df["safety_score"] = (df["volume"] / df["market_cap_proxy"]).clip(upper=1.0)
-
-        # === Debug backup
-        os.makedirs("debug_data", exist_ok=True)
-        df.to_csv(f"debug_data/{symbol.replace('/', '_')}_raw.csv", index=False)
-
-        # === Drop NaNs
-        df.dropna(subset=features, inplace=True)
-
-        if df.empty:
-            print(f"⚠️ Nav derīgu datu rindu pēc NaN izmešanas: {symbol}")
-            return False if not return_score else (0, 0, 0)
-
-        # === Pēdējā rinda
-        latest = df.iloc[-1]
-        X = pd.DataFrame([latest[features]])
-        X_scaled = scaler.transform(X)
-
-        # === Prognoze
-        prediction = model.predict(X_scaled)[0]
-        confidence = model.predict_proba(X_scaled)[0][1]
-        safety_score = latest.get("safety_score", 0.5)
-
-        print(f"🤖 AI {symbol}: pred = {prediction} | confidence = {confidence:.2f} | safety = {safety_score:.2f}")
-
-        passed = prediction == 1 and confidence >= settings.get_min_ai_probability()
-
-        if not passed:
-            print(f"⚠️ AI atmeta {symbol} | confidence = {confidence:.2f}")
+        with timed("ai.model_load"):
+            bundle = get_model_bundle(symbol)
+    except Exception as e:
+        print(f"⚠️ Kļūda AI filtrā {symbol}: {e}")
+        return None, None
 
-        return passed if not return_score else (prediction, confidence, safety_score)
+    if bundle is None:
+        print(f"❌ Trūkst AI faili priekš {symbol}.")
+        return None, None
 
+    cached = prediction_cache.get(symbol, _model_key(bundle), candle_ts)
+    if cached is not None:
+        prediction, confidence, safety_score = cached
+        print(f"🤖 AI {symbol} (kešs): pred = {prediction} | confidence = {confidence:.2f} | safety = {safety_score:.2f}")
+        if not (prediction == 1 and confidence >= threshold):
+            print(f"⚠️ AI atmeta {symbol} | confidence = {confidence:.2f}")
+    return bundle, cached
+
+def _decide(symbol, bundle, candle_ts, threshold, item, confidence):
+    """Lēmums no prognozes: izvade, prognožu kešs un diagnostikas ieraksts."""
+    _, row, safety_score, ohlcv = item
+    prediction = int(confidence > 0.5)
+    print(f"🤖 AI {symbol}: pred = {prediction} | confidence = {confidence:.2f} | safety = {safety_score:.2f}")
+    passed = prediction == 1 and confidence >= threshold
+    if not passed:
+        print(f"⚠️ AI atmeta {symbol} | confidence = {confidence:.2f}")
+    result = (prediction, float(confidence), safety_score)
+    # Kešā tikai, ja dati jau satur pulksteņa aprēķināto sveci (biržas aizkave vai
+    # novecojis OHLCV kešs → prognoze no vecākas sveces nedrīkst palikt visu sveci)
+    if int(ohlcv[-1, 0]) == candle_ts:
+        prediction_cache.put(symbol, _model_key(bundle), candle_ts, result)
+
+    # === Diagnostika: atlasīti ieraksti fona rakstītājam (bez diska I/O šeit)
+    capture_ai_decision(symbol, "accepted" if passed else "rejected",
+                        ohlcv, bundle["features"], row, confidence)
+    return result
+
+def _safe_row(token, exchange, bundle, candle_ts):
+    try:
+        return _feature_row(token, exchange, bundle, candle_ts)
     except Exception as e:
-        print(f"⚠️ Kļūda AI filtrā {symbol}: {e}")
-        return False if not return_score else (0, 0, 0)
+        print(f"⚠️ Kļūda AI filtrā {token['symbol']}: {e}")
+        return None
+
+def ai_filter(token, exchange, return_score=False, snapshot=None, batcher=None):
+    """
+    Viens tokens. batcher (PredictBatcher) → predict tiek apvienots ar citu pavedienu
+    vienlaicīgajiem pieprasījumiem tam pašam modelim, bet tokens negaida pārējo cikla
+    tokenu features/I/O (straumēšana modules/candidate_pipeline.py).
+    """
+    symbol = token["symbol"]
+    threshold = snapshot["AI_THRESHOLD"] if snapshot else settings.get_min_ai_probability()
+    candle_ts = last_closed_candle_ts(AI_TIMEFRAME)
+
+    score = (0, 0, 0)
+    bundle, cached = _resolve_bundle(token, candle_ts, threshold)
+    if cached is not None:
+        score = cached
+    elif bundle is not None:
+        item = _safe_row(token, exchange, bundle, candle_ts)
+        if item is not None:
+            try:
+                with timed("ai.predict"):
+                    if batcher is not None:
+                        confidence = batcher.predict(_model_key(bundle), bundle, item[1])
+                    else:
+                        confidence = predict_proba(bundle, item[1][None, :])[0]
+                score = _decide(symbol, bundle, candle_ts, threshold, item, confidence)
+            except Exception as e:
+                print(f"⚠️ Kļūda AI filtrā {symbol}: {e}")
+
+    if return_score:
+        return score
+    prediction, confidence, _ = score
+    return prediction == 1 and confidence >= threshold
@@ -1,76 +1,262 @@
 import os
 import json
-import joblib
+import time
+from datetime import datetime, timezone
 import xgboost as xgb
 import pandas as pd
 import numpy as np
+from filelock import FileLock
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
-from utils.indicators import (
-    compute_rsi, compute_macd, compute_bollinger_bands, compute_atr,
-    compute_volume_change, compute_price_above_ema, compute_bollinger_bandwidth,
-    compute_trend_angle, compute_volume_spike, compute_range_position,
-    compute_candle_body_ratio, compute_upper_wick_ratio, compute_lower_wick_ratio,
-    compute_relative_volume, compute_proximity_to_upper_bb, compute_rsi_slope
-)
-
-def train_ai_model(symbol, exchange):
+from utils.feature_pipeline import (FEATURE_COLUMNS, OHLCV_COLUMNS, LABEL_VERSION, breakout_target,
+                                    build_feature_frame, save_schema)
+from utils.model_io import save_model, load_model
+from utils import market_store
+from config import settings
+
+MARKET_DATA_DIR = market_store.DATA_DIR
+HISTORY_FILE = "logs/train_history.jsonl"
+EPS = 1e-12
+
+# Kopīgie XGBoost parametri pilnajam treniņam un inkrementālajai atjaunošanai
+XGB_PARAMS = {
+    "max_depth": 5,
+    "learning_rate": 0.05,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "random_state": 42
+}
+
+def load_market_data(symbol, data_dir=MARKET_DATA_DIR, columns=None):
+    """Lokālie tirgus dati (collect_all_data.py / collect_and_save.py) vai None."""
+    df = market_store.read_frame(symbol, columns=columns, data_dir=data_dir)
+    return None if df is None or df.empty else df
+
+def _training_frame(symbol, exchange, df, data_dir, features):
+    """
+    Datu avots treniņam (prioritātes secībā):
+        df        → jau ielādēts DataFrame ar OHLCV kolonnām
+        data_dir  → lokālais data/market_data fails, bez tīkla pieprasījumiem
+        exchange  → 1000 sveces no MEXC (vecais ceļš)
+    Features vienmēr tiek pārrēķinātas no OHLCV ar build_feature_frame — failos saglabātās
+    kolonnas var būt no vecākām formulām vai float32 (tad treniņš ≠ inferencei).
+    """
+    if df is None and data_dir is not None:
+        # Tikai OHLCV kolonnas (kolonnu formātā pārējās netiek nolasītas)
+        available = market_store.inspect(symbol, data_dir)
+        if available is None:
+            raise ValueError(f"❌ Nav lokālo datu: {symbol} ({data_dir})")
+        missing = [col for col in OHLCV_COLUMNS if col not in available["columns"]]
+        if missing:
+            raise ValueError(f"❌ Datos trūkst OHLCV kolonnu: {missing} ({available['path']})")
+        df = load_market_data(symbol, data_dir, columns=list(OHLCV_COLUMNS))
+        if df is None:
+            raise ValueError(f"❌ Tukši lokālie dati: {available['path']}")
+
+    if df is not None:
+        missing = [col for col in OHLCV_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"❌ Datos trūkst OHLCV kolonnu: {missing}")
+        ohlcv = df[OHLCV_COLUMNS].astype({col: np.float64 for col in OHLCV_COLUMNS[1:]})
+        ohlcv["timestamp"] = market_store.timestamps_ms(ohlcv["timestamp"])  # CSV: teksts/datetime
+        return build_feature_frame(ohlcv.reset_index(drop=True), features)
+
+    if exchange is None:
+        raise ValueError("❌ Nav datu avota: jānorāda df, data_dir vai exchange.")
+
+    ohlcv = exchange.fetch_ohlcv(symbol, timeframe='5m', limit=1000)
+    return build_feature_frame(ohlcv, features)
+
+# === Slīdošā statistika (inkrementālajam treniņam) ===
+
+def _batch_stats(X):
+    return {"count": float(len(X)), "mean": X.mean(axis=0), "var": X.var(axis=0)}
+
+def _merge_stats(a, b):
+    """Divu kopu (count, mean, var) apvienošana bez neapstrādāto datu glabāšanas (Chan et al.)."""
+    count = a["count"] + b["count"]
+    delta = b["mean"] - a["mean"]
+    mean = a["mean"] + delta * b["count"] / count
+    m2 = a["var"] * a["count"] + b["var"] * b["count"] + delta ** 2 * a["count"] * b["count"] / count
+    return {"count": count, "mean": mean, "var": m2 / count}
+
+def _drift_share(stats, X, z_limit):
+    """Daļa features, kuru jaunā vidējā atšķiras no slīdošās vairāk par z_limit std."""
+    std = np.sqrt(np.maximum(stats["var"], EPS))
+    z = np.abs(X.mean(axis=0) - stats["mean"]) / std
+    return float((z > z_limit).mean())
+
+def _labelled_until(df):
+    """Pēdējās rindas timestamp, kurai ir pilns nākotnes logs (target nav minējums)."""
+    labelled = df.loc[df['future_max'].notna(), 'timestamp']
+    return int(market_store.timestamps_ms(labelled).max()) if len(labelled) else None
+
+def _load_metrics(base_path):
+    try:
+        with open(base_path + "_metrics.json", "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def _record_history(entry):
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    entry = dict(entry, at=datetime.now(timezone.utc).isoformat())
+    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def _incremental_update(symbol, df, features, base_path, n_jobs, config):
+    """
+    Turpina esošo Booster (+INCREMENTAL_ROUNDS koki) tikai uz rindām, kas iezīmētas pēc
+    iepriekšējā treniņa. Scaler (mean/scale) paliek nemainīgs — koku sliekšņi ir tā
+    skalā; slīdošā statistika tiek atjaunota un kalpo drift noteikšanai.
+    Pēdējā INCREMENTAL_HOLDOUT daļa jauno rindu netiek boostēta: ja LogLoss uz tām
+    pēc atjauninājuma pieaug, modelis paliek nemainīts (mode "rejected").
+    Atgriež rezultāta dict (mode incremental / skip / rejected) vai iemeslu (str) → pilns pārtreniņš.
+    """
+    bundle = load_model(base_path)
+    state = _load_metrics(base_path)
+    if bundle is None or bundle["format"] != "native":
+        return "nav natīvā bāzes modeļa"
+    if bundle["features"] != features or bundle["stats"] is None or not state.get("labelled_until"):
+        return "bāzes modelim nav inkrementālā stāvokļa"
+    if state.get("label_version") != LABEL_VERSION:
+        return "mainīta mērķa (label) definīcija"
+
+    booster = bundle["booster"]
+    trees = booster.num_boosted_rounds()
+    if trees + config["INCREMENTAL_ROUNDS"] > config["MAX_TREES"]:
+        return f"sasniegts koku limits ({trees})"
+
+    labelled = df[df['future_max'].notna()].dropna(subset=features)
+    new = labelled[market_store.timestamps_ms(labelled['timestamp']) > state["labelled_until"]]
+
+    if len(new) < config["MIN_NEW_ROWS"]:
+        print(f"⏭️ {symbol}: tikai {len(new)} jaunas iezīmētas rindas — modelis netiek mainīts.")
+        return {"mode": "skip", "new_rows": int(len(new)), "trees": trees}
+
+    X = new[features].to_numpy(dtype=np.float64)
+    y = new['target'].to_numpy(dtype=int)
+
+    share = _drift_share(bundle["stats"], X, config["DRIFT_Z"])
+    if share > config["DRIFT_SHARE"]:
+        return f"drift: {share:.0%} features ārpus {config['DRIFT_Z']} std"
+
+    X_scaled = np.nan_to_num(((X - bundle["mean"]) / bundle["scale"]).astype(np.float32),
+                             nan=0.0, posinf=0.0, neginf=0.0)
+
+    # Hronoloģiska pēdējo jauno rindu daļa → vērtēšanai (netiek izmantota boostingā)
+    holdout = max(1, int(len(new) * config["INCREMENTAL_HOLDOUT"]))
+    X_fit, y_fit = X_scaled[:-holdout], y[:-holdout]
+    X_eval, y_eval = X_scaled[-holdout:], y[-holdout:]
+    loss_before = log_loss(y_eval, booster.inplace_predict(X_eval), labels=[0, 1])
+
+    params = {
+        "objective": "binary:logistic",
+        "eval_metric": "logloss",
+        "eta": XGB_PARAMS["learning_rate"],
+        "max_depth": XGB_PARAMS["max_depth"],
+        "subsample": XGB_PARAMS["subsample"],
+        "colsample_bytree": XGB_PARAMS["colsample_bytree"],
+        "seed": XGB_PARAMS["random_state"]
+    }
+    if n_jobs:
+        params["nthread"] = n_jobs
+
+    fit_start = time.perf_counter()
+    updated = xgb.train(params, xgb.DMatrix(X_fit, label=y_fit),
+                        num_boost_round=config["INCREMENTAL_ROUNDS"], xgb_model=booster.copy())
+    fit_seconds = time.perf_counter() - fit_start
+
+    loss_after = log_loss(y_eval, updated.inplace_predict(X_eval), labels=[0, 1])
+    evaluation = {
+        "new_rows": int(len(new)),
+        "holdout_rows": int(holdout),
+        "drift_share": round(share, 4),
+        "holdout_log_loss_before": round(loss_before, 4),
+        "holdout_log_loss_after": round(loss_after, 4),
+        "fit_seconds": round(fit_seconds, 3)
+    }
+
+    if loss_after > loss_before:
+        # Atjauninājums pasliktina prognozes uz neredzētām rindām → paliek vecais Booster
+        print(f"↩️ {symbol}: inkrementālais atjauninājums noraidīts | "
+              f"LogLoss atliktajās rindās: {loss_before:.4f} → {loss_after:.4f}")
+        return dict(evaluation, mode="rejected", trees=trees)
+
+    stats = _merge_stats(bundle["stats"], _batch_stats(X))
+    save_model(base_path, updated, bundle, features, stats=stats)
+
+    # Pilnā treniņa metrikas attiecas uz iepriekšējo modeli → tikai sadaļā last_full
+    last_full = state.get("last_full") or {
+        key: state.get(key) for key in ("accuracy", "log_loss", "roc_auc", "samples",
+                                        "positive_ratio", "full_reason", "labelled_until")
+    }
+    metrics = dict(
+        evaluation,
+        symbol=symbol,
+        mode="incremental",
+        trees=updated.num_boosted_rounds(),
+        samples_seen=int(stats["count"]),
+        labelled_until=_labelled_until(df),
+        label_version=LABEL_VERSION,
+        last_full=last_full
+    )
+    print(f"🔁 Inkrementāli: +{len(y_fit)} rindas, {metrics['trees']} koki | "
+          f"LogLoss atliktajās rindās ({holdout}): {loss_before:.4f} → {loss_after:.4f}")
+    return metrics
+
+def train_ai_model(symbol, exchange=None, n_jobs=None, df=None, data_dir=None, incremental=False):
+    """
+    n_jobs: XGBoost pavedienu skaits (None → XGBoost noklusējums; paralēlajā
+    trenēšanā modules/parallel_trainer.py to ierobežo katram procesam).
+    df / data_dir: lokāls datu avots — sk. _training_frame().
+    incremental: turpina esošo modeli uz jaunajām rindām (sk. _incremental_update());
+    ja tas nav iespējams vai konstatēts drift — pilns pārtreniņš.
+
+    Vienmēr atgriež rezultāta dict: {"symbol", "ok", "mode", "seconds", ...}
+        mode full / incremental / skip / rejected → ok=True (+ attiecīgās metrikas)
+        mode failed → ok=False, "error" (izņēmuma gadījumā simbols pievienots pending_training.json)
+    """
     print(f"\n📊 Trenējam AI modeli: {symbol}")
+    start = time.perf_counter()
+    base_path = f"models/{symbol.replace('/', '_')}"
 
     try:
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe='5m', limit=1000)
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-
-        # === Indikatori ===
-        df['ema_50'] = df['close'].ewm(span=50).mean()
-        df['ema_200'] = df['close'].ewm(span=200).mean()
-        df['rsi'] = compute_rsi(df['close'])
-        df['macd'], df['macd_signal'] = compute_macd(df['close'])
-        df['macd_hist'] = df['macd'] - df['macd_signal']
-        df['bollinger_upper'], df['bollinger_lower'], df['bollinger_middle'] = compute_bollinger_bands(df['close'])
-        df['bb_width'] = df['bollinger_upper'] - df['bollinger_lower']
-        df['atr'] = compute_atr(df)
-        df['momentum'] = df['close'] - df['close'].shift(5)
-        df['rsi_slope'] = compute_rsi_slope(df['close'])
-        df['volatility'] = (df['atr'] / df['close']).clip(upper=0.2)
-
-        # === Papildus indikatori ===
-        df["volume_change_3"] = compute_volume_change(df["volume"], period=3)
-        df["price_above_ema_50"] = compute_price_above_ema(df["close"], ema_period=50)
-        df["bollinger_bandwidth"] = compute_bollinger_bandwidth(df["close"])
-        df["trend_angle"] = compute_trend_angle(df["ema_50"])
-        df["volume_spike"] = compute_volume_spike(df["volume"])
-        df["range_position"] = compute_range_position(df["close"], df["high"], df["low"])
-        df["candle_body_ratio"] = compute_candle_body_ratio(df["open"], df["close"], df["high"], df["low"])
-        df["upper_wick_ratio"] = compute_upper_wick_ratio(df["open"], df["close"], df["high"])
-        df["lower_wick_ratio"] = compute_lower_wick_ratio(df["open"], df["close"], df["low"])
-        df["relative_volume"] = compute_relative_volume(df["volume"])
-        df["proximity_to_bollinger_upper"] = compute_proximity_to_upper_bb(df["close"], df["bollinger_upper"])
-
-        # === Drošības metrika ===
-        df['market_cap_proxy'] = df['volume'] * df['close']
-        df['safety_score'] = (df['volume'] / df['market_cap_proxy']).clip(upper=1.0)
-
-        # === Mērķa mainīgais (label) ===
-        df['future_max'] = df['close'].shift(-1).rolling(3).max()
-        df['target'] = (df['future_max'] >= df['close'] * 1.01).astype(int)
+        # === Indikatori (kanoniskās definīcijas no utils/feature_pipeline.py) ===
+        features = list(FEATURE_COLUMNS)
+        df = _training_frame(symbol, exchange, df, data_dir, features)
+
+        # === Mērķa mainīgais (label): kopīgā definīcija ar train_global_model.py;
+        # rindām bez pilna nākotnes loga target = NaN (netiek izmantotas) ===
+        df['future_max'], df['target'] = breakout_target(df['close'])
+
+        full_reason = "pilns režīms"
+        if incremental:
+            result = _incremental_update(
+                symbol, df, features, base_path, n_jobs, settings.get_training_settings()
+            )
+            if isinstance(result, dict):
+                result.update(symbol=symbol, seconds=round(time.perf_counter() - start, 3))
+                if result["mode"] == "incremental":
+                    with open(base_path + "_metrics.json", "w") as f:
+                        json.dump(result, f, indent=2)
+                _record_history({"symbol": symbol, "mode": result["mode"], "rows": result["new_rows"],
+                                 "holdout_log_loss_before": result.get("holdout_log_loss_before"),
+                                 "holdout_log_loss_after": result.get("holdout_log_loss_after"),
+                                 "seconds": result["seconds"]})
+                print(f"⏱️ {result['mode']}: {result['seconds']:.2f}s")
+                return dict(result, ok=True)
+            full_reason = result
+            print(f"↩️ Pilns pārtreniņš: {full_reason}")
 
         if df['target'].nunique() < 2:
             print(f"⚠️ Token {symbol} nevar trenēt — tikai viena klase ({df['target'].unique()})")
-            return None, None
-
-        features = [
-            'volume', 'ema_50', 'ema_200', 'rsi', 'macd', 'macd_signal', 'macd_hist',
-            'bollinger_upper', 'bollinger_lower', 'bollinger_middle', 'bb_width', 'atr',
-            'momentum', 'rsi_slope', 'safety_score', 'volume_change_3', 'price_above_ema_50',
-            'bollinger_bandwidth', 'trend_angle', 'volume_spike', 'range_position',
-            'candle_body_ratio', 'upper_wick_ratio', 'lower_wick_ratio', 'relative_volume',
-            'proximity_to_bollinger_upper', 'volatility'
-        ]
+            return {"symbol": symbol, "ok": False, "mode": "failed", "error": "tikai viena klase",
+                    "seconds": round(time.perf_counter() - start, 3)}
 
         df.dropna(subset=features + ['target'], inplace=True)
+        df['target'] = df['target'].astype(int)
 
         if df.empty:
             raise ValueError("❌ Tukšs DataFrame pēc dropna – nav iespējams trenēt.")
@@ -112,15 +298,14 @@ def train_ai_model(symbol, exchange):
 
         model = xgb.XGBClassifier(
             eval_metric='logloss',
-            max_depth=5,
-            learning_rate=0.05,
             n_estimators=100,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            random_state=42
+            n_jobs=n_jobs,
+            **XGB_PARAMS
         )
 
+        fit_start = time.perf_counter()
         model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - fit_start
         y_pred = model.predict(X_test)
         y_proba = model.predict_proba(X_test)[:, 1]
 
@@ -131,10 +316,9 @@ def train_ai_model(symbol, exchange):
         print(f"✅ Precizitāte: {acc:.4f} | LogLoss: {loss:.4f} | AUC: {auc:.4f}")
 
         os.makedirs("models", exist_ok=True)
-        base_path = f"models/{symbol.replace('/', '_')}"
-        joblib.dump(model, base_path + "_model.pkl")
-        joblib.dump(scaler, base_path + "_scaler.pkl")
-        joblib.dump(features, base_path + "_features.pkl")
+        stats = _batch_stats(X.to_numpy(dtype=np.float64))
+        save_model(base_path, model, scaler, features, stats=stats)
+        save_schema(base_path, features)
 
         metrics = {
             "symbol": symbol,
@@ -142,31 +326,44 @@ def train_ai_model(symbol, exchange):
             "log_loss": round(loss, 4),
             "roc_auc": round(auc, 4),
             "samples": int(len(df)),
-            "positive_ratio": round(df['target'].mean(), 4)
+            "positive_ratio": round(df['target'].mean(), 4),
+            "mode": "full",
+            "full_reason": full_reason,
+            "trees": model.get_booster().num_boosted_rounds(),
+            "samples_seen": int(stats["count"]),
+            "labelled_until": _labelled_until(df),
+            "label_version": LABEL_VERSION,
+            "fit_seconds": round(fit_seconds, 3),
+            "seconds": round(time.perf_counter() - start, 3)
         }
 
         with open(base_path + "_metrics.json", "w") as f:
             json.dump(metrics, f, indent=2)
 
-        print("💾 Modelis un metrikas saglabātas!")
-        return model, scaler
+        _record_history({"symbol": symbol, "mode": "full", "reason": full_reason,
+                         "rows": metrics["samples"], "seconds": metrics["seconds"]})
+        print(f"💾 Modelis un metrikas saglabātas! ⏱️ full: {metrics['seconds']:.2f}s")
+        return dict(metrics, ok=True)
 
     except Exception as e:
         print(f"❌ AI apmācības kļūda: {e}")
         try:
             pending_file = "data/pending_training.json"
-            if os.path.exists(pending_file):
-                with open(pending_file, "r") as f:
-                    pending = json.load(f)
-            else:
-                pending = []
-
-            if symbol not in pending:
-                pending.append(symbol)
-                with open(pending_file, "w") as f:
-                    json.dump(pending, f, indent=2)
-                print(f"📥 Token pievienots 'pending_training.json': {symbol}")
+            # Lock: paralēlās trenēšanas procesi var kļūdīties vienlaicīgi
+            with FileLock(pending_file + ".lock"):
+                if os.path.exists(pending_file):
+                    with open(pending_file, "r") as f:
+                        pending = json.load(f)
+                else:
+                    pending = []
+
+                if symbol not in pending:
+                    pending.append(symbol)
+                    with open(pending_file, "w") as f:
+                        json.dump(pending, f, indent=2)
+                    print(f"📥 Token pievienots 'pending_training.json': {symbol}")
         except Exception as pe:
             print(f"⚠️ Neizdevās pierakstīt pending tokenu: {pe}")
 
-        return None, None
+        return {"symbol": symbol, "ok": False, "mode": "failed", "error": str(e),
+                "seconds": round(time.perf_counter() - start, 3)}
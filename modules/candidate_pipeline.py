@@ -0,0 +1,174 @@
+"""
+Candidate Pipeline Module
+-------------------------
+Hype tokenu novērtēšana pa posmiem:
+    1. klasifikācija + validācija (lēta, galvenajā pavedienā)
+    2. AI filtrs → volatilitāte → feedback modelis katram tokenam savā pavedienā
+       (I/O, ierobežota paralelitāte)
+    3. pirkums — izpilda izsaucējs secīgi, lai bilances pārbaudes nekonfliktētu
+
+evaluate_candidates() atgriež pieņemtos kandidātus tiklīdz tie ir novērtēti, tāpēc
+viens lēns tokens neaiztur pirkumus pārējiem. Partijās tiek apvienoti tikai predict
+izsaukumi: vienlaicīgi novērtēto tokenu prognozes tam pašam modelim (un feedback
+modelim) izpilda viens inplace_predict (modules/predict_batcher.py).
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import settings
+from modules.token_filter import classify_token
+from modules.symbol_checker import is_symbol_valid
+from modules.ai_predictor import ai_filter, predict_batcher
+from modules.trade_executor import estimate_volatility
+from utils.feedback_predictor import score_feedback
+from utils.save_candidate import save_candidate
+from utils.metrics import timed
+
+TRADABLE_STRATEGIES = ["simple", "aggressive", "revival", "momentum_safe"]
+
+# Stratēģijas, kurām AI filtrs tiek izlaists: (confidence, safety_score)
+SKIP_AI_DEFAULTS = {
+    "aggressive": (0.90, 0.10),
+    "revival": (0.85, 0.20),
+    "momentum_safe": (0.87, 0.25)
+}
+
+
+def _prepare(token, exchange, snapshot, stats):
+    """1. posms: klasifikācija, validācija un cenas pārbaude. Atgriež cenu vai None."""
+    stats["total_hype"] += 1
+    if token.get("revival"):
+        stats["revivals_found"] += 1
+
+    print(f"🔸 {token['symbol']} | 5m: {token['price_change_5m']:.2f}% | Vol: ${token['volume']:.0f}")
+    strategy = classify_token(token, snapshot=snapshot)
+    print(f"   → Stratēģija: {strategy}")
+    token["strategy"] = strategy
+
+    if strategy not in TRADABLE_STRATEGIES:
+        return None
+
+    if strategy in stats["classified"]:
+        stats["classified"][strategy] += 1
+
+    if not is_symbol_valid(token["symbol"], exchange):
+        print(f"❌ Token {token['symbol']} nav validēts kā tirgojams. Izlaižam.")
+        return None
+
+    current_price = float(token.get("last_price") or token.get("price") or 0)
+    if current_price <= 0:
+        print(f"❌ Token {token['symbol']} cenai nav derīgas vērtības (0 vai mazāk).")
+        return None
+
+    return current_price
+
+
+def _reject(token, exchange, result, outcome):
+    save_candidate(token, exchange)
+    result["outcome"] = outcome
+    return result
+
+
+def _feedback_input(token, current_price, volatility, confidence):
+    strategy = token["strategy"]
+    return {
+        "price": current_price,
+        "volatility": volatility,
+        "ai_confidence": confidence,
+        "strategy_simple": 1 if strategy == "simple" else 0,
+        "strategy_aggressive": 1 if strategy == "aggressive" else 0,
+        "strategy_revival": 1 if strategy == "revival" else 0,
+        "strategy_momentum_safe": 1 if strategy == "momentum_safe" else 0
+    }
+
+
+def _evaluate(token, current_price, exchange, snapshot):
+    """2. posms: AI filtrs, volatilitāte un feedback modelis vienam tokenam."""
+    symbol = token["symbol"]
+    strategy = token["strategy"]
+    result = {"token": token, "current_price": current_price, "outcome": None, "ai_checked": False}
+
+    if strategy in SKIP_AI_DEFAULTS:
+        print(f"⚠️ Stratēģija '{strategy}' → izlaižam AI filtru priekš {symbol}")
+        confidence, safety_score = SKIP_AI_DEFAULTS[strategy]
+    else:
+        result["ai_checked"] = True
+        try:
+            with timed("pipeline.ai_filter"):
+                prediction, confidence, safety_score = ai_filter(
+                    token, exchange, return_score=True, snapshot=snapshot, batcher=predict_batcher
+                )
+        except Exception as e:
+            print(f"❌ AI filtrēšana neizdevās {symbol}: {e}")
+            return _reject(token, exchange, result, "ai_error")
+        if prediction != 1:
+            print(f"❌ Individuālais AI atmeta {symbol} → prediction: {prediction}")
+            return _reject(token, exchange, result, "ai_rejected")
+        print(f"✅ AI confidence {symbol}: {confidence:.2f} | Safety: {safety_score:.2f}")
+
+    result["confidence"] = confidence
+    result["safety_score"] = safety_score
+
+    with timed("pipeline.volatility"):
+        volatility = estimate_volatility(symbol, exchange)
+    result["volatility"] = volatility
+
+    with timed("pipeline.feedback"):
+        feedback_score = score_feedback(_feedback_input(token, current_price, volatility, confidence))
+
+    if feedback_score is None:
+        print(f"⚠️ Feedback modelis nav pieejams – izlaižam {symbol}")
+        return _reject(token, exchange, result, "feedback_missing")
+
+    result["feedback_score"] = feedback_score
+    print(f"🧠 Feedback score {symbol}: {feedback_score:.3f}")
+    if feedback_score < snapshot["AI_THRESHOLD"]:
+        print(f"🧠 Feedback AI atmeta {symbol} (score: {feedback_score:.3f})")
+        return _reject(token, exchange, result, "feedback_rejected")
+
+    result["outcome"] = "accepted"
+    return result
+
+
+def _record(result, stats):
+    outcome = result["outcome"]
+    if result["ai_checked"] and outcome != "ai_error":
+        stats["ai_rejected" if outcome == "ai_rejected" else "ai_accepted"] += 1
+    if outcome == "feedback_rejected":
+        stats["feedback_rejected"] += 1
+
+
+def evaluate_candidates(hype_tokens, exchange, snapshot, stats, max_workers=None):
+    """
+    🏭 Novērtē visus cikla hype tokenus ar ierobežotu paralelitāti.
+    Ģenerators: atdod pieņemto kandidātu dict (token, cena, confidence, safety,
+    volatilitāte, feedback score) tiklīdz tas izgājis visus filtrus.
+    stats tiek atjaunināts tikai izsaucēja pavedienā.
+    """
+    if max_workers is None:
+        max_workers = settings.get_pipeline_settings()["MAX_WORKERS"]
+
+    prepared = []
+    for token in hype_tokens:
+        current_price = _prepare(token, exchange, snapshot, stats)
+        if current_price is not None:
+            prepared.append((token, current_price))
+
+    if not prepared:
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_evaluate, token, current_price, exchange, snapshot)
+            for token, current_price in prepared
+        ]
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"⚠️ Kandidāta novērtēšanas kļūda: {e}")
+                continue
+
+            _record(result, stats)
+            if result["outcome"] == "accepted":
+                yield result
@@ -0,0 +1,101 @@
+"""
+Exchange Factory Module
+-----------------------
+Viens kopīgs ccxt.mexc klients katram procesam. Klients tiek izveidots slinki pirmajā
+get_exchange() izsaukumā, izmanto vienu HTTP savienojumu pūlu un vienu rate limiteri,
+bet tirgu metadati tiek ielādēti no diska keša (ar TTL), nevis katrā startā no API.
+"""
+
+import os
+import json
+import time
+import threading
+
+import ccxt
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+load_dotenv()
+
+MARKETS_CACHE_FILE = "data/markets_cache.json"
+MARKETS_TTL = 6 * 3600   # Sekundes, cik ilgi tirgu kešs derīgs
+POOL_SIZE = 16           # HTTP savienojumi pūlā (paralēlie pieprasījumi)
+
+_exchange = None
+_lock = threading.Lock()
+
+
+def _create_exchange():
+    exchange = ccxt.mexc({
+        'apiKey': os.getenv("MEXC_API_KEY"),
+        'secret': os.getenv("MEXC_API_SECRET"),
+        'enableRateLimit': True,
+        'timeout': 30000
+    })
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    exchange.session.mount("https://", adapter)
+    return exchange
+
+
+def _load_markets_cache():
+    if not os.path.exists(MARKETS_CACHE_FILE):
+        return None
+    try:
+        with open(MARKETS_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️ Nevar nolasīt tirgu kešu: {e}")
+        return None
+
+    if time.time() - cache.get("saved_at", 0) >= MARKETS_TTL:
+        return None
+    return cache
+
+
+def _save_markets_cache(exchange):
+    try:
+        os.makedirs(os.path.dirname(MARKETS_CACHE_FILE), exist_ok=True)
+        tmp_path = MARKETS_CACHE_FILE + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "saved_at": time.time(),
+                "markets": exchange.markets,
+                "currencies": exchange.currencies
+            }, f)
+        os.replace(tmp_path, MARKETS_CACHE_FILE)
+    except Exception as e:
+        print(f"⚠️ Neizdevās saglabāt tirgu kešu: {e}")
+
+
+def load_markets(exchange, reload=False):
+    """Ielādē tirgus no diska keša; ja kešs novecojis vai reload=True — no API."""
+    if not reload:
+        cache = _load_markets_cache()
+        if cache:
+            exchange.set_markets(cache["markets"], cache.get("currencies") or None)
+            return exchange.markets
+
+    exchange.load_markets(reload=True)
+    _save_markets_cache(exchange)
+    return exchange.markets
+
+
+def get_exchange(load=True):
+    """
+    🔌 Atgriež procesa kopīgo MEXC klientu.
+    load=True → nodrošina, ka tirgi ir ielādēti (no keša vai API).
+    """
+    global _exchange
+    with _lock:
+        if _exchange is None:
+            _exchange = _create_exchange()
+        if load and not _exchange.markets:
+            load_markets(_exchange)
+        return _exchange
+
+
+def refresh_markets():
+    """Piespiedu tirgu atjaunošana no API (piem. pēc jauna listinga)."""
+    exchange = get_exchange(load=False)
+    with _lock:
+        return load_markets(exchange, reload=True)
@@ -0,0 +1,153 @@
+"""
+Incremental Collector Module
+----------------------------
+data/market_data papildināšana ar jaunajām svecēm. Katram simbolam tiek glabāta
+pēdējās saglabātās sveces laika zīme (high-water mark); nākamā vākšana pieprasa tikai
+sveces kopš tās (since=...), indikatorus pārrēķina tikai jaunajām rindām (ar
+CONTEXT_ROWS saglabāto sveču kontekstu) un pievieno tās failam. Marķierī glabājas arī
+feature shēmas hash (FEATURE_VERSION + kolonnas), ar kuru fails aprēķināts. Pilna
+ielāde notiek jaunam simbolam, mainītām kolonnām vai shēmas hash, nezināmai faila
+versijai (nav marķiera) vai pārāk lielam robam.
+"""
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from modules.ohlcv_cache import timeframe_ms
+from utils import market_store
+from utils.feature_pipeline import FEATURE_COLUMNS, OHLCV_COLUMNS, build_feature_frame, schema_hash
+
+MIN_ROWS = 200  # Mazāk rindu pēc indikatoriem → simbols netiek saglabāts (kā pilnajā vākšanā)
+
+
+def load_marks(path=None):
+    path = path or settings.get_collection_settings()["HWM_FILE"]
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Nevar nolasīt {path}: {e} — simboli tiks ielādēti pilnībā no jauna.")
+        return {}
+
+
+def save_marks(marks, path=None):
+    path = path or settings.get_collection_settings()["HWM_FILE"]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(marks, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _mark(df):
+    """Marķieris: pēdējās saglabātās sveces timestamp + shēma, ar kuru aprēķinātas features."""
+    return {"until": int(market_store.timestamps_ms(df["timestamp"])[-1]), "schema": schema_hash()}
+
+
+def _fetch_since(exchange, symbol, since, config):
+    """
+    Sveces ar timestamp >= since (lapās pa PAGE_LIMIT). None → robs lielāks par
+    MAX_PAGES lapām, vajadzīga pilna ielāde.
+    """
+    tf_ms = timeframe_ms(config["TIMEFRAME"])
+    rows = {}
+    cursor = int(since)
+    for _ in range(config["MAX_PAGES"]):
+        page = exchange.fetch_ohlcv(symbol, timeframe=config["TIMEFRAME"], since=cursor,
+                                    limit=config["PAGE_LIMIT"])
+        page = [row for row in page if row[0] >= cursor]
+        if not page:
+            break
+        for row in page:
+            rows[row[0]] = row
+        if len(page) < config["PAGE_LIMIT"]:
+            break
+        cursor = int(page[-1][0]) + tf_ms
+    else:
+        return None
+    return [rows[ts] for ts in sorted(rows)]
+
+
+def _full_frame(exchange, symbol, config):
+    ohlcv = exchange.fetch_ohlcv(symbol, timeframe=config["TIMEFRAME"], limit=config["FULL_LIMIT"])
+    return build_feature_frame(ohlcv).dropna(), len(ohlcv)
+
+
+def _append_frame(stored, candles, config):
+    """
+    Saglabātās rindas līdz pirmajai jaunajai svecei + jaunās rindas ar indikatoriem,
+    kas aprēķināti uz [pēdējās CONTEXT_ROWS saglabātās sveces] + [jaunās sveces].
+    Pēdējā saglabātā svece var būt bijusi neaizvērta — ja tā atnāk atkārtoti, tiek aizvietota.
+    """
+    stored = stored.copy()
+    stored["timestamp"] = market_store.timestamps_ms(stored["timestamp"])
+    fresh = np.asarray(candles, dtype=np.float64)
+
+    kept = stored[stored["timestamp"] < fresh[0, 0]]
+    context = kept[OHLCV_COLUMNS].tail(config["CONTEXT_ROWS"]).to_numpy(dtype=np.float64)
+
+    frame = build_feature_frame(np.vstack([context, fresh]))
+    tail = frame.iloc[len(context):].dropna().copy()
+    tail["timestamp"] = market_store.timestamps_ms(tail["timestamp"])
+
+    combined = pd.concat([kept, tail[kept.columns]], ignore_index=True)
+    return combined.tail(config["MAX_ROWS"]).reset_index(drop=True), len(tail)
+
+
+def collect_symbol(exchange, symbol, marks, data_dir=market_store.DATA_DIR, config=None):
+    """
+    ⬇️ Atjauno viena simbola datus. Atgriež {"mode": full/append/noop/skip, "fetched",
+    "new_rows", "rows", "path"}; marks (dict) tiek atjaunināts uz vietas.
+    """
+    config = config or settings.get_collection_settings()
+    mark = marks.get(symbol)
+    info = market_store.inspect(symbol, data_dir)
+
+    stored = None
+    reason = None
+    if info is None:
+        reason = "nav datu faila"
+    elif set(info["columns"]) != set(OHLCV_COLUMNS + FEATURE_COLUMNS):
+        reason = "mainīta feature shēma"
+    elif not isinstance(mark, dict):
+        # Nav marķiera vai vecais formāts (tikai timestamp) → nav zināms, ar kurām formulām fails aprēķināts
+        reason = "nezināma faila feature versija"
+    elif mark.get("schema") != schema_hash():
+        reason = "mainīta feature versija"
+    else:
+        stored = market_store.read_frame(symbol, data_dir=data_dir)
+        if stored is None or stored.empty:
+            reason = "tukšs datu fails"
+
+    candles = None
+    if reason is None:
+        candles = _fetch_since(exchange, symbol, mark["until"], config)
+        if candles is None:
+            reason = "pārāk liels robs kopš pēdējās vākšanas"
+
+    if reason is not None:
+        df, fetched = _full_frame(exchange, symbol, config)
+        if len(df) < MIN_ROWS:
+            return {"mode": "skip", "fetched": fetched, "new_rows": 0, "rows": len(df),
+                    "path": None, "reason": "pārāk maz sveču pēc indikatoriem"}
+        df = df.tail(config["MAX_ROWS"])
+        path = market_store.write_frame(symbol, df, data_dir)
+        marks[symbol] = _mark(df)
+        return {"mode": "full", "fetched": fetched, "new_rows": len(df), "rows": len(df),
+                "path": path, "reason": reason}
+
+    if not candles:
+        return {"mode": "noop", "fetched": 0, "new_rows": 0, "rows": len(stored),
+                "path": info["path"], "reason": None}
+
+    df, new_rows = _append_frame(stored, candles, config)
+    path = market_store.write_frame(symbol, df, data_dir)
+    marks[symbol] = _mark(df)
+    return {"mode": "append", "fetched": len(candles), "new_rows": new_rows, "rows": len(df),
+            "path": path, "reason": None}
@@ -1,29 +1,46 @@
 # modules/market_sentiment.py
 
-import ccxt
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-exchange = ccxt.mexc({
-    'apiKey': os.getenv("MEXC_API_KEY"),
-    'secret': os.getenv("MEXC_API_SECRET"),
-    'enableRateLimit': True
-})
-
-def get_market_sentiment():
-    try:
-        btc = exchange.fetch_ticker('BTC/USDT')
-        change_24h = btc.get('percentage', 0)  # Dažreiz var nebūt - default uz 0
-
-        if change_24h >= 2.0:
-            return 'bullish'
-        elif change_24h <= -2.0:
-            return 'bearish'
-        else:
-            return 'neutral'
-
-    except Exception as e:
-        print(f"⚠️ Nevar noteikt tirgus sentimentu: {e}")
+import time
+import threading
+from modules.exchange_factory import get_exchange
+
+# === Sentimenta kešs (BTC 24h izmaiņas nemainās sekunžu laikā) ===
+SENTIMENT_TTL = 300  # sekundes
+
+_cache = {"value": None, "fetched_at": 0.0}
+_cache_lock = threading.Lock()
+
+def _fetch_sentiment():
+    btc = get_exchange().fetch_ticker('BTC/USDT')
+    change_24h = btc.get('percentage', 0) or 0  # Dažreiz var nebūt - default uz 0
+
+    if change_24h >= 2.0:
+        return 'bullish'
+    elif change_24h <= -2.0:
+        return 'bearish'
+    else:
         return 'neutral'
+
+def get_market_sentiment(max_age=SENTIMENT_TTL):
+    """
+    Atgriež 'bullish' / 'bearish' / 'neutral'. BTC ticker tiek pieprasīts
+    ne biežāk kā reizi `max_age` sekundēs; kļūdas gadījumā tiek atgriezta
+    pēdējā zināmā vērtība (vai 'neutral', ja tādas nav).
+    """
+    with _cache_lock:
+        now = time.time()
+        if _cache["value"] is not None and now - _cache["fetched_at"] < max_age:
+            return _cache["value"]
+
+        try:
+            _cache["value"] = _fetch_sentiment()
+            _cache["fetched_at"] = now
+            return _cache["value"]
+
+        except Exception as e:
+            print(f"⚠️ Nevar noteikt tirgus sentimentu: {e}")
+            return _cache["value"] or 'neutral'
+
+def get_sentiment_fetched_at():
+    """Laiks (epoch), kad sentiments pēdējo reizi iegūts no API; None, ja vēl nav."""
+    return _cache["fetched_at"] or None
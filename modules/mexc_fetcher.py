@@ -1,89 +1,250 @@
 import time
+import threading
 import requests
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import config.settings as settings  # ✅ Konfigurācijas imports
+from modules import ohlcv_cache
+from utils.metrics import timed, incr
 
 MEXC_BASE_URL = "https://api.mexc.com"
 
-def get_hype_tokens():
-    """🔍 Iegūst tokenus ar ievērojamu pieaugumu no MEXC."""
+# Kopīga HTTP sesija — atkārtoti izmanto TCP/TLS savienojumus
+_session = requests.Session()
+
+# Pēdējā skenējuma statistika (ilgums, pieprasījumu skaits)
+last_scan_stats = {}
+
+
+class WeightBudget:
+    """
+    ⚖️ Slīdošā loga svara budžets MEXC pieprasījumiem.
+    acquire() bloķē, kamēr logā ir vieta pieprasījuma svaram.
+    """
+
+    def __init__(self, budget, window):
+        self.budget = budget
+        self.window = window
+        self._events = deque()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight=1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._events and now - self._events[0][0] >= self.window:
+                    _, w = self._events.popleft()
+                    self._used -= w
+
+                if self._used + weight <= self.budget:
+                    self._events.append((now, weight))
+                    self._used += weight
+                    return
+
+                wait = self.window - (now - self._events[0][0])
+            time.sleep(max(wait, 0.01))
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _prefilter_tickers(markets, market, strict=False):
+    """
+    🧮 Atlasa kandidātus no /ticker/24hr datiem ar NumPy maskām.
+
+    Izmet simbolus, kuri nevar sasniegt MIN_GAIN_5M: cena pirms 10 min nevar būt
+    zemāka par 24h low, tāpēc (last - low) / low ir augšējā robeža 5m pieaugumam.
+    strict=True papildus prasa last > open (izslēdz arī atdzīvojušos tokenus).
+    """
+    min_gain = market["MIN_GAIN_5M"]
+    symbols = np.array([m.get("symbol", "") for m in markets], dtype=str)
+
+    def column(key):
+        return np.array([_to_float(m.get(key)) for m in markets], dtype=np.float64)
+
+    quote_volume = column("quoteVolume")
+    last_price = column("lastPrice")
+    open_price = column("openPrice")
+    high_price = column("highPrice")
+    low_price = column("lowPrice")
+
+    market_cap = quote_volume * last_price  # Proxy market cap
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        safety_score = quote_volume / market_cap
+        max_gain = (last_price - low_price) / low_price * 100
+
+    base_mask = (
+        np.char.endswith(symbols, "USDT")
+        & (market_cap >= market["MIN_MARKET_CAP"])
+        & (market_cap <= market["MAX_MARKET_CAP"])
+        & (quote_volume >= market["MIN_VOLUME_24H"])
+    )
+
+    # Drošības indekss
+    safety_mask = safety_score >= 0.05
+    unsafe = int(np.count_nonzero(base_mask & ~safety_mask))
+    if unsafe:
+        print(f"⚠️ Noraidīti {unsafe} tokeni: zems drošības indekss (< 0.05)")
+
+    # Nav dienas diapazona vai cena pie 24h low → nav iespējams MIN_GAIN_5M
+    move_mask = (high_price > low_price) & (low_price > 0) & (max_gain >= min_gain)
+    if strict:
+        move_mask &= last_price > open_price
+
+    mask = base_mask & safety_mask & move_mask
+    skipped = int(np.count_nonzero(base_mask & safety_mask & ~move_mask))
+    print(f"🧮 Priekšfiltrs: {int(np.count_nonzero(mask))} kandidāti | izlaisti bez kustības: {skipped}")
+
+    return [
+        {
+            "symbol": str(symbols[i]),
+            "quote_volume": float(quote_volume[i]),
+            "market_cap": float(market_cap[i]),
+            "safety_score": float(safety_score[i])
+        }
+        for i in np.flatnonzero(mask)
+    ]
+
+
+def _fetch_klines(symbol, budget, weight, counter):
+    budget.acquire(weight)
+    with counter["lock"]:
+        counter["requests"] += 1
+        counter["weight"] += weight
+
+    with timed("scan.klines_request"):
+        res = _session.get(
+            f"{MEXC_BASE_URL}/api/v3/klines",
+            params={"symbol": symbol, "interval": "5m", "limit": 3},
+            timeout=10
+        )
+    if res.status_code != 200:
+        return None
+    return res.json()
+
+
+def _evaluate_klines(candidate, data, min_gain):
+    """Aprēķina 5m pieaugumu no klines un atgriež token dict vai None."""
+    symbol = candidate["symbol"]
+
+    if not data or len(data) < 3:
+        return None
+
+    price_5m_ago = float(data[-3][4])
+    current_price = float(data[-1][4])
+    price_change_5m = ((current_price - price_5m_ago) / price_5m_ago) * 100
+
+    avg_5m_volume = sum(float(c[5]) for c in data[:-1]) / (len(data) - 1)
+    current_5m_volume = float(data[-1][5])
+    volume_change_24h = (current_5m_volume / avg_5m_volume) if avg_5m_volume > 0 else 0
+
+    if price_change_5m < min_gain:
+        return None
+
+    token = {
+        "symbol": symbol,
+        "price_change_5m": price_change_5m,
+        "volume": candidate["quote_volume"],
+        "market_cap": candidate["market_cap"],
+        "last_price": current_price,
+        "volume_change_24h": volume_change_24h,
+        "safety_score": candidate["safety_score"]
+    }
+
+    if avg_5m_volume > 0 and current_5m_volume / avg_5m_volume > 5:
+        token["revival"] = True
+        print(f"🧟 Atklāts mirušais token kas atdzīvojies: {symbol}")
+
+    return token
+
+
+def _check_candidate(candidate, min_gain, budget, weight, counter):
+    symbol = candidate["symbol"]
+    try:
+        data = _fetch_klines(symbol, budget, weight, counter)
+        if data:
+            ohlcv_cache.ingest(symbol, "5m", data)
+        return _evaluate_klines(candidate, data, min_gain)
+    except Exception as e:
+        print(f"⚠️ Kļūda ar {symbol}: {e}")
+        return None
+
+
+def get_hype_tokens(concurrent=None, snapshot=None):
+    """
+    🔍 Iegūst tokenus ar ievērojamu pieaugumu no MEXC.
+    snapshot: cikla iestatījumi no settings.build_settings_snapshot() (ja nav — nolasa tagad).
+    """
     print("🔍 Skenējam MEXC tirgus datus...")
+    scan_start = time.time()
 
     # ✅ Dinamiskie kritēriji atkarīgi no TEST_MODE
-    market = settings.get_market_criteria()
-    min_cap = market["MIN_MARKET_CAP"]
-    max_cap = market["MAX_MARKET_CAP"]  # ← Tagad nāk no settings
-    min_volume = market["MIN_VOLUME_24H"]
+    market = snapshot["MARKET"] if snapshot else settings.get_market_criteria()
     min_gain = market["MIN_GAIN_5M"]
 
+    scan = settings.get_scan_settings()
+    if concurrent is None:
+        concurrent = scan["CONCURRENT"]
+
+    budget = WeightBudget(scan["WEIGHT_BUDGET"], scan["WEIGHT_WINDOW"])
+    weight = scan["KLINES_WEIGHT"]
+    budget.acquire(scan["TICKER_24H_WEIGHT"])
+    counter = {"requests": 1, "weight": scan["TICKER_24H_WEIGHT"], "lock": threading.Lock()}
+
     try:
-        response = requests.get(f"{MEXC_BASE_URL}/api/v3/ticker/24hr")
-        response.raise_for_status()
-        markets = response.json()
+        with timed("scan.ticker_24h"):
+            response = _session.get(f"{MEXC_BASE_URL}/api/v3/ticker/24hr", timeout=15)
+            response.raise_for_status()
+            markets = response.json()
     except Exception as e:
         print(f"❌ Kļūda iegūstot tickerus: {e}")
         return []
 
-    hype_tokens = []
-
-    for market_data in markets:
-        try:
-            symbol = market_data['symbol']
-            if not symbol.endswith("USDT"):
-                continue
-
-            quote_volume = float(market_data['quoteVolume'])
-            last_price = float(market_data['lastPrice'])
-            market_cap = quote_volume * last_price  # Proxy market cap
-
-            if not (min_cap <= market_cap <= max_cap):
-                continue
-            if quote_volume < min_volume:
-                continue
-
-            # Drošības indekss
-            safety_score = quote_volume / market_cap
-            if safety_score < 0.05:
-                print(f"⚠️ Token {symbol} noraidīts: zems drošības indekss ({safety_score:.3f})")
-                continue
-
-            # Vēsturiskie dati (5m sveces)
-            time.sleep(0.25)
-            klines_url = f"{MEXC_BASE_URL}/api/v3/klines?symbol={symbol}&interval=5m&limit=3"
-            res = requests.get(klines_url)
-            if res.status_code != 200:
-                continue
-
-            data = res.json()
-            if len(data) < 3:
-                continue
-
-            price_5m_ago = float(data[-3][4])
-            current_price = float(data[-1][4])
-            price_change_5m = ((current_price - price_5m_ago) / price_5m_ago) * 100
-
-            avg_5m_volume = sum(float(c[5]) for c in data[:-1]) / (len(data) - 1)
-            current_5m_volume = float(data[-1][5])
-            volume_change_24h = (current_5m_volume / avg_5m_volume) if avg_5m_volume > 0 else 0
-
-            if price_change_5m >= min_gain:
-                token = {
-                    "symbol": symbol,
-                    "price_change_5m": price_change_5m,
-                    "volume": quote_volume,
-                    "market_cap": market_cap,
-                    "last_price": current_price,
-                    "volume_change_24h": volume_change_24h,
-                    "safety_score": safety_score
-                }
-
-                if avg_5m_volume > 0 and current_5m_volume / avg_5m_volume > 5:
-                    token["revival"] = True
-                    print(f"🧟 Atklāts mirušais token kas atdzīvojies: {symbol}")
-
-                hype_tokens.append(token)
-
-        except Exception as e:
-            print(f"⚠️ Kļūda ar {symbol}: {e}")
-            continue
+    # === 1. posms: vektorizēts priekšfiltrs no 24hr datiem (bez klines pieprasījumiem)
+    with timed("scan.prefilter"):
+        candidates = _prefilter_tickers(markets, market, strict=scan["PREFILTER_STRICT"])
+
+    # === 2. posms: 5m klines katram kandidātam (svara budžeta robežās)
+    with timed("scan.klines"):
+        if concurrent and candidates:
+            with ThreadPoolExecutor(max_workers=scan["MAX_WORKERS"]) as pool:
+                results = list(pool.map(
+                    lambda c: _check_candidate(c, min_gain, budget, weight, counter),
+                    candidates
+                ))
+        else:
+            results = []
+            for candidate in candidates:
+                results.append(_check_candidate(candidate, min_gain, budget, weight, counter))
+                time.sleep(0.25)
+
+    # pool.map saglabā ticker secību → tie paši token dict kā secīgajā režīmā
+    hype_tokens = [token for token in results if token]
+
+    duration = time.time() - scan_start
+    last_scan_stats.clear()
+    last_scan_stats.update({
+        "duration": round(duration, 2),
+        "requests": counter["requests"],
+        "weight": counter["weight"],
+        "tickers": len(markets),
+        "candidates": len(candidates),
+        "hype_tokens": len(hype_tokens),
+        "concurrent": bool(concurrent)
+    })
+    incr("scan.requests", counter["requests"])
+    incr("scan.weight", counter["weight"])
+    mode = "paralēli" if concurrent else "secīgi"
+    print(
+        f"⏱️ Skenēšana ({mode}): {duration:.1f}s | Pieprasījumi: {counter['requests']} "
+        f"(svars {counter['weight']}) | Kandidāti: {len(candidates)} | Hype: {len(hype_tokens)}"
+    )
 
     return hype_tokens
@@ -0,0 +1,181 @@
+"""
+Model Registry Module
+---------------------
+Per-simbola AI modeļu (Booster, scaler parametri, features) kešs atmiņā ar LRU
+izstumšanu pēc skaita vai kopējā izmēra. Ieraksts tiek pārlādēts, ja modeļa faili
+(.ubj/.npz vai vecie .pkl) diskā mainās (mtime), un registry atceras simbolus,
+kuriem modeļa nav.
+Modeļi ar neatbilstošu *_schema.json (feature_pipeline) tiek atzīmēti brīdinājumā.
+Simboliem bez individuālā modeļa get_model_bundle() atgriež globālo modeli.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from config import settings
+from utils.feature_pipeline import load_schema, schema_matches
+from utils.model_io import model_files, load_model
+
+MODELS_DIR = "models"
+MAX_ENTRIES = 64                 # Maks. modeļu skaits atmiņā
+MAX_BYTES = 256 * 1024 * 1024    # Maks. kopējais modeļu failu izmērs atmiņā
+STAT_INTERVAL = 5.0              # Sekundes starp mtime pārbaudēm vienam ierakstam
+MISSING_RECHECK = 300.0          # "Nav modeļa" atmiņa (ja mapes mtime nemainās)
+
+
+def model_base_names(symbol):
+    """Iespējamie failu prefiksi: 'BTC/USDT' → BTC_USDT, BTCUSDT → BTCUSDT un BTC_USDT."""
+    names = [symbol.replace("/", "_"), symbol.replace("/", "")]
+    if "/" not in symbol and symbol.endswith("USDT"):
+        names.append(symbol[:-4] + "_USDT")
+    return list(dict.fromkeys(names))
+
+
+def model_paths(models_dir, base_name):
+    """Modeļa faili (natīvie .ubj/.npz vai vecie .pkl) vai None."""
+    return model_files(os.path.join(models_dir, base_name))
+
+
+class ModelRegistry:
+    def __init__(self, models_dir=MODELS_DIR, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.models_dir = models_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._missing = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "missing_hits": 0, "reloads": 0, "evictions": 0}
+
+    # === Iekšējās palīgfunkcijas ===
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.models_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _signature(self, paths):
+        try:
+            stats = [os.stat(p) for p in paths.values()]
+        except FileNotFoundError:
+            return None
+        return tuple(st.st_mtime_ns for st in stats), sum(st.st_size for st in stats)
+
+    def _find(self, symbol):
+        for base_name in model_base_names(symbol):
+            paths = model_paths(self.models_dir, base_name)
+            signature = self._signature(paths) if paths else None
+            if signature:
+                return base_name, paths, signature
+        return None
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry["bytes"]
+            self._stats["evictions"] += 1
+
+    # === Publiskais API ===
+    def get(self, symbol):
+        """
+        Atgriež bundle {"booster", "mean", "scale", "features", "format", "schema",
+        "base_name", "version"} vai None, ja simbolam nav pilna modeļa failu komplekta.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry and now - entry["checked_at"] < STAT_INTERVAL:
+                self._entries.move_to_end(symbol)
+                self._stats["hits"] += 1
+                return entry
+
+            missing = self._missing.get(symbol)
+            if missing and missing[0] == self._dir_mtime() and now - missing[1] < MISSING_RECHECK:
+                self._stats["missing_hits"] += 1
+                return None
+
+        found = self._find(symbol)
+
+        with self._lock:
+            if not found:
+                self._missing[symbol] = (self._dir_mtime(), now)
+                if symbol in self._entries:
+                    self._bytes -= self._entries.pop(symbol)["bytes"]
+                return None
+            self._missing.pop(symbol, None)
+
+            base_name, paths, (mtimes, size) = found
+            entry = self._entries.get(symbol)
+            if entry and entry["version"] == mtimes:
+                entry["checked_at"] = now
+                self._entries.move_to_end(symbol)
+                self._stats["hits"] += 1
+                return entry
+
+        # Ielāde ārpus slēdzenes — citi simboli netiek bloķēti
+        base_path = os.path.join(self.models_dir, base_name)
+        entry = load_model(base_path)
+        if entry is None:
+            return None
+
+        schema = load_schema(base_path)
+        if not schema_matches(schema, entry["features"]):
+            print(f"⚠️ {base_name}: modelis trenēts ar citu feature shēmu (vai bez _schema.json) — ieteicams pārtrenēt.")
+
+        entry.update(schema=schema, base_name=base_name, version=mtimes, bytes=size, checked_at=now)
+
+        with self._lock:
+            old = self._entries.pop(symbol, None)
+            if old:
+                self._bytes -= old["bytes"]
+                self._stats["reloads"] += 1
+            else:
+                self._stats["misses"] += 1
+            self._entries[symbol] = entry
+            self._bytes += size
+            self._evict()
+        return entry
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                self._missing.clear()
+                self._bytes = 0
+            else:
+                entry = self._entries.pop(symbol, None)
+                if entry:
+                    self._bytes -= entry["bytes"]
+                self._missing.pop(symbol, None)
+
+    def stats(self):
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"] + self._stats["reloads"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                known_missing=len(self._missing),
+                hit_rate=round(self._stats["hits"] / total, 3) if total else None
+            )
+
+
+# Procesa kopīgais registry
+registry = ModelRegistry()
+
+
+def get_model_bundle(symbol):
+    """
+    Individuālais simbola modelis (ja ir) ir prioritārs; citādi — globālais
+    simbolneatkarīgais modelis, ja tas ieslēgts un uztrenēts.
+    """
+    bundle = registry.get(symbol)
+    if bundle is not None:
+        return bundle
+
+    config = settings.get_ai_model_settings()
+    if config["USE_GLOBAL_MODEL"]:
+        return registry.get(config["GLOBAL_MODEL_NAME"])
+    return None
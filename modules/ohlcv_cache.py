@@ -0,0 +1,171 @@
+"""
+OHLCV Cache Module
+------------------
+Kopīgs atmiņas kešs svecēm (per simbols + timeframe), balstīts uz fiksēta izmēra
+NumPy ring buferiem. Skeneris, AI filtrs, volatilitātes novērtējums un kandidātu
+saglabāšana lasa no tā paša bufera, un katrs fetch pieprasa tikai sveces, kas
+jaunākas par pēdējo kešoto.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+DEFAULT_CAPACITY = 500   # Sveces vienā buferī
+MAX_SERIES = 600         # Maks. (simbols, timeframe) pāri atmiņā (LRU)
+MAX_AGE = 5              # Sekundes, kurās atkārtots pieprasījums neiet uz API
+
+_TIMEFRAME_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def timeframe_ms(timeframe):
+    return int(timeframe[:-1]) * _TIMEFRAME_UNITS[timeframe[-1]] * 1000
+
+
+class OHLCVRing:
+    """Fiksēta izmēra ring buferis (capacity x 6) vienai sveču sērijai."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, 6), dtype=np.float64)
+        self.start = 0
+        self.size = 0
+        self.synced_at = 0.0
+        self.lock = threading.Lock()
+
+    def last_ts(self):
+        if self.size == 0:
+            return None
+        return self.data[(self.start + self.size - 1) % self.capacity, 0]
+
+    def reset(self):
+        self.start = 0
+        self.size = 0
+
+    def grow(self, capacity):
+        rows = self.tail(self.size)
+        self.capacity = capacity
+        self.data = np.zeros((capacity, 6), dtype=np.float64)
+        self.reset()
+        self.extend(rows)
+
+    def extend(self, rows):
+        """
+        Pievieno sveces (hronoloģiskā secībā). Svece ar pēdējās sveces timestamp
+        aizvieto to (neaizvērtā svece), vecākas sveces tiek ignorētas.
+        """
+        for row in rows:
+            ts = row[0]
+            last = self.last_ts()
+            if last is not None and ts < last:
+                continue
+            if last is not None and ts == last:
+                self.data[(self.start + self.size - 1) % self.capacity] = row[:6]
+                continue
+
+            if self.size < self.capacity:
+                self.data[(self.start + self.size) % self.capacity] = row[:6]
+                self.size += 1
+            else:
+                self.data[self.start] = row[:6]
+                self.start = (self.start + 1) % self.capacity
+
+    def tail(self, n):
+        n = min(n, self.size)
+        first = (self.start + self.size - n) % self.capacity
+        idx = (first + np.arange(n)) % self.capacity
+        return self.data[idx].copy()
+
+
+_series = OrderedDict()
+_series_lock = threading.Lock()
+_stats = {"hits": 0, "incremental": 0, "full": 0}
+
+
+def _key(symbol, timeframe):
+    return symbol.replace("/", ""), timeframe
+
+
+def _get_ring(symbol, timeframe, capacity):
+    key = _key(symbol, timeframe)
+    with _series_lock:
+        ring = _series.get(key)
+        if ring is None:
+            ring = OHLCVRing(max(capacity, DEFAULT_CAPACITY))
+            _series[key] = ring
+            while len(_series) > MAX_SERIES:
+                _series.popitem(last=False)
+        else:
+            _series.move_to_end(key)
+        return ring
+
+
+def _as_rows(raw):
+    return np.asarray([[float(v) for v in c[:6]] for c in raw], dtype=np.float64).reshape(-1, 6)
+
+
+def ingest(symbol, timeframe, raw_candles):
+    """
+    Ievieto jau iegūtas sveces (piem. no skenera klines) kešā bez API pieprasījuma.
+    Ja starp kešu un jaunajām svecēm ir robs, buferis tiek sākts no jauna.
+    """
+    rows = _as_rows(raw_candles)
+    if len(rows) == 0:
+        return
+
+    ring = _get_ring(symbol, timeframe, DEFAULT_CAPACITY)
+    with ring.lock:
+        last = ring.last_ts()
+        if last is not None and rows[0, 0] > last + timeframe_ms(timeframe):
+            ring.reset()
+        ring.extend(rows)
+
+
+def get_ohlcv(exchange, symbol, timeframe="5m", limit=300, max_age=MAX_AGE):
+    """
+    📦 Atgriež pēdējās `limit` sveces kā NumPy masīvu (n x 6, vecākā → jaunākā).
+    Ja kešā pietiek sveču, pieprasa tikai jaunākās par pēdējo kešoto (since=...).
+    """
+    ring = _get_ring(symbol, timeframe, limit)
+
+    with ring.lock:
+        if ring.capacity < limit:
+            ring.grow(limit)
+
+        now = time.time()
+        if ring.size >= limit and now - ring.synced_at < max_age:
+            _stats["hits"] += 1
+            return ring.tail(limit)
+
+        last = ring.last_ts()
+        tf_ms = timeframe_ms(timeframe)
+        missing = (now * 1000 - last) // tf_ms + 1 if last is not None else limit
+
+        if ring.size >= limit and missing < limit:
+            raw = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=int(last), limit=int(missing) + 1)
+            _stats["incremental"] += 1
+        else:
+            raw = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+            ring.reset()
+            _stats["full"] += 1
+
+        ring.extend(_as_rows(raw))
+        ring.synced_at = now
+        return ring.tail(limit)
+
+
+def get_ohlcv_frame(exchange, symbol, timeframe="5m", limit=300, max_age=MAX_AGE):
+    """Tas pats, kas get_ohlcv(), bet kā DataFrame ar standarta OHLCV kolonnām."""
+    df = pd.DataFrame(get_ohlcv(exchange, symbol, timeframe, limit, max_age), columns=OHLCV_COLUMNS)
+    df["timestamp"] = df["timestamp"].astype("int64")
+    return df
+
+
+def cache_stats():
+    with _series_lock:
+        return dict(_stats, series=len(_series))
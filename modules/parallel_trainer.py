@@ -0,0 +1,227 @@
+"""
+Parallel Trainer Module
+-----------------------
+Simbolu AI modeļu trenēšana vairākos procesos. Katrs darba process trenē pa vienam
+simbolam (XGBoost ar ierobežotu pavedienu skaitu), vecāka process sadala darbu,
+aptur simbolus, kas pārsniedz laika limitu, un pieraksta kļūdas logā — viena
+simbola kļūme vai uzkāršanās neaptur pārējos.
+"""
+
+import io
+import os
+import time
+import traceback
+import multiprocessing as mp
+from collections import deque
+from contextlib import redirect_stdout, redirect_stderr
+from datetime import datetime
+from multiprocessing.connection import wait
+
+from config import settings
+
+
+def _worker(conn, options):
+    """Darba process: saņem simbolus no conn, atgriež rezultātu dict. None → beigas."""
+    xgb_threads = options["xgb_threads"]
+    # Pirms xgboost/numpy importa, lai arī OpenMP neaizņem visus kodolus
+    os.environ["OMP_NUM_THREADS"] = str(xgb_threads)
+    from modules.ai_trainer import train_ai_model, MARKET_DATA_DIR
+
+    exchange = None
+    try:
+        while True:
+            try:
+                symbol = conn.recv()
+            except EOFError:
+                break
+            if symbol is None:
+                break
+
+            start = time.perf_counter()
+            output = io.StringIO()
+            mode, error = None, None
+            try:
+                with redirect_stdout(output), redirect_stderr(output):
+                    if options["data_source"] == "local":
+                        trained = train_ai_model(symbol, n_jobs=xgb_threads, data_dir=MARKET_DATA_DIR,
+                                                 incremental=options["incremental"])
+                    else:
+                        if exchange is None:
+                            from modules.exchange_factory import get_exchange
+                            exchange = get_exchange()
+                        trained = train_ai_model(symbol, exchange, n_jobs=xgb_threads,
+                                                 incremental=options["incremental"])
+                ok, mode = trained["ok"], trained["mode"]
+                if not ok:
+                    error = trained.get("error") or "train_ai_model neizdevās"
+            except Exception:
+                ok = False
+                error = traceback.format_exc()
+
+            conn.send({
+                "symbol": symbol,
+                "ok": ok,
+                "mode": mode,
+                "seconds": time.perf_counter() - start,
+                "error": error,
+                "output": output.getvalue()
+            })
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+
+
+def _start_worker(ctx, options):
+    parent_conn, child_conn = ctx.Pipe()
+    process = ctx.Process(target=_worker, args=(child_conn, options), daemon=True)
+    process.start()
+    child_conn.close()
+    return {"process": process, "conn": parent_conn, "symbol": None, "started": None}
+
+
+def _stop_worker(slot, graceful=True):
+    process = slot["process"]
+    if graceful:
+        try:
+            slot["conn"].send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        process.join(timeout=5)
+    if process.is_alive():
+        process.terminate()
+        process.join(timeout=5)
+    slot["conn"].close()
+
+
+def _log_failure(path, result, tail_chars):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as logf:
+        logf.write(f"[{datetime.now()}] {result['symbol']}: {result['error'].strip()}\n")
+        tail = (result.get("output") or "")[-tail_chars:].strip()
+        if tail:
+            logf.write("    " + tail.replace("\n", "\n    ") + "\n")
+
+
+def _format_eta(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def train_symbols_parallel(symbols, workers=None, xgb_threads=None, timeout=None,
+                           error_log=None, on_result=None, data_source=None, incremental=None):
+    """
+    🧠 Trenē simbolu modeļus paralēli.
+    on_result(result) tiek izsaukts vecāka procesā pēc katra simbola
+    (result: symbol, ok, mode, seconds, error, timed_out; mode — train_ai_model režīms:
+    full / incremental / skip / rejected / failed, None → process neatbildēja).
+    Atgriež kopsavilkuma dict ar visiem rezultātiem un caurlaidību.
+    """
+    config = settings.get_training_settings()
+    workers = workers or config["WORKERS"]
+    xgb_threads = xgb_threads or config["XGB_THREADS"]
+    timeout = timeout or config["TIMEOUT"]
+    error_log = error_log or config["ERROR_LOG"]
+    data_source = data_source or config["DATA_SOURCE"]
+    incremental = config["INCREMENTAL"] if incremental is None else incremental
+    options = {"xgb_threads": xgb_threads, "data_source": data_source, "incremental": incremental}
+
+    symbols = list(dict.fromkeys(symbols))
+    total = len(symbols)
+    report = {"total": total, "trained": 0, "failed": 0, "timed_out": 0, "results": []}
+    if not symbols:
+        report.update(wall_seconds=0.0, train_seconds=0.0, symbols_per_min=0.0, speedup=0.0)
+        return report
+
+    workers = min(workers, total)
+    print(f"⚙️ Paralēlā trenēšana: {total} simboli | procesi: {workers} | "
+          f"XGBoost pavedieni/procesā: {xgb_threads} | limits: {timeout}s/simbolam | dati: {data_source}"
+          f"{' | inkrementāli' if incremental else ''}")
+
+    ctx = mp.get_context()
+    queue = deque(symbols)
+    start = time.perf_counter()
+    slots = [_start_worker(ctx, options) for _ in range(workers)]
+
+    def finish(result):
+        report["results"].append(result)
+        if result["ok"]:
+            report["trained"] += 1
+        else:
+            report["failed"] += 1
+            report["timed_out"] += int(result.get("timed_out", False))
+            _log_failure(error_log, result, config["LOG_TAIL_CHARS"])
+
+        done = len(report["results"])
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed * 60 if elapsed > 0 else 0.0
+        eta = (total - done) / (done / elapsed) if done else 0
+        status = "✅" if result["ok"] else ("⏱️" if result.get("timed_out") else "❌")
+        mode = f" {result['mode']}" if result["ok"] and result["mode"] else ""
+        print(f"[{done}/{total}] {status} {result['symbol']}{mode} ({result['seconds']:.1f}s) | "
+              f"{rate:.1f} simboli/min | ETA ~{_format_eta(eta)}")
+
+        if on_result:
+            on_result(result)
+
+    try:
+        while True:
+            # === Brīvajiem procesiem nākamais simbols
+            for slot in slots:
+                if slot["symbol"] is None and queue:
+                    slot["symbol"] = queue.popleft()
+                    slot["started"] = time.perf_counter()
+                    slot["conn"].send(slot["symbol"])
+
+            busy = [slot for slot in slots if slot["symbol"] is not None]
+            if not busy:
+                break
+
+            ready = wait([slot["conn"] for slot in busy], timeout=1.0)
+            now = time.perf_counter()
+
+            for slot in busy:
+                symbol = slot["symbol"]
+                if slot["conn"] in ready:
+                    try:
+                        result = slot["conn"].recv()
+                    except (EOFError, OSError):
+                        # Process nomira (piem. atmiņas trūkums) → aizvietojam ar jaunu
+                        slot["process"].join(timeout=1)
+                        exitcode = slot["process"].exitcode
+                        result = {"symbol": symbol, "ok": False, "seconds": now - slot["started"],
+                                  "error": f"darba process beidzās negaidīti (exitcode={exitcode})"}
+                        _stop_worker(slot, graceful=False)
+                        slots[slots.index(slot)] = slot = _start_worker(ctx, options)
+                elif now - slot["started"] > timeout:
+                    result = {"symbol": symbol, "ok": False, "seconds": now - slot["started"],
+                              "timed_out": True, "error": f"pārsniegts laika limits ({timeout}s)"}
+                    _stop_worker(slot, graceful=False)
+                    slots[slots.index(slot)] = slot = _start_worker(ctx, options)
+                else:
+                    continue
+
+                slot["symbol"] = None
+                result.setdefault("timed_out", False)
+                result.setdefault("mode", None)
+                finish(result)
+    finally:
+        for slot in slots:
+            _stop_worker(slot, graceful=slot["symbol"] is None)
+
+    wall = time.perf_counter() - start
+    train_seconds = sum(r["seconds"] for r in report["results"])
+    report.update(
+        wall_seconds=round(wall, 2),
+        train_seconds=round(train_seconds, 2),
+        symbols_per_min=round(len(report["results"]) / wall * 60, 2) if wall > 0 else 0.0,
+        speedup=round(train_seconds / wall, 2) if wall > 0 else 0.0
+    )
+
+    print(f"\n📊 Trenēšanas atskaite: ✅ {report['trained']} | ❌ {report['failed']} "
+          f"(t.sk. ⏱️ {report['timed_out']}) | Kopā: {total}")
+    print(f"⏱️ Ilgums: {_format_eta(wall)} | {report['symbols_per_min']} simboli/min | "
+          f"Paralēlisma ieguvums: x{report['speedup']}")
+    if report["failed"]:
+        print(f"📝 Kļūdas pierakstītas: {error_log}")
+    return report
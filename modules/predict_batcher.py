@@ -0,0 +1,79 @@
+"""
+Predict Batcher Module
+----------------------
+Oportūnistiska predict izsaukumu apvienošana starp pavedieniem. Kandidāti tiek
+novērtēti katrs savā pavedienā (straumējot), bet, ja vairāki pavedieni vienlaicīgi
+prasa prognozi tam pašam modelim, tie tiek izpildīti vienā predict izsaukumā:
+    - pirmais pieprasījums modelim uzreiz izpilda predict (bez gaidīšanas uz citiem)
+    - kamēr tas notiek, nākamie pieprasījumi tam pašam modelim sakrājas rindā
+    - pēc izsaukuma pirmais rindā esošais kļūst par vadītāju un izpilda visu rindu vienā partijā
+"""
+
+import threading
+
+
+class PredictBatcher:
+    def __init__(self, predict_fn):
+        """predict_fn(model, rows) → secība ar vienu rezultātu katrai rindai (vai None visiem)."""
+        self._predict_fn = predict_fn
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._busy = set()
+        self._calls = 0
+        self._rows = 0
+
+    def predict(self, key, model, row):
+        """Prognoze vienai rindai; key identificē modeli (piem. (base_name, version))."""
+        request = {"row": row, "event": threading.Event(), "done": False, "result": None, "error": None}
+        with self._lock:
+            self._queues.setdefault(key, []).append(request)
+            lead = key not in self._busy
+            if lead:
+                self._busy.add(key)
+
+        if not lead:
+            request["event"].wait()
+            if request["done"]:
+                return self._unwrap(request)
+            # Iepriekšējais vadītājs beidza — šis pieprasījums izpilda rindu
+
+        with self._lock:
+            batch = self._queues.pop(key)
+            self._calls += 1
+            self._rows += len(batch)
+
+        try:
+            output = self._predict_fn(model, [item["row"] for item in batch])
+            results = [None] * len(batch) if output is None else list(output)
+            if len(results) != len(batch):
+                raise ValueError(f"predict atgrieza {len(results)} rezultātus {len(batch)} rindām")
+            for item, result in zip(batch, results):
+                item["result"] = result
+        except Exception as e:
+            for item in batch:
+                item["error"] = e
+
+        for item in batch:
+            item["done"] = True
+            if item is not request:
+                item["event"].set()
+
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                queue[0]["event"].set()
+            else:
+                self._busy.discard(key)
+
+        return self._unwrap(request)
+
+    @staticmethod
+    def _unwrap(request):
+        if request["error"] is not None:
+            raise request["error"]
+        return request["result"]
+
+    def stats(self):
+        with self._lock:
+            calls, rows = self._calls, self._rows
+        return {"calls": calls, "rows": rows, "avg_batch": round(rows / calls, 2) if calls else 0.0}
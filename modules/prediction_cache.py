@@ -0,0 +1,67 @@
+"""
+Prediction Cache Module
+-----------------------
+AI prognožu kešs ar atslēgu (simbols, modelis + versija, pēdējās aizvērtās sveces
+timestamp). Prognoze balstās tikai uz aizvērtām svecēm, tāpēc tās pašas sveces
+laikā tā nevar mainīties — atkārtots ai_filter izlaiž OHLCV, features un predict.
+Ieraksts beidzas nākamās sveces robežā.
+"""
+
+import time
+import threading
+
+from modules.ohlcv_cache import timeframe_ms
+
+
+def last_closed_candle_ts(timeframe, now=None):
+    """Pēdējās pilnībā aizvērtās sveces sākuma timestamp (ms)."""
+    tf_ms = timeframe_ms(timeframe)
+    now_ms = int((time.time() if now is None else now) * 1000)
+    return (now_ms // tf_ms) * tf_ms - tf_ms
+
+
+class PredictionCache:
+    def __init__(self, timeframe):
+        self.timeframe = timeframe
+        self.tf_ms = timeframe_ms(timeframe)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _expires_at(self, candle_ts):
+        # Sveces candle_ts nākamā svece aizveras candle_ts + 2 * tf → prognoze novecojusi
+        return (candle_ts + 2 * self.tf_ms) / 1000
+
+    def get(self, symbol, model_key, candle_ts):
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry and entry[0] == (model_key, candle_ts) and time.time() < entry[1]:
+                self._stats["hits"] += 1
+                return entry[2]
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, symbol, model_key, candle_ts, value):
+        now = time.time()
+        with self._lock:
+            self._entries[symbol] = ((model_key, candle_ts), self._expires_at(candle_ts), value)
+            # Novecojušo ierakstu tīrīšana (simboli, kas vairs nav hype sarakstā)
+            if len(self._entries) > 256:
+                for key in [k for k, e in self._entries.items() if e[1] <= now]:
+                    del self._entries[key]
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    def stats(self):
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                hit_rate=round(self._stats["hits"] / total, 3) if total else None
+            )
@@ -1,11 +1,11 @@
 import os
+import math
 import time
-import pandas as pd
 from config import settings
 from utils.file_helpers import load_json, save_json
 from utils.telegram_alerts import send_telegram_message
 from utils.trade_logger import log_trade, log_test_trade
-from utils.indicators import compute_atr
+from utils.streaming_indicators import live_indicators
 from modules.adaptive_trade_helper import get_adaptive_tp_sl
 
 TRACKED_TOKENS_FILE = (
@@ -23,11 +23,10 @@ def track_token(symbol, exchange):
     strategy = tracked[symbol]["strategy"]
 
     try:
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe='5m', limit=100)
-        df = pd.DataFrame(ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        atr_series = compute_atr(df)
-        atr_value = atr_series.dropna().iloc[-1]
-        current_price = df["close"].iloc[-1]
+        values = live_indicators(exchange, symbol, timeframe='5m', limit=100)
+        atr_value, current_price = values["atr"], values["close"]
+        if math.isnan(atr_value) or not current_price:
+            raise ValueError("nepietiek sveču ATR aprēķinam")
         volatility = atr_value / current_price
 
         confidence = tracked[symbol].get("ai_confidence", 0.85)
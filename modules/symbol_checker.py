@@ -1,38 +1,174 @@
-import ccxt
 import json
 import os
 import time
+import threading
+from modules.exchange_factory import load_markets
 
 VALID_SYMBOLS_FILE = "data/valid_symbols.json"
+INDEX_TTL = 6 * 3600  # Sekundes, pēc kurām indekss tiek atjaunots fonā
+MISS_REFRESH_INTERVAL = 300  # Min. sekundes starp indeksa atjaunošanām, ko izraisa nezināms simbols
+MISS_RECHECK = 300  # Sekundes, cik ilgi atcerēties ticker pārbaudes rezultātu nezināmam simbolam
+
+# Atmiņas indekss: gan "BTC/USDT", gan "BTCUSDT" → tirgus info
+_index = {}
+_meta = {"updated_at": 0.0, "refreshing": False, "miss_refresh_at": 0.0}
+_misses = {}  # Simboli, kuru nav indeksā → (checked_at, valid) no ticker pārbaudes
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+def _market_entry(market):
+    limits = market.get("limits") or {}
+    precision = market.get("precision") or {}
+    return {
+        "valid": bool(market.get("spot", True)) and market.get("active") is not False,
+        "symbol": market.get("symbol"),
+        "id": market.get("id"),
+        "min_amount": (limits.get("amount") or {}).get("min"),
+        "min_cost": (limits.get("cost") or {}).get("min"),
+        "amount_precision": precision.get("amount")
+    }
 
 def load_valid_symbols():
-    if os.path.exists(VALID_SYMBOLS_FILE):
+    """Nolasa saglabāto indeksu: (symbols, updated_at). Vecais {symbol: bool} formāts → novecojis."""
+    if not os.path.exists(VALID_SYMBOLS_FILE):
+        return {}, 0.0
+    try:
         with open(VALID_SYMBOLS_FILE, "r") as f:
-            return json.load(f)
-    return {}
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️ Nevar nolasīt {VALID_SYMBOLS_FILE}: {e}")
+        return {}, 0.0
 
-def save_valid_symbols(valid_symbols):
-    with open(VALID_SYMBOLS_FILE, "w") as f:
-        json.dump(valid_symbols, f, indent=4)
+    if isinstance(data, dict) and "symbols" in data:
+        return data["symbols"], data.get("updated_at", 0.0)
 
-def is_symbol_valid(symbol, exchange):
-    valid_symbols = load_valid_symbols()
+    legacy = {s: {"valid": bool(v)} for s, v in data.items()} if isinstance(data, dict) else {}
+    return legacy, 0.0
+
+def save_valid_symbols(symbols, updated_at):
+    os.makedirs(os.path.dirname(VALID_SYMBOLS_FILE), exist_ok=True)
+    tmp_path = VALID_SYMBOLS_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"updated_at": updated_at, "symbols": symbols}, f)
+    os.replace(tmp_path, VALID_SYMBOLS_FILE)
+
+def build_symbol_index(exchange, reload=False, persist=True):
+    """
+    🗂️ Izveido tirgojamo simbolu indeksu no exchange.markets (status, spot/active, limiti)
+    un vienā reizē saglabā to diskā.
+    """
+    if reload or not exchange.markets:
+        load_markets(exchange, reload=reload)
+
+    symbols = {}
+    for market in exchange.markets.values():
+        entry = _market_entry(market)
+        symbols[market["symbol"]] = entry
+
+    updated_at = time.time()
+    _install(symbols, updated_at)
+
+    if persist:
+        try:
+            save_valid_symbols(symbols, updated_at)
+        except Exception as e:
+            print(f"⚠️ Neizdevās saglabāt simbolu indeksu: {e}")
+
+    valid = sum(1 for e in symbols.values() if e["valid"])
+    print(f"🗂️ Simbolu indekss atjaunots: {valid}/{len(symbols)} tirgojami")
+    return symbols
+
+def _install(symbols, updated_at):
+    """Jaunais indekss tiek uzbūvēts atsevišķi un nomainīts vienā piešķīrumā — lasītāji bez
+    locka redz vai nu veco, vai jauno indeksu, nekad tukšu."""
+    global _index
+    index = {}
+    for symbol, entry in symbols.items():
+        index[symbol] = entry
+        index[entry.get("id") or symbol.replace("/", "")] = entry
+    with _lock:
+        _index = index
+        _meta["updated_at"] = updated_at
+        _misses.clear()
 
-    if symbol in valid_symbols:
-        return valid_symbols[symbol]
+def _refresh_in_background(exchange):
+    with _lock:
+        if _meta["refreshing"]:
+            return
+        _meta["refreshing"] = True
+
+    def worker():
+        try:
+            build_symbol_index(exchange, reload=True)
+        except Exception as e:
+            print(f"⚠️ Simbolu indeksa fona atjaunošana neizdevās: {e}")
+        finally:
+            with _lock:
+                _meta["refreshing"] = False
+
+    threading.Thread(target=worker, daemon=True).start()
+
+def _ensure_index(exchange):
+    if not _index:
+        with _build_lock:
+            if not _index:
+                symbols, updated_at = load_valid_symbols()
+                if symbols and time.time() - updated_at < INDEX_TTL:
+                    _install(symbols, updated_at)
+                else:
+                    build_symbol_index(exchange)
+                    return
+
+    if time.time() - _meta["updated_at"] >= INDEX_TTL:
+        _refresh_in_background(exchange)
+
+def _check_unindexed(symbol, exchange):
+    """
+    Simbols nav indeksā (piem. jauns listings pēc pēdējās tirgu ielādes):
+        - ne biežāk kā reizi MISS_REFRESH_INTERVAL fonā tiek pārlādēti tirgi un indekss
+        - līdz tam vienreizēja ticker pārbaude (rezultāts tiek atcerēts MISS_RECHECK sekundes)
+    """
+    now = time.time()
+    with _lock:
+        refresh = now - _meta["miss_refresh_at"] >= MISS_REFRESH_INTERVAL
+        if refresh:
+            _meta["miss_refresh_at"] = now
+        cached = _misses.get(symbol)
+    if refresh:
+        _refresh_in_background(exchange)
+    if cached and now - cached[0] < MISS_RECHECK:
+        return cached[1]
 
-    # Test: izveido nelielu limitu ordera pieprasījumu
     try:
         exchange.fetch_ticker(symbol)
-        time.sleep(0.3)
-        # Uzskata, ka, ja ticker pieejams, tirgojams
-        valid_symbols[symbol] = True
-        save_valid_symbols(valid_symbols)
-        print(f"✅ Validēts simbols: {symbol}")
-        return True
+        valid = True
+        print(f"✅ {symbol} nav indeksā, bet ticker pieejams — uzskatām par tirgojamu.")
+    except Exception as e:
+        valid = False
+        print(f"❌ {symbol} nav atrasts MEXC tirgu sarakstā: {e}")
 
+    with _lock:
+        _misses[symbol] = (now, valid)
+    return valid
+
+def is_symbol_valid(symbol, exchange):
+    """
+    O(1) pārbaude pēc atmiņas indeksa. Simbols, kura nav indeksā → _check_unindexed();
+    indekss nav pieejams (tīkla kļūda) → False.
+    """
+    try:
+        _ensure_index(exchange)
     except Exception as e:
-        print(f"❌ {symbol} nav tirgojams: {e}")
-        valid_symbols[symbol] = False
-        save_valid_symbols(valid_symbols)
+        print(f"❌ {symbol} nevar pārbaudīt — simbolu indekss nav pieejams: {e}")
         return False
+
+    index = _index
+    entry = index.get(symbol) or index.get(symbol.replace("/", ""))
+    if entry is None:
+        return _check_unindexed(symbol, exchange)
+    return entry["valid"]
+
+def get_symbol_limits(symbol):
+    """Atgriež indeksēto tirgus info (min_amount, min_cost, precizitāte) vai None."""
+    index = _index
+    return index.get(symbol) or index.get(symbol.replace("/", ""))
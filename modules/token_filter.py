@@ -1,6 +1,6 @@
 from config import settings
 
-def classify_token(token):
+def classify_token(token, snapshot=None):
     """
     🚦 Klasificē tokenu pēc 5m pieauguma:
     - < MIN_GAIN_5M → Atmet
@@ -8,14 +8,19 @@ def classify_token(token):
     - ≥ AGGRESSIVE_THRESHOLD → Agresīvā stratēģija
     - Ja volume pēkšņi ļoti liels (mirušais tokens) → revival
     - Citādi → Vienkāršā stratēģija
+
+    snapshot: cikla iestatījumi (settings.build_settings_snapshot()), lai katram
+    tokenam netiktu no jauna nolasīti kritēriji un sentiments.
     """
 
     try:
-        market = settings.get_market_criteria()
+        if snapshot is None:
+            snapshot = settings.build_settings_snapshot()
+        market = snapshot["MARKET"]
 
         min_gain = market["MIN_GAIN_5M"]
         min_volume = market["MIN_VOLUME_24H"]
-        min_safety = 0.01 if settings.is_test_mode() else 0.05
+        min_safety = snapshot["MIN_SAFETY"]
         aggressive_threshold = market["AGGRESSIVE_THRESHOLD"]
 
         gain = token.get("price_change_5m", 0)
@@ -43,7 +48,7 @@ def classify_token(token):
             return "aggressive"
             
         # ✅ JAUNS BLOKS: Momentum stratēģija
-        momentum_multiplier = settings.market_momentum_gain_multiplier()
+        momentum_multiplier = snapshot["MOMENTUM_GAIN_MULTIPLIER"]
         if volume >= min_volume and 2 <= volume_change < 5 and gain >= (min_gain * momentum_multiplier):
 
             print(f"⚡ Token {token['symbol']} klasificēts kā momentum_safe")
@@ -1,6 +1,6 @@
 import os
+import math
 import time
-import pandas as pd
 from filelock import FileLock
 from datetime import datetime
 
@@ -8,9 +8,10 @@ from config import settings
 from utils.file_helpers import load_json, save_json
 from utils.telegram_alerts import send_telegram_message
 from utils.trade_logger import log_trade, log_test_trade
-from utils.indicators import compute_atr
+from utils.streaming_indicators import live_indicators
 from modules.adaptive_trade_helper import get_adaptive_tp_sl
 from utils.volatility_logger import log_volatility
+from utils.metrics import timed, timed_fn, incr
 
 def extract_filled_amount(order):
     """
@@ -46,11 +47,14 @@ def extract_filled_amount(order):
         print(f"🚫 Kļūda extract_filled_amount(): {e}")
         return 0.0
 
-def calculate_dynamic_budget(token, ai_confidence=0.85, safety_score=0.5):
+def calculate_dynamic_budget(token, ai_confidence=0.85, safety_score=0.5, snapshot=None):
     base = 2
     gain = token.get("price_change_5m", 0)
     strategy = token.get("strategy", "simple")
-    max_usdt = settings.trade_max_usdt()
+    if snapshot:
+        max_usdt = snapshot["TRADE_LIMITS"]["MAX_USDT_BALANCE"]
+    else:
+        max_usdt = settings.trade_max_usdt()
 
     confidence_bonus = max(0, (ai_confidence - 0.85) * 10)
     safety_bonus = max(0, (safety_score - 0.5) * 4)
@@ -61,11 +65,11 @@ def calculate_dynamic_budget(token, ai_confidence=0.85, safety_score=0.5):
 
 def estimate_volatility(symbol, exchange):
     try:
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe='5m', limit=50)
-        df = pd.DataFrame(ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        atr_series = compute_atr(df)
-        atr = atr_series.dropna().iloc[-1]
-        close = df["close"].iloc[-1]
+        # ATR no streaming stāvokļa: pēc uzsildīšanas katra jauna svece maksā O(1)
+        values = live_indicators(exchange, symbol, timeframe='5m', limit=50)
+        atr, close = values["atr"], values["close"]
+        if math.isnan(atr) or not close:
+            raise ValueError("nepietiek sveču ATR aprēķinam")
         volatility = atr / close
 
         if volatility < 0.005:
@@ -76,14 +80,18 @@ def estimate_volatility(symbol, exchange):
         print(f"⚠️ Neizdevās noteikt volatilitāti {symbol}: {e}")
         return 0.03
 
-def buy_token(token, exchange, confidence=0.85, safety_score=0.5):
+@timed_fn("buy.total")
+def buy_token(token, exchange, confidence=0.85, safety_score=0.5, snapshot=None):
     symbol = token['symbol']
     last_price = token['last_price']
     strategy = token['strategy']
 
-    usdt_amount = calculate_dynamic_budget(token, confidence, safety_score)
-    volatility = estimate_volatility(symbol, exchange)
-    log_volatility(symbol, volatility)
+    # Snapshot nosaka budžeta limitus; TEST_MODE tiek pārbaudīts tieši pirms ordera,
+    # lai režīma maiņa cikla vidū nekad nenovestu pie reāla pirkuma.
+    usdt_amount = calculate_dynamic_budget(token, confidence, safety_score, snapshot=snapshot)
+    with timed("buy.volatility"):
+        volatility = estimate_volatility(symbol, exchange)
+        log_volatility(symbol, volatility)
 
     tp_multipliers, sl_threshold = get_adaptive_tp_sl(confidence, volatility, strategy)
 
@@ -131,7 +139,8 @@ def buy_token(token, exchange, confidence=0.85, safety_score=0.5):
         # === LIVE MODE
         tracked_file = "data/tracked_tokens.json"
 
-        balance = exchange.fetch_balance()
+        with timed("buy.balance"):
+            balance = exchange.fetch_balance()
         available = balance.get("USDT", {}).get("free", 0)
 
         if available < usdt_amount:
@@ -146,14 +155,17 @@ def buy_token(token, exchange, confidence=0.85, safety_score=0.5):
 
         print(f"🛒 BUY {symbol} | Cena: {last_price:.4f} | Požītais daudzums: {amount:.6f}")
 
-        order = exchange.create_market_order(symbol, 'buy', amount)
+        with timed("buy.order"):
+            order = exchange.create_market_order(symbol, 'buy', amount)
         order_id = order.get("id")
+        incr("buy.orders")
 
-        # ⏳ Gaidām nelielu brīdi, lai birža apstrādā orderi korekti
-        time.sleep(1.5)
+        with timed("buy.confirm"):
+            # ⏳ Gaidām nelielu brīdi, lai birža apstrādā orderi korekti
+            time.sleep(1.5)
 
-        # 🔄 Iegūstam atjauninātu ordera statusu no MEXC
-        order_info = exchange.fetch_order(order_id, symbol)
+            # 🔄 Iegūstam atjauninātu ordera statusu no MEXC
+            order_info = exchange.fetch_order(order_id, symbol)
         filled = extract_filled_amount(order_info)
         real_price = order_info.get("average") or last_price
         status = order_info.get("status", "").lower()
@@ -1,7 +1,6 @@
 import time
 import os
 import math
-import ccxt
 from dotenv import load_dotenv
 from collections import deque
 from filelock import FileLock
@@ -17,12 +16,11 @@ from utils.trade_logger import log_trade, log_test_trade
 from data.trade_summary import summarize_trades
 from modules.adaptive_trade_helper import get_adaptive_tp_sl
 
+from modules.exchange_factory import get_exchange
+from utils.metrics import timed, observe, flush_metrics
+
 load_dotenv()
-exchange = ccxt.mexc({
-    'apiKey': os.getenv("MEXC_API_KEY"),
-    'secret': os.getenv("MEXC_API_SECRET"),
-    'enableRateLimit': True
-})
+exchange = None  # Klients tiek izveidots ciklā — tirgu ielādes kļūda neaptur tracker startu
 
 def log(msg):
     print(msg, flush=True)
@@ -85,12 +83,31 @@ def get_min_amount(symbol):
     market = exchange.market(symbol)
     return market.get('limits', {}).get('amount', {}).get('min', 0.01)
 
+def on_mode_change(old_state, new_state):
+    if old_state.get("TEST_MODE") != new_state.get("TEST_MODE"):
+        mode = "TEST_MODE" if new_state.get("TEST_MODE") else "LIVE"
+        print(f"🔀 Režīms pārslēgts uz {mode} — nākamā pārbaude izmantos atbilstošo tracked failu.")
+
+settings.on_state_change(on_mode_change)
+
 while True:
     try:
-        prefix = "[TEST_MODE] " if settings.is_test_mode() else "[LIVE] "
+        if exchange is None:
+            try:
+                exchange = get_exchange()  # Kopīgs klients + tirgi no diska keša
+            except Exception as e:
+                print(f"⚠️ Neizdevās ielādēt tirgus: {e} — mēģināsim vēlreiz pēc 60s.")
+                time.sleep(60)
+                continue
+
+        tick_start = time.perf_counter()
+
+        # Režīmu nolasām vienreiz katrā ciklā (state.json kešots atmiņā)
+        test_mode = settings.is_test_mode()
+        prefix = "[TEST_MODE] " if test_mode else "[LIVE] "
         print(f"\n🔍 {prefix}Pārbaudām aktīvās pozīcijas...")
 
-        TRACKED_TOKENS_FILE = "data/test_tracked_tokens.json" if settings.is_test_mode() else "data/tracked_tokens.json"
+        TRACKED_TOKENS_FILE = "data/test_tracked_tokens.json" if test_mode else "data/tracked_tokens.json"
 
         lock = FileLock(TRACKED_TOKENS_FILE + ".lock")
         with lock:
@@ -99,7 +116,8 @@ while True:
 
             for symbol, info in list(tracked.items()):
                 try:
-                    ticker = exchange.fetch_ticker(symbol)
+                    with timed("tracker.ticker"):
+                        ticker = exchange.fetch_ticker(symbol)
                     current_price = float(ticker['last'])
                     buy_price = info['buy_price']
                     amount = info['amount']
@@ -115,7 +133,8 @@ while True:
 
                     # === Dinamisks SL un TP pārrēķins ===
                     try:
-                        ohlcv = exchange.fetch_ohlcv(symbol, timeframe="5m", limit=6)
+                        with timed("tracker.ohlcv"):
+                            ohlcv = exchange.fetch_ohlcv(symbol, timeframe="5m", limit=6)
                         ranges = [(c[2] - c[3]) / c[4] for c in ohlcv[-5:] if c[4] > 0]
                         volatility = sum(ranges) / len(ranges) if ranges else 0.03
 
@@ -155,7 +174,7 @@ while True:
                                 print(f"⚠️ {symbol} — Pārdošanas daudzums {portion_amount} mazāks par minimālo ({min_amount}), izlaižam.")
                                 continue
 
-                            if settings.is_test_mode():
+                            if test_mode:
                                 print(f"🧪 Simulēta pārdošana {symbol} @ {current_price:.4f} | {reason}")
                                 log_test_trade({
                                     "symbol": symbol,
@@ -167,7 +186,8 @@ while True:
                                 })
                             else:
                                 print(f"💰 Reāla pārdošana {symbol} @ {current_price:.4f} | {reason}")
-                                exchange.create_market_sell_order(symbol, portion_amount)
+                                with timed("tracker.sell_order"):
+                                    exchange.create_market_sell_order(symbol, portion_amount)
                                 log_trade({
                                     "symbol": symbol,
                                     "type": "sell",
@@ -206,7 +226,7 @@ while True:
                                 if portion_amount < min_amount:
                                     print(f"⚠️ {symbol} — Pārdošanas daudzums {portion_amount} mazāks par minimālo ({min_amount}), izlaižam.")
                                     continue
-                                if settings.is_test_mode():
+                                if test_mode:
                                     print(f"🧪 Dynamic TP pārdošana {symbol}")
                                     log_test_trade({
                                         "symbol": symbol,
@@ -217,7 +237,8 @@ while True:
                                         "reason": reason
                                     })
                                 else:
-                                    exchange.create_market_sell_order(symbol, portion_amount)
+                                    with timed("tracker.sell_order"):
+                                        exchange.create_market_sell_order(symbol, portion_amount)
                                     log_trade({
                                         "symbol": symbol,
                                         "type": "sell",
@@ -247,7 +268,7 @@ while True:
                                 if portion_amount < min_amount:
                                     print(f"⚠️ {symbol} — Pārdošanas daudzums {portion_amount} mazāks par minimālo ({min_amount}), izlaižam.")
                                     continue
-                                if settings.is_test_mode():
+                                if test_mode:
                                     print(f"🧪 Trailing Stop pārdošana {symbol}")
                                     log_test_trade({
                                         "symbol": symbol,
@@ -258,7 +279,8 @@ while True:
                                         "reason": reason
                                     })
                                 else:
-                                    exchange.create_market_sell_order(symbol, portion_amount)
+                                    with timed("tracker.sell_order"):
+                                        exchange.create_market_sell_order(symbol, portion_amount)
                                     log_trade({
                                         "symbol": symbol,
                                         "type": "sell",
@@ -279,7 +301,7 @@ while True:
                             if portion_amount < min_amount:
                                 print(f"⚠️ {symbol} — Pārdošanas daudzums {portion_amount} mazāks par minimālo ({min_amount}), izlaižam.")
                                 continue
-                            if settings.is_test_mode():
+                            if test_mode:
                                 print(f"🧪 Stop Loss pārdošana {symbol}")
                                 log_test_trade({
                                     "symbol": symbol,
@@ -290,7 +312,8 @@ while True:
                                     "reason": reason
                                 })
                             else:
-                                exchange.create_market_sell_order(symbol, portion_amount)
+                                with timed("tracker.sell_order"):
+                                    exchange.create_market_sell_order(symbol, portion_amount)
                                 log_trade({
                                     "symbol": symbol,
                                     "type": "sell",
@@ -316,9 +339,14 @@ while True:
                 
             if changed:
                 print("💾 Saglabājam izmaiņas failā...")
-                
-                save_json(TRACKED_TOKENS_FILE, tracked)
-                summarize_trades()
+
+                with timed("tracker.save"):
+                    save_json(TRACKED_TOKENS_FILE, tracked)
+                    summarize_trades()
+
+        observe("tracker.tick", time.perf_counter() - tick_start)
+        if tracked:
+            flush_metrics("tracker", extra={"positions": len(tracked)})
 
         time.sleep(30)
 
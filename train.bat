@@ -11,11 +11,15 @@ timeout /t 3 >nul
 start cmd /k python label_candidates.py
 timeout /t 3 >nul
 
-:: 3. Trenē individuālos AI modeļus no pending_training.json
+:: 3. Trenē simbolneatkarīgo globālo AI modeli no data/market_data
+start cmd /k python train_global_model.py
+timeout /t 3 >nul
+
+:: 4. Trenē individuālos AI modeļus no pending_training.json (neobligāti; simbolam aizstāj globālo)
 start cmd /k python train_pending_models.py
 timeout /t 3 >nul
 
-:: 4. Trenē globālo AI modeli no labeled_candidates.csv
+:: 5. Trenē globālo feedback modeli no labeled_candidates.csv
 start cmd /k python train_from_labeled.py
 timeout /t 3 >nul
 
@@ -1,64 +1,58 @@
 # train_all_models.py
 import os
-import pandas as pd
-import ccxt
-from dotenv import load_dotenv
-from modules.ai_trainer import train_ai_model
+import sys
+from modules.model_registry import model_base_names
+from modules.parallel_trainer import train_symbols_parallel
+from utils.model_io import model_exists
+from utils import market_store
+from utils.feature_pipeline import OHLCV_COLUMNS
 from datetime import datetime
 
-# === Ielādē .env
-load_dotenv()
-api_key = os.getenv("MEXC_API_KEY")
-api_secret = os.getenv("MEXC_API_SECRET")
+sys.stdout.reconfigure(encoding='utf-8', line_buffering=True)
 
-exchange = ccxt.mexc({
-    'apiKey': api_key,
-    'secret': api_secret,
-    'enableRateLimit': True
-})
-
-DATA_DIR = "data/market_data"
+DATA_DIR = market_store.DATA_DIR
 MODEL_DIR = "models"
 LOG_FILE = "logs/train_all_errors.log"
-os.makedirs("logs", exist_ok=True)
 
-files = [f for f in os.listdir(DATA_DIR) if f.endswith(".csv")]
-total = len(files)
 
-print(f"📊 Atrasti {total} CSV faili. Sākam trenēšanu...\n")
+def main():
+    os.makedirs("logs", exist_ok=True)
+
+    stored = market_store.list_symbols(DATA_DIR)
+    total = len(stored)
 
-for idx, file in enumerate(files, start=1):
-    symbol = file.replace("USDT.csv", "/USDT")
-    model_path = os.path.join(MODEL_DIR, file.replace(".csv", "_model.pkl"))
+    print(f"📊 Atrasti {total} tirgus datu faili. Sākam trenēšanu...\n")
 
-    print(f"[{idx}/{total}] ⏳ Pārbaude: {symbol}")
+    symbols = []
+    for idx, symbol in enumerate(stored, start=1):
+        print(f"[{idx}/{total}] ⏳ Pārbaude: {symbol}")
 
-    # ✅ Skip already trained
-    if os.path.exists(model_path):
-        print(f"⏭️ {symbol} modelis jau eksistē. Izlaižam.")
-        continue
+        # ✅ Skip already trained
+        if any(model_exists(os.path.join(MODEL_DIR, base)) for base in model_base_names(symbol)):
+            print(f"⏭️ {symbol} modelis jau eksistē. Izlaižam.")
+            continue
 
-    # 📁 Verificē CSV failu saturu
-    csv_path = os.path.join(DATA_DIR, file)
-    try:
-        df = pd.read_csv(csv_path)
-        if df.empty or "label" not in df.columns:
-            print(f"⚠️ {symbol} — tukšs vai nederīgs fails.")
+        # 📁 Verificē faila saturu (tikai metadati)
+        try:
+            # Label netiek glabāts — to aprēķina treniņa laikā (breakout_target) no OHLCV
+            info = market_store.inspect(symbol, DATA_DIR)
+            if info is None or info["rows"] == 0 or not set(OHLCV_COLUMNS) <= set(info["columns"]):
+                print(f"⚠️ {symbol} — tukšs vai nederīgs fails.")
+                continue
+        except Exception as e:
+            print(f"❌ Kļūda lasot {symbol} datus: {e}")
+            with open(LOG_FILE, "a", encoding="utf-8") as logf:
+                logf.write(f"[{datetime.now()}] {symbol}: data read error — {e}\n")
             continue
-    except Exception as e:
-        print(f"❌ Kļūda lasot {symbol} CSV: {e}")
-        with open(LOG_FILE, "a", encoding="utf-8") as logf:
-            logf.write(f"[{datetime.now()}] {symbol}: CSV read error — {e}\n")
-        continue
 
-    # 🧠 Trenē AI modeli
-    print(f"🚀 Trenējam: {symbol}")
-    try:
-        train_ai_model(symbol, exchange)
-    except Exception as e:
-        print(f"❌ Kļūda trenējot {symbol}: {e}")
-        with open(LOG_FILE, "a", encoding="utf-8") as logf:
-            logf.write(f"[{datetime.now()}] {symbol}: Training error — {e}\n")
-        continue
+        symbols.append(symbol)
+
+    # 🧠 Trenē AI modeļus paralēli (kļūdas → LOG_FILE, pārējie simboli turpinās)
+    print(f"\n🚀 Trenējam {len(symbols)} simbolus...")
+    train_symbols_parallel(symbols, error_log=LOG_FILE)
+
+    print("\n✅ Gatavs! Visi trenējamie faili apstrādāti.")
+
 
-print("\n✅ Gatavs! Visi trenējamie faili apstrādāti.")
+if __name__ == "__main__":
+    main()
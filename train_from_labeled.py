@@ -1,6 +1,5 @@
 import os
 import pandas as pd
-import joblib
 import numpy as np
 import json
 from sklearn.model_selection import train_test_split
@@ -9,6 +8,7 @@ from sklearn.metrics import accuracy_score, precision_score, log_loss, roc_auc_s
 from sklearn.utils import resample
 import xgboost as xgb
 import sys
+from utils.model_io import save_model
 
 # Emoji un UTF-8 output atbalsts
 sys.stdout.reconfigure(encoding='utf-8', line_buffering=True)
@@ -133,9 +133,7 @@ def train_feedback_model():
     print(f"• AUC: {auc:.4f}" if auc is not None else "• AUC: nav aprēķināms")
     print(f"• LogLoss: {loss:.4f}" if loss is not None else "• LogLoss: nav aprēķināms")
 
-    joblib.dump(model, os.path.join(MODEL_DIR, "feedback_model.pkl"))
-    joblib.dump(scaler, os.path.join(MODEL_DIR, "feedback_scaler.pkl"))
-    joblib.dump(features, os.path.join(MODEL_DIR, "feedback_features.pkl"))
+    save_model(os.path.join(MODEL_DIR, "feedback"), model, scaler, features)
 
     metrics = {
         "accuracy": round(acc, 4),
@@ -149,7 +147,7 @@ def train_feedback_model():
     with open(os.path.join(MODEL_DIR, "feedback_metrics.json"), "w") as f:
         json.dump(metrics, f, indent=2)
 
-    print("📂 Saglabāts: feedback_model.pkl, scaler, features un metrics")
+    print("📂 Saglabāts: feedback_model.ubj, feedback_scaler.npz un metrics")
 
 if __name__ == "__main__":
     train_feedback_model()
\ No newline at end of file
@@ -0,0 +1,161 @@
+# train_global_model.py
+# Viens simbolneatkarīgs breakout modelis pār visiem data/market_data failiem.
+# Features: GLOBAL_FEATURE_COLUMNS (relatīvas pret close), mērķis — tā pati
+# feature_pipeline.breakout_target() kā ai_trainer (nākamo 3 sveču max >= close * 1.01,
+# rindas bez pilna nākotnes loga izmestas). Saglabā models/global_model.ubj + global_scaler.npz.
+# Individuālie simbolu modeļi (ja ir) paliek prioritāri — sk. model_registry.get_model_bundle().
+
+import os
+import sys
+import json
+import time
+import numpy as np
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+from config import settings
+from utils.feature_pipeline import (GLOBAL_FEATURE_COLUMNS, LABEL_VERSION, OHLCV_COLUMNS, breakout_target,
+                                    get_pipeline, save_schema)
+from utils.model_io import save_model
+from utils import market_store
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+sys.stdout.reconfigure(encoding='utf-8', line_buffering=True)
+
+DATA_DIR = market_store.DATA_DIR
+MODEL_DIR = "models"
+MIN_ROWS = 100            # Mazāk rindu simbolam → izlaižam
+
+
+def _rss_mb():
+    if psutil is None:
+        return None
+    return round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+
+
+def _symbol_rows(symbol, pipeline):
+    """Viena simbola OHLCV (kolonnu projekcija) → (X float32, y int8) bez NaN rindām."""
+    df = market_store.read_frame(symbol, columns=OHLCV_COLUMNS[1:], data_dir=DATA_DIR)
+    if df is None or len(df) < MIN_ROWS:
+        return None
+
+    X = pipeline.matrix(df).astype(np.float32)
+    _, y = breakout_target(df["close"])
+
+    valid = np.isfinite(X).all(axis=1) & ~np.isnan(y)
+    return X[valid], y[valid].astype(np.int8)
+
+
+def train_global_model():
+    if not os.path.exists(DATA_DIR):
+        print(f"❌ Mape {DATA_DIR} neeksistē.")
+        return None
+
+    symbols_stored = market_store.list_symbols(DATA_DIR)
+    print(f"🌐 Globālais modelis: {len(symbols_stored)} tirgus datu faili...")
+
+    start = time.perf_counter()
+    rss_start = _rss_mb()
+    pipeline = get_pipeline(GLOBAL_FEATURE_COLUMNS)
+
+    parts_X, parts_y, symbols = [], [], 0
+    for symbol in symbols_stored:
+        try:
+            rows = _symbol_rows(symbol, pipeline)
+        except Exception as e:
+            print(f"⚠️ {symbol}: {e}")
+            continue
+        if rows is None or len(rows[0]) == 0:
+            continue
+        parts_X.append(rows[0])
+        parts_y.append(rows[1])
+        symbols += 1
+
+    if not parts_X:
+        print("❌ Nav datu globālā modeļa treniņam.")
+        return None
+
+    X = np.concatenate(parts_X)
+    y = np.concatenate(parts_y)
+    del parts_X, parts_y
+    load_seconds = time.perf_counter() - start
+
+    if len(np.unique(y)) < 2:
+        print("❌ Tikai viena klase mērķī – nav iespējams trenēt.")
+        return None
+
+    print(f"🧪 Rindas: {len(X):,} | Simboli: {symbols} | Pozitīvie: {y.mean():.2%} | "
+          f"Matrica: {X.nbytes / 1024 / 1024:.1f} MB")
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X).astype(np.float32)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_scaled, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    model = xgb.XGBClassifier(
+        eval_metric='logloss',
+        tree_method='hist',
+        max_depth=6,
+        learning_rate=0.05,
+        n_estimators=300,
+        subsample=0.8,
+        colsample_bytree=0.8,
+        random_state=42
+    )
+
+    fit_start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - fit_start
+
+    y_proba = model.predict_proba(X_test)[:, 1]
+    y_pred = (y_proba > 0.5).astype(int)
+    acc = accuracy_score(y_test, y_pred)
+    loss = log_loss(y_test, y_proba)
+    auc = roc_auc_score(y_test, y_proba)
+
+    print(f"✅ Precizitāte: {acc:.4f} | LogLoss: {loss:.4f} | AUC: {auc:.4f}")
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    base_path = os.path.join(MODEL_DIR, settings.get_ai_model_settings()["GLOBAL_MODEL_NAME"])
+    save_model(base_path, model, scaler, GLOBAL_FEATURE_COLUMNS)
+    save_schema(base_path, GLOBAL_FEATURE_COLUMNS)
+
+    total_seconds = time.perf_counter() - start
+    model_bytes = sum(
+        os.path.getsize(base_path + suffix) for suffix in ("_model.ubj", "_scaler.npz")
+    )
+    metrics = {
+        "symbols": symbols,
+        "samples": int(len(X)),
+        "positive_ratio": round(float(y.mean()), 4),
+        "label_version": LABEL_VERSION,
+        "accuracy": round(acc, 4),
+        "log_loss": round(loss, 4),
+        "roc_auc": round(auc, 4),
+        "load_seconds": round(load_seconds, 2),
+        "fit_seconds": round(fit_seconds, 2),
+        "total_seconds": round(total_seconds, 2),
+        "matrix_mb": round(X.nbytes / 1024 / 1024, 2),
+        "rss_start_mb": rss_start,
+        "rss_end_mb": _rss_mb(),
+        "model_file_kb": round(model_bytes / 1024, 1)
+    }
+    with open(base_path + "_metrics.json", "w") as f:
+        json.dump(metrics, f, indent=2)
+
+    rss = f" | RSS: {metrics['rss_start_mb']} → {metrics['rss_end_mb']} MB" if psutil else ""
+    print(f"⏱️ Dati: {load_seconds:.1f}s | Treniņš: {fit_seconds:.1f}s | Kopā: {total_seconds:.1f}s{rss}")
+    print(f"💾 Saglabāts: {base_path}_model.ubj ({metrics['model_file_kb']} KB) — "
+          f"apkalpo jebkuru simbolu bez individuālā modeļa")
+    return metrics
+
+
+if __name__ == "__main__":
+    train_global_model()
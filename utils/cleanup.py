@@ -1,7 +1,6 @@
 import os
 import time
-
-MARKET_DATA_DIR = "data/market_data"
+from utils.market_store import DATA_DIR as MARKET_DATA_DIR, SUFFIXES as MARKET_DATA_SUFFIXES
 CANDIDATE_FILE = "data/candidate_tokens.csv"
 DAYS_TO_KEEP_MARKET = 3  # Tirgus datiem
 DAYS_TO_KEEP_CANDIDATE = 1  # Kandidātiem
@@ -14,9 +13,9 @@ def cleanup_old_csv_files():
 
     deleted_market = 0
 
-    # Dzēš vecos tirgus CSV failus
+    # Dzēš vecos tirgus datu failus (csv / feather / parquet)
     for filename in os.listdir(MARKET_DATA_DIR):
-        if filename.endswith(".csv"):
+        if filename.endswith(tuple(MARKET_DATA_SUFFIXES.values())):
             path = os.path.join(MARKET_DATA_DIR, filename)
             if os.path.isfile(path) and os.path.getmtime(path) < cutoff_market:
                 os.remove(path)
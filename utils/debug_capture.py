@@ -0,0 +1,194 @@
+"""
+Debug Capture Module
+--------------------
+AI filtra diagnostikas dati (OHLCV tail + pēdējās rindas features) ārpus pirkuma
+lēmuma karstā ceļa:
+    - atlase: off / sample (1 no N) / rejected / accepted / all (+ SAMPLE_EVERY)
+    - rinda + fona rakstītāja pavediens (pilnas rindas gadījumā ieraksts tiek izmests)
+    - kompakts binārs formāts ar rotāciju pēc izmēra
+
+Ieraksta formāts (little-endian), faila sākumā MAGIC:
+    <II> galvenes garums, datu garums
+    galvene: UTF-8 JSON {symbol, ts, outcome, ..., "arrays": [[vārds, dtype, shape], ...]}
+    dati: masīvu baiti galvenē norādītajā secībā
+
+Nolasīšana:
+    python -m utils.debug_capture debug_data/ai_capture.bin
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import struct
+import atexit
+import threading
+from itertools import count
+
+import numpy as np
+
+from config import settings
+
+MAGIC = b"MXDBG1\n"
+_RECORD_HEADER = struct.Struct("<II")
+
+_queue = None
+_writer = None
+_start_lock = threading.Lock()
+_counter = count()
+_stats = {"captured": 0, "dropped": 0, "written": 0, "rotations": 0}
+
+
+def should_capture(outcome):
+    """Lēts lēmums pirms datu sagatavošanas: vai šo ierakstu saglabāt."""
+    config = settings.get_debug_capture_settings()
+    mode = config["MODE"]
+    if mode == "off":
+        return False
+    if mode in ("rejected", "accepted") and outcome != mode:
+        return False
+    return next(_counter) % max(1, config["SAMPLE_EVERY"]) == 0
+
+
+def encode_record(meta, arrays):
+    """meta (dict) + {vārds: ndarray} → viens binārs ieraksts."""
+    arrays = {name: np.ascontiguousarray(arr) for name, arr in arrays.items()}
+    header = dict(meta, arrays=[[name, arr.dtype.str, list(arr.shape)] for name, arr in arrays.items()])
+    header_bytes = json.dumps(header, separators=(",", ":"), default=str).encode("utf-8")
+    payload = b"".join(arr.tobytes() for arr in arrays.values())
+    return _RECORD_HEADER.pack(len(header_bytes), len(payload)) + header_bytes + payload
+
+
+def read_captures(path):
+    """Ģenerators: (meta, {vārds: ndarray}) katram ierakstam failā."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Nav debug capture fails: {path}")
+        while True:
+            head = f.read(_RECORD_HEADER.size)
+            if len(head) < _RECORD_HEADER.size:
+                return
+            header_len, payload_len = _RECORD_HEADER.unpack(head)
+            meta = json.loads(f.read(header_len).decode("utf-8"))
+            payload = f.read(payload_len)
+            if len(payload) < payload_len:
+                return  # Nepabeigts pēdējais ieraksts (process apturēts rakstīšanas laikā)
+
+            arrays, offset = {}, 0
+            for name, dtype, shape in meta.pop("arrays"):
+                dt = np.dtype(dtype)
+                size = int(np.prod(shape)) * dt.itemsize
+                arrays[name] = np.frombuffer(payload, dtype=dt, count=int(np.prod(shape)), offset=offset).reshape(shape)
+                offset += size
+            yield meta, arrays
+
+
+class _Writer(threading.Thread):
+    def __init__(self, q, config):
+        super().__init__(name="debug-capture", daemon=True)
+        self.queue = q
+        self.path = os.path.join(config["DIR"], config["FILE"])
+        self.max_bytes = config["MAX_FILE_BYTES"]
+        self.max_files = config["MAX_FILES"]
+        self.file = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+
+    def _rotate(self):
+        self.file.close()
+        base, ext = os.path.splitext(self.path)
+        for i in range(self.max_files - 1, 0, -1):
+            src = self.path if i == 1 else f"{base}.{i - 1}{ext}"
+            if os.path.exists(src):
+                os.replace(src, f"{base}.{i}{ext}")
+        _stats["rotations"] += 1
+        self._open()
+
+    def run(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                break
+            try:
+                if self.file is None:
+                    self._open()
+                elif self.file.tell() + len(record) > self.max_bytes:
+                    self._rotate()
+                self.file.write(record)
+                _stats["written"] += 1
+                if self.queue.empty():
+                    self.file.flush()
+            except Exception as e:
+                print(f"⚠️ Debug capture rakstīšanas kļūda: {e}")
+        if self.file:
+            self.file.close()
+
+
+def _ensure_writer():
+    global _queue, _writer
+    if _writer is not None:
+        return _queue
+    with _start_lock:
+        if _writer is None:
+            config = settings.get_debug_capture_settings()
+            _queue = queue.Queue(maxsize=config["QUEUE_SIZE"])
+            _writer = _Writer(_queue, config)
+            _writer.start()
+            atexit.register(close)
+    return _queue
+
+
+def capture(meta, arrays):
+    """
+    📥 Ieliek ierakstu rindā (neblokē). Kodēšana notiek šeit (dati ir mazi),
+    diska I/O — fona pavedienā.
+    """
+    q = _ensure_writer()
+    try:
+        q.put_nowait(encode_record(dict(meta, ts=round(time.time(), 3)), arrays))
+        _stats["captured"] += 1
+    except queue.Full:
+        _stats["dropped"] += 1
+
+
+def capture_ai_decision(symbol, outcome, ohlcv, feature_names, row, confidence):
+    """AI filtra lēmums: OHLCV tail (ts int64 + OHLCV float32) un features (float32)."""
+    if not should_capture(outcome):
+        return
+    ohlcv = np.asarray(ohlcv)
+    capture(
+        {"kind": "ai_filter", "symbol": symbol, "outcome": outcome,
+         "confidence": round(float(confidence), 6), "features": list(feature_names)},
+        {
+            "timestamps": ohlcv[:, 0].astype(np.int64),
+            "ohlcv": ohlcv[:, 1:6].astype(np.float32),
+            "row": np.asarray(row, dtype=np.float32)
+        }
+    )
+
+
+def close(timeout=2.0):
+    """Iztukšo rindu un aizver failu (atexit)."""
+    global _writer
+    if _writer is None:
+        return
+    _queue.put(None)
+    _writer.join(timeout)
+    _writer = None
+
+
+def capture_stats():
+    return dict(_stats)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        for meta, arrays in read_captures(path):
+            shapes = {name: arr.shape for name, arr in arrays.items()}
+            print(f"{meta.get('ts')} | {meta.get('symbol')} | {meta.get('outcome')} | "
+                  f"conf={meta.get('confidence')} | {shapes}")
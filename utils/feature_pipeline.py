@@ -0,0 +1,359 @@
+"""
+Feature Pipeline Module
+-----------------------
+Vienīgā AI feature definīciju vieta treniņam, inferencei un datu vākšanai.
+Aprēķins notiek vienā vektorizētā NumPy piegājienā no OHLCV masīva:
+    - EWM ar scipy.signal.lfilter (rekursīvs filtrs, bez Python cikla)
+    - slīdošā vidējā / std ar numpy sliding_window_view
+    - tiek rēķinātas tikai pieprasītās kolonnas un to atkarības
+    - last_row(): tikai pēdējā rinda, izmantojot katras feature minimālo lookback
+
+Definīcijas atbilst modules/ai_trainer.py vēsturiskajām formulām (pandas
+compute_* funkcijām no utils/indicators.py). Ja kāda formula mainās, jāpalielina
+FEATURE_VERSION — modeļiem blakus saglabātais *_schema.json tad vairs nesakritīs.
+"""
+
+import os
+import json
+import math
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+FEATURE_VERSION = 1
+EPS = 1e-10
+EWM_TOLERANCE = 1e-4     # EWM "atmiņa": sveces, kuru svars nokrīt zem šī, tiek uzskatītas par nebūtiskām
+MAX_LOOKBACK = 300       # EWM lookback griesti (= vēsturiskais inferences logs)
+
+# Treniņa mērķis (kopīgs simbolu un globālajam modelim — abu proba salīdzina ar AI_THRESHOLD)
+TARGET_HORIZON = 3       # Nākamās sveces
+TARGET_GAIN = 1.01       # max close nākamajās TARGET_HORIZON svecēs >= close * TARGET_GAIN
+LABEL_VERSION = 2        # 1: max(close[i-1..i+1]) (vēsturiskā kļūda) → 2: max(close[i+1..i+3])
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+FEATURE_COLUMNS = [
+    "volume", "ema_50", "ema_200", "rsi", "macd", "macd_signal", "macd_hist",
+    "bollinger_upper", "bollinger_lower", "bollinger_middle", "bb_width", "atr",
+    "momentum", "rsi_slope", "safety_score", "volume_change_3", "price_above_ema_50",
+    "bollinger_bandwidth", "trend_angle", "volume_spike", "range_position",
+    "candle_body_ratio", "upper_wick_ratio", "lower_wick_ratio", "relative_volume",
+    "proximity_to_bollinger_upper", "volatility"
+]
+
+# Simbolneatkarīgās features globālajam modelim: cenas līmeņa kolonnas izteiktas
+# relatīvi pret close, absolūtais volume un safety_score (= 1/close) izslēgti
+GLOBAL_FEATURE_COLUMNS = [
+    "ema_50_dist", "ema_200_dist", "rsi", "macd_norm", "macd_signal_norm", "macd_hist_norm",
+    "bb_upper_dist", "bb_lower_dist", "bb_middle_dist", "momentum_pct", "rsi_slope",
+    "volume_change_3", "price_above_ema_50", "bollinger_bandwidth", "trend_angle_pct",
+    "volume_spike", "range_position", "candle_body_ratio", "upper_wick_ratio",
+    "lower_wick_ratio", "relative_volume", "proximity_to_bollinger_upper", "volatility"
+]
+
+
+# === NumPy primitīvi (pandas semantika: NaN priekšā, kamēr logs nav pilns) ===
+
+def ewm_mean(x, span, adjust=False):
+    """Atbilst Series.ewm(span=span, adjust=adjust).mean() bez NaN ievadē."""
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) == 0:
+        return x.copy()
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    if adjust:
+        num = lfilter([1.0], [1.0, -decay], x)
+        den = lfilter([1.0], [1.0, -decay], np.ones_like(x))
+        return num / den
+    out, _ = lfilter([alpha], [1.0, -decay], x, zi=[decay * x[0]])
+    return out
+
+
+def rolling_mean(x, window):
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).mean(axis=1)
+    return out
+
+
+def rolling_std(x, window):
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).std(axis=1, ddof=1)
+    return out
+
+
+def shift(x, n):
+    out = np.full(len(x), np.nan)
+    if n < len(x):
+        out[n:] = x[:len(x) - n]
+    return out
+
+
+def diff(x, n=1):
+    return x - shift(x, n)
+
+
+# === Feature definīcijas: nosaukums → funkcija(ctx) ===
+
+def _rsi(ctx, period=14):
+    delta = diff(ctx["close"])
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    rs = rolling_mean(gain, period) / (rolling_mean(loss, period) + EPS)
+    rsi = 100 - (100 / (1 + rs))
+    return np.where(np.isnan(rsi), 50.0, rsi)
+
+
+def _true_range(ctx):
+    high, low, prev_close = ctx["high"], ctx["low"], shift(ctx["close"], 1)
+    tr = np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    return np.fmax(np.abs(high - low), tr)
+
+
+def _volume_change_3(ctx):
+    volume = ctx["volume"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = volume / shift(volume, 3) - 1
+    return np.where(np.isnan(change), 0.0, change)
+
+
+def _safety_score(ctx):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.minimum(ctx["volume"] / (ctx["volume"] * ctx["close"]), 1.0)
+
+
+def _body_bounds(ctx):
+    return np.maximum(ctx["open"], ctx["close"]), np.minimum(ctx["open"], ctx["close"])
+
+
+_DEFINITIONS = {
+    # Starprezultāti (netiek atgriezti, ja nav pieprasīti)
+    "_ema_50_fast": lambda c: ewm_mean(c["close"], 50),
+    "_macd_fast": lambda c: ewm_mean(c["close"], 12),
+    "_macd_slow": lambda c: ewm_mean(c["close"], 26),
+    "_bb_std": lambda c: rolling_std(c["close"], 20),
+    "_tr": _true_range,
+    "_body_max": lambda c: _body_bounds(c)[0],
+    "_body_min": lambda c: _body_bounds(c)[1],
+
+    "volume": lambda c: c["volume"],
+    "ema_50": lambda c: ewm_mean(c["close"], 50, adjust=True),
+    "ema_200": lambda c: ewm_mean(c["close"], 200, adjust=True),
+    "rsi": _rsi,
+    "macd": lambda c: c["_macd_fast"] - c["_macd_slow"],
+    "macd_signal": lambda c: ewm_mean(c["macd"], 9),
+    "macd_hist": lambda c: c["macd"] - c["macd_signal"],
+    "bollinger_middle": lambda c: rolling_mean(c["close"], 20),
+    "bollinger_upper": lambda c: c["bollinger_middle"] + 2 * c["_bb_std"],
+    "bollinger_lower": lambda c: c["bollinger_middle"] - 2 * c["_bb_std"],
+    "bb_width": lambda c: c["bollinger_upper"] - c["bollinger_lower"],
+    "atr": lambda c: rolling_mean(c["_tr"], 14),
+    "momentum": lambda c: diff(c["close"], 5),
+    "rsi_slope": lambda c: diff(c["rsi"]),
+    "safety_score": _safety_score,
+    "volume_change_3": _volume_change_3,
+    "price_above_ema_50": lambda c: (c["close"] > c["_ema_50_fast"]).astype(np.float64),
+    "bollinger_bandwidth": lambda c: c["bb_width"] / (c["bollinger_middle"] + EPS),
+    "trend_angle": lambda c: diff(c["ema_50"], 10) / 10,
+    "volume_spike": lambda c: (c["volume"] > 2 * rolling_mean(c["volume"], 10)).astype(np.float64),
+    "range_position": lambda c: (c["close"] - c["low"]) / (c["high"] - c["low"] + EPS),
+    "candle_body_ratio": lambda c: np.abs(c["close"] - c["open"]) / (np.abs(c["high"] - c["low"]) + EPS),
+    "upper_wick_ratio": lambda c: (c["high"] - c["_body_max"]) / (c["high"] - c["_body_min"] + EPS),
+    "lower_wick_ratio": lambda c: (c["_body_min"] - c["low"]) / (c["_body_max"] - c["low"] + EPS),
+    "relative_volume": lambda c: c["volume"] / (rolling_mean(c["volume"], 20) + EPS),
+    "proximity_to_bollinger_upper": lambda c: c["close"] / (c["bollinger_upper"] + EPS),
+    "volatility": lambda c: np.minimum(c["atr"] / c["close"], 0.2),
+
+    # Normalizētās (simbolneatkarīgās) versijas
+    "ema_50_dist": lambda c: c["ema_50"] / c["close"] - 1,
+    "ema_200_dist": lambda c: c["ema_200"] / c["close"] - 1,
+    "macd_norm": lambda c: c["macd"] / c["close"],
+    "macd_signal_norm": lambda c: c["macd_signal"] / c["close"],
+    "macd_hist_norm": lambda c: c["macd_hist"] / c["close"],
+    "bb_upper_dist": lambda c: c["bollinger_upper"] / c["close"] - 1,
+    "bb_lower_dist": lambda c: c["bollinger_lower"] / c["close"] - 1,
+    "bb_middle_dist": lambda c: c["bollinger_middle"] / c["close"] - 1,
+    "momentum_pct": lambda c: c["momentum"] / shift(c["close"], 5),
+    "trend_angle_pct": lambda c: c["trend_angle"] / c["close"]
+}
+
+
+def ewm_horizon(span, tolerance=EWM_TOLERANCE):
+    """Sveču skaits, pēc kura vecākas sveces svars EWM ir < tolerance (griesti MAX_LOOKBACK)."""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    return min(MAX_LOOKBACK, int(math.ceil(math.log(tolerance) / math.log(decay))))
+
+
+# Minimālais sveču skaits, lai pēdējās rindas vērtība būtu aprēķināma (logu features —
+# precīzi; EWM features — līdz EWM_TOLERANCE, ne vairāk kā MAX_LOOKBACK)
+_LOOKBACK = {
+    "volume": 1, "safety_score": 1, "range_position": 1, "candle_body_ratio": 1,
+    "upper_wick_ratio": 1, "lower_wick_ratio": 1,
+    "volume_change_3": 4, "momentum": 6, "volume_spike": 10,
+    "atr": 15, "volatility": 15, "rsi": 15, "rsi_slope": 16,
+    "bollinger_upper": 20, "bollinger_lower": 20, "bollinger_middle": 20, "bb_width": 20,
+    "bollinger_bandwidth": 20, "proximity_to_bollinger_upper": 20, "relative_volume": 20,
+    "ema_50": ewm_horizon(50), "price_above_ema_50": ewm_horizon(50),
+    "trend_angle": min(MAX_LOOKBACK, ewm_horizon(50) + 10),
+    "ema_200": ewm_horizon(200),
+    "macd": ewm_horizon(26),
+    "macd_signal": min(MAX_LOOKBACK, ewm_horizon(26) + ewm_horizon(9)),
+    "macd_hist": min(MAX_LOOKBACK, ewm_horizon(26) + ewm_horizon(9))
+}
+_LOOKBACK.update({
+    "ema_50_dist": _LOOKBACK["ema_50"], "ema_200_dist": _LOOKBACK["ema_200"],
+    "macd_norm": _LOOKBACK["macd"], "macd_signal_norm": _LOOKBACK["macd_signal"],
+    "macd_hist_norm": _LOOKBACK["macd_hist"], "bb_upper_dist": 20, "bb_lower_dist": 20,
+    "bb_middle_dist": 20, "momentum_pct": 6, "trend_angle_pct": _LOOKBACK["trend_angle"]
+})
+
+
+def lookback(columns=FEATURE_COLUMNS):
+    return max((_LOOKBACK[col] for col in columns), default=1)
+
+
+class _Context(dict):
+    """Slinks aprēķina konteksts: kolonna tiek aprēķināta pirmajā pieprasījumā."""
+
+    def __missing__(self, name):
+        value = _DEFINITIONS[name](self)
+        self[name] = value
+        return value
+
+
+def ohlcv_arrays(ohlcv):
+    """OHLCV (n×6 ndarray vai DataFrame) → {kolonna: float64 masīvs}."""
+    if isinstance(ohlcv, pd.DataFrame):
+        return {col: ohlcv[col].to_numpy(dtype=np.float64) for col in OHLCV_COLUMNS[1:]}
+    data = np.asarray(ohlcv, dtype=np.float64)
+    return {col: data[:, i] for i, col in enumerate(OHLCV_COLUMNS) if i > 0}
+
+
+def schema_hash(columns=FEATURE_COLUMNS):
+    payload = json.dumps({"version": FEATURE_VERSION, "columns": list(columns)}, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class FeaturePipeline:
+    def __init__(self, columns=None):
+        self.columns = list(FEATURE_COLUMNS if columns is None else columns)
+        unknown = [col for col in self.columns if col not in _DEFINITIONS or col.startswith("_")]
+        if unknown:
+            raise ValueError(f"Nezināmas feature kolonnas: {unknown}")
+
+    @property
+    def lookback(self):
+        """Sveču skaits, kas vajadzīgs pēdējās rindas aprēķinam."""
+        return lookback(self.columns)
+
+    @property
+    def schema(self):
+        return {"version": FEATURE_VERSION, "hash": schema_hash(self.columns), "columns": self.columns}
+
+    def compute(self, ohlcv):
+        """Atgriež {kolonna: masīvs} tikai pieprasītajām kolonnām."""
+        ctx = _Context(ohlcv_arrays(ohlcv))
+        return {col: ctx[col] for col in self.columns}
+
+    def matrix(self, ohlcv):
+        """Feature matrica (n × len(columns)) kolonnu secībā."""
+        values = self.compute(ohlcv)
+        if not self.columns:
+            return np.empty((len(ohlcv), 0))
+        return np.column_stack([values[col] for col in self.columns])
+
+    def last_row(self, ohlcv):
+        """
+        Tikai pēdējās sveces feature vektors (kolonnu secībā): aprēķins notiek uz
+        pēdējām `lookback` svecēm, nevis visu masīvu.
+        """
+        if isinstance(ohlcv, pd.DataFrame):
+            ohlcv = ohlcv[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+        tail = np.asarray(ohlcv, dtype=np.float64)[-self.lookback:]
+        if len(tail) == 0:
+            return np.full(len(self.columns), np.nan)
+        ctx = _Context(ohlcv_arrays(tail))
+        return np.array([ctx[col][-1] for col in self.columns], dtype=np.float64)
+
+    def frame(self, ohlcv, include_ohlcv=True):
+        """DataFrame ar OHLCV (timestamp kā datetime) + feature kolonnām."""
+        values = self.compute(ohlcv)
+        if include_ohlcv:
+            if isinstance(ohlcv, pd.DataFrame):
+                base = ohlcv[OHLCV_COLUMNS].copy()
+            else:
+                base = pd.DataFrame(np.asarray(ohlcv, dtype=np.float64), columns=OHLCV_COLUMNS)
+            if not pd.api.types.is_datetime64_any_dtype(base["timestamp"]):
+                base["timestamp"] = pd.to_datetime(base["timestamp"].astype("int64"), unit="ms")
+            base = base.drop(columns=[col for col in self.columns if col in base.columns])
+            return pd.concat([base.reset_index(drop=True), pd.DataFrame(values)], axis=1)
+        return pd.DataFrame(values)
+
+
+@lru_cache(maxsize=128)
+def _cached_pipeline(columns):
+    return FeaturePipeline(columns)
+
+
+def get_pipeline(columns=None):
+    """Kešots FeaturePipeline konkrētam kolonnu sarakstam (piem. modeļa features)."""
+    return _cached_pipeline(tuple(FEATURE_COLUMNS if columns is None else columns))
+
+
+def build_feature_frame(ohlcv, columns=None):
+    return get_pipeline(columns).frame(ohlcv)
+
+
+# === Treniņa mērķis ===
+
+def future_max(close, horizon=TARGET_HORIZON):
+    """max(close[i+1..i+horizon]); NaN rindām, kurām nākotnes logs nav pilns."""
+    close = np.asarray(close, dtype=np.float64)
+    result = np.full(len(close), np.nan)
+    if len(close) > horizon:
+        windows = sliding_window_view(close[1:], horizon)
+        result[:len(windows)] = windows.max(axis=1)
+    return result
+
+
+def breakout_target(close, horizon=TARGET_HORIZON, gain=TARGET_GAIN):
+    """
+    (future_max, target): target 1.0/0.0 — vai nākamo `horizon` sveču max close >=
+    close * gain; NaN, ja nākotnes logs nepilns (šādas rindas treniņā netiek izmantotas).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    upcoming = future_max(close, horizon)
+    target = np.where(np.isnan(upcoming), np.nan, (upcoming >= close * gain).astype(np.float64))
+    return upcoming, target
+
+
+# === Shēma blakus modelim ===
+
+def schema_path(base_path):
+    return base_path + "_schema.json"
+
+
+def save_schema(base_path, columns):
+    with open(schema_path(base_path), "w", encoding="utf-8") as f:
+        json.dump(get_pipeline(columns).schema, f, indent=2)
+
+
+def load_schema(base_path):
+    path = schema_path(base_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def schema_matches(schema, columns):
+    """True, ja modelis trenēts ar tām pašām feature definīcijām un secību."""
+    return bool(schema) and schema.get("hash") == schema_hash(columns)
@@ -1,54 +1,117 @@
 # feedback_predictor.py
 
 import os
-import joblib
+import time
+import threading
 import numpy as np
-import pandas as pd  # ✅ nepieciešams priekš DataFrame
+from utils.metrics import timed
+from utils.model_io import model_files, load_model
+from modules.predict_batcher import PredictBatcher
 
 MODEL_DIR = "models"
-MODEL_PATH = os.path.join(MODEL_DIR, "feedback_model.pkl")
-SCALER_PATH = os.path.join(MODEL_DIR, "feedback_scaler.pkl")
-FEATURES_PATH = os.path.join(MODEL_DIR, "feedback_features.pkl")
+BASE_PATH = os.path.join(MODEL_DIR, "feedback")  # feedback_model.ubj + feedback_scaler.npz (vai vecie .pkl)
 
-def is_feedback_model_positive(data: dict, return_score=False, threshold=0.5):
-    """
-    📊 Prognozē vai darījums šķistu 'pozitīvs' (apmierinošs).
-    
-    Parametri:
-        data: dict ar pazīmēm, piem.:
-            {
-              "price": 0.018,
-              "volatility": 0.032,
-              "ai_confidence": 0.91,
-              "strategy_aggressive": 1,
-              ...
-            }
-        return_score: ja True → atgriež proba skaitli (0.0–1.0)
-        threshold: slieksnis pozitīvai klasifikācijai (default: 0.5)
-    """
+RELOAD_CHECK_INTERVAL = 2.0  # Sekundes starp mtime pārbaudēm (hot reload)
+
+# 🧠 Rezidents feedback modelis: ielādēts vienreiz, pārlādēts, kad train_from_labeled.py
+# ieraksta jaunus failus. Vērtēšana notiek uz iepriekš sagatavota NumPy vektora.
+_state = {"signature": None, "checked_at": 0.0, "loaded": None}
+_lock = threading.Lock()
+
+def _signature():
+    paths = model_files(BASE_PATH)
+    if paths is None:
+        return None
     try:
-        model = joblib.load(MODEL_PATH)
-        scaler = joblib.load(SCALER_PATH)
-        features = joblib.load(FEATURES_PATH)
+        return tuple(os.stat(p).st_mtime_ns for p in paths.values())
+    except FileNotFoundError:
+        return None
+
+def _load_model():
+    loaded = load_model(BASE_PATH)
+    if loaded is None:
+        raise FileNotFoundError("Feedback modeļa faili nav atrasti")
+
+    features = loaded["features"]
+    loaded["index"] = {name: i for i, name in enumerate(features)}  # kolonna → pozīcija
+    return loaded
+
+def _get_model():
+    """Atgriež rezidento modeli; pārbauda failu mtime ne biežāk kā RELOAD_CHECK_INTERVAL."""
+    now = time.monotonic()
+    if _state["loaded"] is not None and now - _state["checked_at"] < RELOAD_CHECK_INTERVAL:
+        return _state["loaded"]
+
+    with _lock:
+        if _state["loaded"] is not None and now - _state["checked_at"] < RELOAD_CHECK_INTERVAL:
+            return _state["loaded"]
+
+        _state["checked_at"] = now
+        signature = _signature()
+        if signature is None:
+            if _state["loaded"] is None:
+                raise FileNotFoundError("Feedback modeļa faili nav atrasti")
+            return _state["loaded"]
+
+        if signature != _state["signature"]:
+            try:
+                with timed("feedback.model_load"):
+                    loaded = _load_model()
+            except Exception as e:
+                # Treniņš var būt pusē ierakstīšanas — paliekam pie iepriekšējā modeļa
+                if _state["loaded"] is None:
+                    raise
+                print(f"⚠️ Feedback modeļa pārlāde neizdevās, izmantojam iepriekšējo: {e}")
+                return _state["loaded"]
 
-        # 🧠 Sagatavo ievadi kā DataFrame
-        input_df = pd.DataFrame([data])
+            if _state["signature"] is not None:
+                print("🔁 Feedback modelis pārlādēts no diska.")
+            _state["loaded"] = loaded
+            _state["signature"] = signature
 
-        # Nodrošina, ka visiem nepieciešamajiem feature ir vērtības (aizvieto trūkstošos ar 0)
-        for col in features:
-            if col not in input_df.columns:
-                input_df[col] = 0
+        return _state["loaded"]
 
-        # Atlasām tikai vajadzīgos un korektā secībā
-        input_df = input_df[features]
+def _predict(loaded, X_scaled):
+    return loaded["booster"].inplace_predict(X_scaled.astype(np.float32))
 
-        # Skalēšana
-        X_scaled = scaler.transform(input_df)
+def score_feedback_batch(rows):
+    """
+    📊 Novērtē visus kandidātus vienā predict izsaukumā.
+    rows: dict saraksts ar pazīmēm, piem. {"price": 0.018, "ai_confidence": 0.91, ...}.
+    Atgriež NumPy masīvu ar proba vērtībām vai None, ja modelis nav pieejams.
+    """
+    if not rows:
+        return np.zeros(0)
+
+    try:
+        loaded = _get_model()
+        index = loaded["index"]
+
+        # Trūkstošie feature paliek 0, lieki atslēgas tiek ignorētas
+        X = np.zeros((len(rows), len(loaded["features"])), dtype=np.float64)
+        for r, data in enumerate(rows):
+            for key, value in data.items():
+                i = index.get(key)
+                if i is not None:
+                    X[r, i] = np.nan if value is None else value
 
-        # Prognoze
-        score = model.predict_proba(X_scaled)[0][1]
-        return score if return_score else score >= threshold
+        X -= loaded["mean"]
+        X /= loaded["scale"]
+
+        with timed("feedback.predict"):
+            return np.asarray(_predict(loaded, X), dtype=np.float64)
 
     except Exception as e:
         print(f"⚠️ Feedback modeļa kļūda: {e}")
-        return None if return_score else False
+        return None
+
+# Vienlaicīgi straumētu kandidātu feedback vērtējumi → viens predict izsaukums
+feedback_batcher = PredictBatcher(lambda _, rows: score_feedback_batch(rows))
+
+def score_feedback(data):
+    """
+    📊 Viena kandidāta feedback proba (vai None, ja modelis nav pieejams). Paralēlo
+    pavedienu vienlaicīgie pieprasījumi tiek apvienoti vienā predict (feedback_batcher).
+    """
+    score = feedback_batcher.predict("feedback", None, data)
+    return None if score is None else float(score)
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import ccxt
+from modules.ohlcv_cache import get_ohlcv_frame
 
 # === Pamata indikatori ===
 
@@ -109,9 +110,8 @@ def calculate_indicators_for_token(token, exchange=None):
         if exchange is None:
             raise ValueError("Exchange objekts nepieciešams indikatoru iegūšanai.")
 
-        # Iegūst OHLCV (100 pēdējās sveces)
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe="1m", limit=100)
-        df = pd.DataFrame(ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        # Iegūst OHLCV (100 pēdējās sveces) no kopīgā keša
+        df = get_ohlcv_frame(exchange, symbol, timeframe="1m", limit=100)
 
         # Aprēķina indikatorus
         df["rsi"] = compute_rsi(df["close"])
@@ -0,0 +1,253 @@
+"""
+Market Store Module
+-------------------
+Kolonnu glabātuve data/market_data simbolu datiem (OHLCV + AI features).
+    <SYM>.feather  — Arrow IPC (noklusējums): lasīšana ar memory-map, kolonnu projekcija
+    <SYM>.parquet  — kompakts arhīvs (zstd/snappy)
+    <SYM>.csv      — vecais formāts; tiek lasīts, līdz to konvertē (python -m utils.market_store)
+
+Tipi: timestamp → int64 (ms), OHLCV → float64 (mērķis tiek rēķināts no close),
+pārējās skaitliskās kolonnas → float32. Bez pyarrow glabātuve strādā CSV režīmā.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from utils.feature_pipeline import OHLCV_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+DATA_DIR = "data/market_data"
+SUFFIXES = {"feather": ".feather", "parquet": ".parquet", "csv": ".csv"}
+READ_ORDER = ("feather", "parquet", "csv")
+FLOAT64_COLUMNS = OHLCV_COLUMNS[1:]
+
+_warned = {"pyarrow": False}
+
+
+def symbol_stem(symbol):
+    return symbol.replace("/", "").replace(":", "")
+
+
+def symbol_from_stem(stem):
+    return stem[:-4] + "/USDT" if stem.endswith("USDT") else stem
+
+
+def _formats():
+    return READ_ORDER if pa is not None else ("csv",)
+
+
+def _write_format(fmt=None):
+    fmt = fmt or settings.get_market_store_settings()["FORMAT"]
+    if fmt != "csv" and pa is None:
+        if not _warned["pyarrow"]:
+            print("⚠️ pyarrow nav instalēts — tirgus dati tiek glabāti CSV formātā.")
+            _warned["pyarrow"] = True
+        return "csv"
+    return fmt
+
+
+def store_path(symbol, data_dir=DATA_DIR, fmt=None):
+    return os.path.join(data_dir, symbol_stem(symbol) + SUFFIXES[_write_format(fmt)])
+
+
+def find_path(symbol, data_dir=DATA_DIR):
+    """Esošais simbola fails (feather → parquet → csv) vai None."""
+    stem = symbol_stem(symbol)
+    for fmt in _formats():
+        path = os.path.join(data_dir, stem + SUFFIXES[fmt])
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def exists(symbol, data_dir=DATA_DIR):
+    return find_path(symbol, data_dir) is not None
+
+
+def list_symbols(data_dir=DATA_DIR):
+    """Visi simboli glabātuvē (jebkurā atbalstītajā formātā), sakārtoti."""
+    if not os.path.exists(data_dir):
+        return []
+    suffixes = tuple(SUFFIXES[fmt] for fmt in _formats())
+    stems = {os.path.splitext(name)[0] for name in os.listdir(data_dir) if name.endswith(suffixes)}
+    return [symbol_from_stem(stem) for stem in sorted(stems)]
+
+
+def timestamps_ms(series):
+    """timestamp kolonna (ms skaitļi, datetime vai teksts) → int64 ms."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.int64)
+    ts = pd.to_datetime(series)
+    return ((ts - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64)
+
+
+def _typed(df):
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col == "timestamp":
+            columns[col] = timestamps_ms(series)
+        elif col in FLOAT64_COLUMNS:
+            columns[col] = series.to_numpy(dtype=np.float64)
+        elif pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+            columns[col] = series.to_numpy(dtype=np.int64)
+        elif pd.api.types.is_numeric_dtype(series):
+            columns[col] = series.to_numpy(dtype=np.float32)
+        else:
+            columns[col] = series.to_numpy()
+    return pd.DataFrame(columns)
+
+
+def write_frame(symbol, df, data_dir=DATA_DIR, fmt=None, drop_other_formats=True):
+    """
+    Saglabā simbola datus (atomāri: tmp → replace). Pēc noklusējuma izdzēš tā paša
+    simbola failus citos formātos, lai lasītāji neatrastu novecojušu kopiju.
+    """
+    fmt = _write_format(fmt)
+    compression = settings.get_market_store_settings()["COMPRESSION"]
+    os.makedirs(data_dir, exist_ok=True)
+
+    path = store_path(symbol, data_dir, fmt)
+    tmp_path = path + ".tmp"
+    typed = _typed(df)
+
+    if fmt == "csv":
+        typed.to_csv(tmp_path, index=False)
+    else:
+        table = pa.Table.from_pandas(typed, preserve_index=False)
+        if fmt == "feather":
+            feather.write_feather(table, tmp_path, compression=compression)
+        else:
+            pq.write_table(table, tmp_path, compression=None if compression in ("none", "uncompressed") else compression)
+    os.replace(tmp_path, path)
+
+    if drop_other_formats:
+        stem = symbol_stem(symbol)
+        for other, suffix in SUFFIXES.items():
+            other_path = os.path.join(data_dir, stem + suffix)
+            if other != fmt and os.path.exists(other_path):
+                os.remove(other_path)
+    return path
+
+
+def read_frame(symbol, columns=None, data_dir=DATA_DIR, memory_map=None, path=None):
+    """
+    📦 Simbola DataFrame vai None, ja faila nav. columns → tikai šīs kolonnas
+    (Feather/Parquet nolasa tikai attiecīgos buferus).
+    """
+    path = path or find_path(symbol, data_dir)
+    if path is None:
+        return None
+    if memory_map is None:
+        memory_map = settings.get_market_store_settings()["MEMORY_MAP"]
+    columns = list(columns) if columns is not None else None
+
+    if path.endswith(SUFFIXES["feather"]):
+        return feather.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+    if path.endswith(SUFFIXES["parquet"]):
+        return pq.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def inspect(symbol, data_dir=DATA_DIR):
+    """{"path", "format", "columns", "rows"} no faila metadatiem, bez datu nolasīšanas."""
+    path = find_path(symbol, data_dir)
+    if path is None:
+        return None
+
+    if path.endswith(SUFFIXES["feather"]):
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            columns = reader.schema.names
+            rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        fmt = "feather"
+    elif path.endswith(SUFFIXES["parquet"]):
+        metadata = pq.ParquetFile(path).metadata
+        columns, rows = pq.read_schema(path).names, metadata.num_rows
+        fmt = "parquet"
+    else:
+        columns = pd.read_csv(path, nrows=0).columns
+        with open(path, "rb") as f:
+            rows = max(sum(1 for line in f if line.strip()) - 1, 0)
+        fmt = "csv"
+
+    return {"path": path, "format": fmt, "columns": list(columns), "rows": int(rows)}
+
+
+# === Vienreizēja CSV → kolonnu formāta konvertēšana ===
+
+def _frames_match(expected, actual):
+    if list(expected.columns) != list(actual.columns) or len(expected) != len(actual):
+        return False
+    for col in expected.columns:
+        a, b = expected[col].to_numpy(), actual[col].to_numpy()
+        if a.dtype.kind in "fi" and not np.allclose(a, b, rtol=1e-6, atol=1e-12, equal_nan=True):
+            return False
+    return True
+
+
+def convert_csv_files(data_dir=DATA_DIR, fmt=None, delete=False):
+    """Konvertē visus <SYM>.csv uz fmt, pārbauda saturu; delete=True → CSV tiek izdzēsts."""
+    fmt = _write_format(fmt)
+    if fmt == "csv":
+        print("❌ Konvertēšanai vajag pyarrow (feather/parquet).")
+        return None
+
+    files = sorted(name for name in os.listdir(data_dir) if name.endswith(".csv"))
+    print(f"🔁 {len(files)} CSV faili → {fmt}...\n")
+
+    stats = {"converted": 0, "failed": 0, "csv_bytes": 0, "store_bytes": 0,
+             "csv_read_seconds": 0.0, "store_read_seconds": 0.0}
+    for name in files:
+        csv_path = os.path.join(data_dir, name)
+        symbol = symbol_from_stem(os.path.splitext(name)[0])
+        try:
+            start = time.perf_counter()
+            df = pd.read_csv(csv_path)
+            stats["csv_read_seconds"] += time.perf_counter() - start
+
+            path = write_frame(symbol, df, data_dir, fmt, drop_other_formats=False)
+
+            start = time.perf_counter()
+            stored = read_frame(symbol, path=path)
+            stats["store_read_seconds"] += time.perf_counter() - start
+
+            if not _frames_match(_typed(df), stored):
+                os.remove(path)
+                stats["failed"] += 1
+                print(f"❌ {name}: saturs nesakrīt pēc konvertēšanas, CSV atstāts")
+                continue
+
+            stats["csv_bytes"] += os.path.getsize(csv_path)
+            stats["store_bytes"] += os.path.getsize(path)
+            stats["converted"] += 1
+            if delete:
+                os.remove(csv_path)
+        except Exception as e:
+            stats["failed"] += 1
+            print(f"❌ {name}: {e}")
+
+    if stats["csv_bytes"]:
+        print(f"📦 Izmērs: {stats['csv_bytes'] / 1024 / 1024:.1f} MB → {stats['store_bytes'] / 1024 / 1024:.1f} MB")
+        print(f"⏱️ Lasīšana: CSV {stats['csv_read_seconds']:.2f}s → {fmt} {stats['store_read_seconds']:.2f}s")
+    print(f"\n🌟 Gatavs! Konvertēti: {stats['converted']} | Neizdevās: {stats['failed']}"
+          f"{' | CSV izdzēsti' if delete else ''}")
+    return stats
+
+
+if __name__ == "__main__":
+    # python -m utils.market_store [--delete] [--format parquet]
+    sys.stdout.reconfigure(encoding='utf-8', line_buffering=True)
+    fmt = sys.argv[sys.argv.index("--format") + 1] if "--format" in sys.argv else None
+    convert_csv_files(DATA_DIR, fmt=fmt, delete="--delete" in sys.argv)
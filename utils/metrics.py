@@ -0,0 +1,155 @@
+"""
+Metrics Module
+--------------
+Viegls latences mērījumu slānis tirdzniecības ciklam:
+    with timed("scan.klines"): ...        # konteksta pārvaldnieks
+    @timed_fn("buy.total")                 # dekorators
+    incr("orders.sent")                    # skaitītājs
+
+Katram posmam atmiņā tiek turēti pēdējie mērījumi (slīdošie percentīļi) un
+histogramma; flush_metrics() cikla beigās pieraksta kompaktu JSON rindu failā tikai
+ar šajā ciklā izmērītajiem posmiem un to cikla histogrammu (delta, nevis kumulatīvā).
+"""
+
+import os
+import json
+import time
+import threading
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+METRICS_FILE = "logs/metrics.jsonl"
+WINDOW = 500  # Mērījumi vienam posmam slīdošo percentīļu aprēķinam
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # sekundes
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_samples = defaultdict(lambda: deque(maxlen=WINDOW))
+_histograms = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+_cycle = defaultdict(lambda: [0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)])  # posms → [skaits, laiks, max, histogramma] kopš pēdējā flush
+
+
+def observe(stage, seconds):
+    bucket = bisect_left(BUCKETS, seconds)
+    with _lock:
+        _samples[stage].append(seconds)
+        _histograms[stage][bucket] += 1
+        entry = _cycle[stage]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+        entry[3][bucket] += 1
+
+
+def incr(name, n=1):
+    with _lock:
+        _counters[name] += n
+
+
+@contextmanager
+def timed(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def timed_fn(stage):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def percentiles(stage, qs=(50, 90, 99)):
+    with _lock:
+        values = sorted(_samples.get(stage, ()))
+    return {f"p{q}": _percentile(values, q) for q in qs}
+
+
+def summary():
+    """
+    Atgriež {posms: {cikla skaits/laiks/max/histogramma, slīdošie p50/p90/p99}} tikai
+    posmiem, kas mērīti kopš pēdējā flush. Kumulatīvās histogrammas: histogram(stage).
+    """
+    with _lock:
+        stages = {
+            stage: (sorted(_samples[stage]), count, total, peak, list(hist))
+            for stage, (count, total, peak, hist) in _cycle.items() if count
+        }
+        counters = dict(_counters)
+
+    result = {}
+    for stage, (values, count, total, peak, hist) in stages.items():
+        result[stage] = {
+            "n": count,
+            "total": round(total, 4),
+            "p50": round(_percentile(values, 50), 4),
+            "p90": round(_percentile(values, 90), 4),
+            "p99": round(_percentile(values, 99), 4),
+            "max": round(peak, 4),
+            "hist": hist
+        }
+    return result, counters
+
+
+def histogram(stage):
+    """Kumulatīvā histogramma kopš procesa starta (BUCKETS robežas)."""
+    with _lock:
+        return list(_histograms.get(stage, [0] * (len(BUCKETS) + 1)))
+
+
+def flush_metrics(label, extra=None, path=METRICS_FILE):
+    """
+    📈 Pieraksta cikla kopsavilkumu (viena JSON rinda, tikai šī cikla posmi un delta
+    histogrammas) un atiestata cikla summas. Slīdošie percentīļi un kumulatīvās
+    histogrammas paliek atmiņā starp cikliem.
+    """
+    stages, counters = summary()
+    record = {
+        "ts": round(time.time(), 3),
+        "process": label,
+        "stages": stages,
+        "counters": counters
+    }
+    if extra:
+        record["extra"] = extra
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+    except Exception as e:
+        print(f"⚠️ Neizdevās saglabāt metrikas: {e}")
+
+    with _lock:
+        _cycle.clear()
+        _counters.clear()
+
+    return record
+
+
+def format_cycle(record, top=8):
+    """Īss teksts konsolei: lēnākie posmi šajā ciklā."""
+    rows = sorted(
+        ((stage, s) for stage, s in record["stages"].items() if s["n"]),
+        key=lambda item: item[1]["total"],
+        reverse=True
+    )[:top]
+    return "\n".join(
+        f"   • {stage}: {s['total']:.2f}s ({s['n']}x) | p50 {s['p50'] * 1000:.0f}ms | p90 {s['p90'] * 1000:.0f}ms"
+        for stage, s in rows
+    )
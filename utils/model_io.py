@@ -0,0 +1,145 @@
+"""
+Model IO Module
+---------------
+XGBoost modeļu saglabāšana un ielāde natīvā formātā:
+    <base>_model.ubj   — Booster (XGBoost UBJSON, neatkarīgs no xgboost/sklearn versijas pickle)
+    <base>_scaler.npz  — StandardScaler parametri (mean, scale) + feature saraksts
+                         (+ neobligāti slīdošā statistika: stats_count/mean/var)
+
+Tie paši scaler parametri tiek ierakstīti arī Booster atribūtos (set_attr), tāpēc
+.ubj fails viens pats ir konsekvents komplekts: hot-reload, kas nolasa failus starp
+.npz un .ubj aizvietošanu, nevar sapārot jaunu scaler ar vecu Booster. .npz paliek
+vecākiem modeļiem (bez atribūtiem) un ārējiem rīkiem.
+
+Inference: raw Booster + inplace_predict uz float32 masīva, bez sklearn wrapper.
+Vecie <base>_model.pkl / _scaler.pkl / _features.pkl tiek nolasīti kā rezerves
+variants, līdz tos konvertē migrate_models.py.
+"""
+
+import os
+import json
+
+import joblib
+import numpy as np
+import xgboost as xgb
+
+MODEL_SUFFIX = "_model.ubj"
+SCALER_SUFFIX = "_scaler.npz"
+LEGACY_SUFFIXES = {"model": "_model.pkl", "scaler": "_scaler.pkl", "features": "_features.pkl"}
+ATTR_KEYS = ("mean", "scale", "features", "stats_count", "stats_mean", "stats_var")
+
+
+def native_paths(base_path):
+    return {"model": base_path + MODEL_SUFFIX, "scaler": base_path + SCALER_SUFFIX}
+
+
+def legacy_paths(base_path):
+    return {key: base_path + suffix for key, suffix in LEGACY_SUFFIXES.items()}
+
+
+def model_files(base_path):
+    """Esošā formāta faili: natīvie, ja ir, citādi pkl; None, ja pilna komplekta nav."""
+    for paths in (native_paths(base_path), legacy_paths(base_path)):
+        if all(os.path.exists(p) for p in paths.values()):
+            return paths
+    return None
+
+
+def model_exists(base_path):
+    return model_files(base_path) is not None
+
+
+def scaler_params(scaler, n_features):
+    """StandardScaler (mean_, scale_) vai jau ielādēts bundle dict (mean, scale)."""
+    if isinstance(scaler, dict):
+        mean, scale = scaler.get("mean"), scaler.get("scale")
+    else:
+        mean = getattr(scaler, "mean_", None)
+        scale = getattr(scaler, "scale_", None)
+    mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+    if len(mean) != n_features:
+        raise ValueError(f"Scaler ({len(mean)}) un feature saraksts ({n_features}) nesakrīt")
+    return mean, np.where(scale == 0, 1.0, scale)
+
+
+def save_model(base_path, model, scaler, features, stats=None):
+    """
+    Saglabā Booster + scaler parametrus natīvā formātā (atomāri: tmp → replace).
+    stats: {"count", "mean", "var"} — treniņa datu slīdošā statistika (inkrementālajam treniņam).
+    """
+    features = list(features)
+    mean, scale = scaler_params(scaler, len(features))
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    paths = native_paths(base_path)
+
+    arrays = {"mean": mean, "scale": scale, "features": np.array(features, dtype=str)}
+    if stats is not None:
+        arrays.update(stats_count=np.float64(stats["count"]),
+                      stats_mean=np.asarray(stats["mean"], dtype=np.float64),
+                      stats_var=np.asarray(stats["var"], dtype=np.float64))
+
+    # Scaler arī Booster atribūtos → .ubj ir pašpietiekams (sk. moduļa aprakstu)
+    booster.set_attr(**{f"scaler_{key}": None for key in ATTR_KEYS})
+    booster.set_attr(**{f"scaler_{key}": json.dumps(np.asarray(value).tolist()) for key, value in arrays.items()})
+
+    # Abi faili sagatavoti pirms aizvietošanas; modelis aizvietots pēdējais
+    tmp_scaler = base_path + "_scaler.tmp.npz"
+    tmp_model = base_path + "_model.tmp.ubj"
+    np.savez(tmp_scaler, **arrays)
+    booster.save_model(tmp_model)
+    os.replace(tmp_scaler, paths["scaler"])
+    os.replace(tmp_model, paths["model"])
+    return paths
+
+
+def _attr_params(booster):
+    """Scaler parametri no Booster atribūtiem vai None (modelis saglabāts pirms to ieviešanas)."""
+    attrs = booster.attributes()
+    if "scaler_mean" not in attrs:
+        return None
+    params = {key: json.loads(attrs[f"scaler_{key}"]) for key in ATTR_KEYS if f"scaler_{key}" in attrs}
+    return {key: np.asarray(value, dtype=str if key == "features" else np.float64) for key, value in params.items()}
+
+
+def load_model(base_path):
+    """
+    Atgriež {"booster", "mean", "scale", "features", "stats", "format", "paths"} vai None.
+    Natīvais formāts tiek izvēlēts pirms pkl. stats ir None, ja modelis saglabāts bez tās.
+    """
+    paths = model_files(base_path)
+    if paths is None:
+        return None
+
+    stats = None
+    if "features" not in paths:
+        booster = xgb.Booster()
+        booster.load_model(paths["model"])
+        params = _attr_params(booster)
+        if params is None:
+            with np.load(paths["scaler"]) as stored:
+                params = {key: stored[key] for key in stored.files}
+        mean, scale = params["mean"], params["scale"]
+        features = [str(f) for f in params["features"]]
+        if "stats_count" in params:
+            stats = {"count": float(params["stats_count"]),
+                     "mean": params["stats_mean"], "var": params["stats_var"]}
+        fmt = "native"
+    else:
+        model = joblib.load(paths["model"])
+        features = list(joblib.load(paths["features"]))
+        mean, scale = scaler_params(joblib.load(paths["scaler"]), len(features))
+        booster = model.get_booster() if hasattr(model, "get_booster") else None
+        if booster is None:
+            raise ValueError(f"{paths['model']}: nav XGBoost modelis")
+        fmt = "pkl"
+
+    return {"booster": booster, "mean": mean, "scale": scale, "features": features,
+            "stats": stats, "format": fmt, "paths": paths}
+
+
+def predict_proba(bundle, X):
+    """Pozitīvās klases varbūtības: (X - mean) / scale → float32 → Booster.inplace_predict."""
+    X = np.asarray(X, dtype=np.float64)
+    X_scaled = ((X - bundle["mean"]) / bundle["scale"]).astype(np.float32)
+    return bundle["booster"].inplace_predict(X_scaled)
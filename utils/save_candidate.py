@@ -1,8 +1,12 @@
 import csv
 import os
+import threading
 from datetime import datetime
 from utils.indicators import calculate_indicators_for_token
 
+# Kandidātus var saglabāt vairāki pipeline pavedieni vienlaicīgi
+_write_lock = threading.Lock()
+
 def save_candidate(token, exchange, file_path="data/candidate_tokens.csv"):
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
@@ -26,10 +30,11 @@ def save_candidate(token, exchange, file_path="data/candidate_tokens.csv"):
 
     fields_to_save = {k: v for k, v in fields_to_save.items() if v is not None}
 
-    file_exists = os.path.exists(file_path)
+    with _write_lock:
+        file_exists = os.path.exists(file_path)
 
-    with open(file_path, mode="a", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fields_to_save.keys())
-        if not file_exists:
-            writer.writeheader()
-        writer.writerow(fields_to_save)
+        with open(file_path, mode="a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields_to_save.keys())
+            if not file_exists:
+                writer.writeheader()
+            writer.writerow(fields_to_save)
@@ -1,7 +1,6 @@
-import os
-import pandas as pd
+from utils import market_store
 
-DATA_DIR = "data/market_data"
+DATA_DIR = market_store.DATA_DIR
 
 # Nosaukumu pārveidošanas vārdnīca
 column_map = {
@@ -24,32 +23,33 @@ column_map = {
     # ...
 }
 
-def standardize_csv_columns(file_path):
+def standardize_columns(symbol):
     try:
-        df = pd.read_csv(file_path)
-        original_columns = df.columns.tolist()
-
+        info = market_store.inspect(symbol, DATA_DIR)
         new_columns = [
             column_map.get(col, col.lower())  # samazina un aizvieto ja vajag
-            for col in original_columns
+            for col in info["columns"]
         ]
+        if new_columns == info["columns"]:
+            return
+
+        df = market_store.read_frame(symbol, data_dir=DATA_DIR)
         df.columns = new_columns
 
-        df.to_csv(file_path, index=False)
-        print(f"✅ Pārveidots: {file_path}")
+        path = market_store.write_frame(symbol, df, DATA_DIR)
+        print(f"✅ Pārveidots: {path}")
     except Exception as e:
-        print(f"❌ Kļūda failā {file_path}: {e}")
+        print(f"❌ Kļūda simbolam {symbol}: {e}")
 
 def main():
-    print("🔁 Standartizējam kolonnu nosaukumus CSV failos...\n")
-    if not os.path.exists(DATA_DIR):
-        print(f"❌ Mape {DATA_DIR} neeksistē.")
+    print("🔁 Standartizējam kolonnu nosaukumus tirgus datu failos...\n")
+    symbols = market_store.list_symbols(DATA_DIR)
+    if not symbols:
+        print(f"❌ Mapē {DATA_DIR} nav datu failu.")
         return
 
-    for filename in os.listdir(DATA_DIR):
-        if filename.endswith(".csv"):
-            filepath = os.path.join(DATA_DIR, filename)
-            standardize_csv_columns(filepath)
+    for symbol in symbols:
+        standardize_columns(symbol)
 
     print("\n🌟 Gatavs! Visas kolonnas standarta formātā.")
 
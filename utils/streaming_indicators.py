@@ -0,0 +1,332 @@
+"""
+Streaming Indicators Module
+---------------------------
+Stāvokli saglabājoši indikatori ar O(1) atjauninājumu uz katru aizvērto sveci:
+EMA (adjust=False un adjust=True), RSI, MACD, Bollinger joslas un ATR.
+
+Vērtības sakrīt ar utils/indicators.py batch funkcijām, ja abām padota tā pati
+sveču vēsture. Logu indikatori (RSI, BB, ATR) sakrīt vienmēr; EWM indikatori
+(EMA, MACD) ir precīzāki, jo "atceras" visu vēsturi, nevis tikai pēdējās N sveces.
+
+Pēdējā masīva svece (iespējams, vēl neaizvērta) netiek ierakstīta stāvoklī — to
+novērtē preview režīmā, tāpēc tās atkārtoti atjauninājumi stāvokli nesabojā; svece
+tiek ierakstīta tikai tad, kad masīvā parādās jaunāka svece.
+
+Pārbaude pret batch funkcijām:
+    python -m utils.streaming_indicators
+"""
+
+import math
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from modules.ohlcv_cache import get_ohlcv, timeframe_ms
+
+EPS = 1e-10
+MAX_STATES = 1000       # Maks. (simbols, timeframe) stāvokļi atmiņā (LRU)
+RESYNC_EVERY = 1000     # Logu summas pārrēķina no nulles ik pēc N atjauninājumiem (float drift)
+
+
+class RollingWindow:
+    """Slīdošais logs ar skrejošām summām: vidējais un std (ddof=1) O(1)."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.anchor = None  # Nobīde summām (mazina float precizitātes zudumu pie lielām cenām)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def _resync(self):
+        self.total = sum(v - self.anchor for v in self.values)
+        self.total_sq = sum((v - self.anchor) ** 2 for v in self.values)
+
+    def push(self, x):
+        if self.anchor is None:
+            self.anchor = x
+        if len(self.values) == self.window:
+            old = self.values[0] - self.anchor
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(x)
+        d = x - self.anchor
+        self.total += d
+        self.total_sq += d * d
+
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            self._resync()
+
+    def _sums(self, extra):
+        """(skaits, summa, kvadrātu summa) ar hipotētisku nākamo vērtību `extra`."""
+        count, total, total_sq = len(self.values), self.total, self.total_sq
+        if extra is None:
+            return count, total, total_sq
+        anchor = extra if self.anchor is None else self.anchor
+        if count == self.window:
+            old = self.values[0] - anchor
+            total -= old
+            total_sq -= old * old
+            count -= 1
+        d = extra - anchor
+        return count + 1, total + d, total_sq + d * d
+
+    def mean(self, extra=None):
+        count, total, _ = self._sums(extra)
+        if count < self.window:
+            return math.nan
+        anchor = extra if self.anchor is None else self.anchor
+        return anchor + total / count
+
+    def std(self, extra=None):
+        count, total, total_sq = self._sums(extra)
+        if count < self.window or count < 2:
+            return math.nan
+        var = (total_sq - total * total / count) / (count - 1)
+        return math.sqrt(max(var, 0.0))
+
+
+class StreamingEMA:
+    """Series.ewm(span=span, adjust=adjust).mean() ekvivalents, viena vērtība uz atjauninājumu."""
+
+    def __init__(self, span, adjust=False):
+        self.alpha = 2.0 / (span + 1.0)
+        self.decay = 1.0 - self.alpha
+        self.adjust = adjust
+        self.num = None
+        self.den = 0.0
+
+    def _next(self, x):
+        if self.num is None:
+            return (x, 1.0) if self.adjust else (x, None)
+        if self.adjust:
+            return x + self.decay * self.num, 1.0 + self.decay * self.den
+        return self.alpha * x + self.decay * self.num, None
+
+    def push(self, x):
+        self.num, self.den = self._next(x)
+
+    def value(self, extra=None):
+        num, den = self._next(extra) if extra is not None else (self.num, self.den)
+        if num is None:
+            return math.nan
+        return num / den if self.adjust else num
+
+
+class IndicatorState:
+    """Viena simbola/timeframe indikatoru stāvoklis."""
+
+    def __init__(self, rsi_period=14, bb_period=20, bb_std=2, atr_period=14,
+                 macd=(12, 26, 9), ema_spans=(50, 200)):
+        self.bb_std = bb_std
+        self.gains = RollingWindow(rsi_period)
+        self.losses = RollingWindow(rsi_period)
+        self.closes = RollingWindow(bb_period)
+        self.true_ranges = RollingWindow(atr_period)
+        self.ema_fast = StreamingEMA(macd[0])
+        self.ema_slow = StreamingEMA(macd[1])
+        self.macd_signal = StreamingEMA(macd[2])
+        # ema_50 / ema_200 kā AI features (Series.ewm(span).mean(), adjust=True)
+        self.emas = {f"ema_{span}": StreamingEMA(span, adjust=True) for span in ema_spans}
+        self.prev_close = None
+        self.last_ts = None
+        self.count = 0
+
+    def _inputs(self, high, low, close):
+        if self.prev_close is None:
+            return 0.0, 0.0, abs(high - low)
+        delta = close - self.prev_close
+        tr = max(abs(high - low), abs(high - self.prev_close), abs(low - self.prev_close))
+        return max(delta, 0.0), max(-delta, 0.0), tr
+
+    def update(self, candle):
+        """Ieraksta aizvērtu sveci [ts, open, high, low, close, volume]. O(1)."""
+        ts, _, high, low, close = (float(v) for v in candle[:5])
+        if self.last_ts is not None and ts <= self.last_ts:
+            return False
+
+        gain, loss, tr = self._inputs(high, low, close)
+        self.gains.push(gain)
+        self.losses.push(loss)
+        self.closes.push(close)
+        self.true_ranges.push(tr)
+
+        self.ema_fast.push(close)
+        self.ema_slow.push(close)
+        self.macd_signal.push(self.ema_fast.value() - self.ema_slow.value())
+        for ema in self.emas.values():
+            ema.push(close)
+
+        self.prev_close = close
+        self.last_ts = ts
+        self.count += 1
+        return True
+
+    def values(self, open_candle=None):
+        """
+        Pašreizējās indikatoru vērtības. Ja padota neaizvērtā svece, vērtības tiek
+        aprēķinātas tā, it kā tā būtu pēdējā rinda (stāvoklis netiek mainīts).
+        """
+        if open_candle is None:
+            close, extra = self.prev_close, None
+            gain = loss = tr = None
+        else:
+            _, _, high, low, close = (float(v) for v in open_candle[:5])
+            extra = close
+            gain, loss, tr = self._inputs(high, low, close)
+
+        macd = self.ema_fast.value(extra) - self.ema_slow.value(extra)
+        macd_signal = self.macd_signal.value(macd if extra is not None else None)
+
+        avg_gain = self.gains.mean(gain)
+        avg_loss = self.losses.mean(loss)
+        rsi = 100 - (100 / (1 + avg_gain / (avg_loss + EPS)))
+
+        middle = self.closes.mean(extra)
+        std = self.closes.std(extra)
+
+        result = {
+            "close": close if close is not None else math.nan,
+            "rsi": 50.0 if math.isnan(rsi) else rsi,
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "macd_hist": macd - macd_signal,
+            "bollinger_upper": middle + self.bb_std * std,
+            "bollinger_lower": middle - self.bb_std * std,
+            "bollinger_middle": middle,
+            "atr": self.true_ranges.mean(tr)
+        }
+        for name, ema in self.emas.items():
+            result[name] = ema.value(extra)
+        return result
+
+
+class StreamingIndicatorEngine:
+    """Indikatoru stāvokļi daudziem simboliem (LRU), sinhronizēti ar OHLCV masīviem."""
+
+    def __init__(self, max_states=MAX_STATES):
+        self.max_states = max_states
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"updates": 0, "rebuilds": 0}
+
+    def _state(self, symbol, timeframe):
+        key = (symbol.replace("/", ""), timeframe)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = IndicatorState()
+                self._states[key] = state
+                while len(self._states) > self.max_states:
+                    self._states.popitem(last=False)
+            else:
+                self._states.move_to_end(key)
+            return key, state
+
+    def sync(self, symbol, timeframe, ohlcv):
+        """
+        Ieraksta stāvoklī tikai jaunās aizvērtās sveces no `ohlcv` (n×6, vecākā →
+        jaunākā) un atgriež vērtības ar pēdējo sveci preview režīmā.
+        Svece skaitās aizvērta tikai tad, ja masīvā ir jaunāka svece — pēc pulksteņa
+        to noteikt nevar (OHLCV kešs var būt līdz MAX_AGE novecojis, lokālais laiks var
+        atšķirties no biržas), un daļēji veidotu sveci stāvoklī ierakstīt nedrīkst.
+        Ja starp stāvokli un masīvu ir robs, stāvoklis tiek uzbūvēts no jauna.
+        """
+        ohlcv = np.asarray(ohlcv, dtype=np.float64)
+        if len(ohlcv) == 0:
+            raise ValueError(f"Nav sveču priekš {symbol}")
+
+        tf_ms = timeframe_ms(timeframe)
+        closed, open_candle = ohlcv[:-1], ohlcv[-1]
+
+        key, state = self._state(symbol, timeframe)
+        with self._lock:
+            if state.last_ts is not None and state.last_ts + tf_ms < ohlcv[0, 0]:
+                state = IndicatorState()
+                self._states[key] = state
+                self._stats["rebuilds"] += 1
+
+            start = 0 if state.last_ts is None else int(np.searchsorted(closed[:, 0], state.last_ts, side="right"))
+            for row in closed[start:]:
+                if state.update(row):
+                    self._stats["updates"] += 1
+
+            # Pēdējā svece jau ierakstīta (piem. masīvs saīsināts) → bez dubultas preview
+            if state.last_ts is not None and open_candle[0] <= state.last_ts:
+                return state.values()
+            return state.values(open_candle)
+
+    def reset(self, symbol=None, timeframe=None):
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                self._states.pop((symbol.replace("/", ""), timeframe), None)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, states=len(self._states))
+
+
+# Procesa kopīgais engine
+engine = StreamingIndicatorEngine()
+
+
+def live_indicators(exchange, symbol, timeframe="5m", limit=100):
+    """
+    📡 Indikatori simbolam no kopīgā OHLCV keša. Pirmajā izsaukumā stāvoklis tiek
+    uzsildīts no `limit` svecēm, pēc tam katra jauna svece maksā O(1).
+    """
+    return engine.sync(symbol, timeframe, get_ohlcv(exchange, symbol, timeframe=timeframe, limit=limit))
+
+
+def _equivalence_check(n=1000, seed=42):
+    """Salīdzina streaming vērtības ar utils/indicators.py batch funkcijām katrā rindā."""
+    import pandas as pd
+    from utils.indicators import compute_rsi, compute_macd, compute_bollinger_bands, compute_atr
+
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    open_ = close * (1 + rng.normal(0, 0.003, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, n)))
+    volume = np.abs(rng.normal(1000, 300, n))
+    ts = np.arange(n, dtype=np.float64) * timeframe_ms("5m")
+    ohlcv = np.column_stack([ts, open_, high, low, close, volume])
+
+    df = pd.DataFrame(ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"])
+    expected = {"rsi": compute_rsi(df["close"]), "atr": compute_atr(df)}
+    expected["macd"], expected["macd_signal"] = compute_macd(df["close"])
+    expected["bollinger_upper"], expected["bollinger_lower"], expected["bollinger_middle"] = \
+        compute_bollinger_bands(df["close"])
+    expected["ema_50"] = df["close"].ewm(span=50).mean()
+    expected["ema_200"] = df["close"].ewm(span=200).mean()
+    expected = {name: series.to_numpy() for name, series in expected.items()}
+
+    state = IndicatorState()
+    failures = []
+    for i in range(n):
+        # Preview (neaizvērtā svece) un pēc tam ierakstīta svece dod vienu un to pašu
+        for mode, values in (("preview", state.values(ohlcv[i])), ("update", None)):
+            if values is None:
+                state.update(ohlcv[i])
+                values = state.values()
+            for name, column in expected.items():
+                a, b = values[name], column[i]
+                if not (np.isnan(a) and np.isnan(b)) and not np.isclose(a, b, rtol=1e-8, atol=1e-8):
+                    failures.append((mode, i, name, a, b))
+
+    return failures
+
+
+if __name__ == "__main__":
+    failures = _equivalence_check()
+    if failures:
+        print(f"❌ {len(failures)} nesakritības ar batch indikatoriem, piem.:")
+        for mode, i, name, a, b in failures[:10]:
+            print(f"   • [{mode}] rinda {i} {name}: streaming={a} batch={b}")
+        raise SystemExit(1)
+    print("✅ Streaming indikatori sakrīt ar batch funkcijām (RSI, MACD, BB, ATR, EMA).")
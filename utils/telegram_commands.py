@@ -11,7 +11,7 @@ import threading
 import subprocess
 
 # === 🌐 3rd-party bibliotēkas (no pip) ===
-import ccxt
+from modules.exchange_factory import get_exchange  # Kopīgs MEXC klients
 
 # === ⚙️ Konfigurācija un stāvokļa pārvaldība ===
 from config import settings
@@ -294,12 +294,7 @@ def check_telegram_commands():
                     send_reply(f"❌ Neizdevās pārtrenēt feedback modeli:\n`{e}`")
 
             elif text == "/resync":
-                import ccxt
-                exchange = ccxt.mexc({
-                    'apiKey': os.getenv("MEXC_API_KEY"),
-                    'secret': os.getenv("MEXC_API_SECRET"),
-                    'enableRateLimit': True
-                })
+                exchange = get_exchange()
 
                 # Veicam resync un nolasām cik daudz tokenu tagad ir
                 resync_tracked_tokens(exchange=exchange, test_mode=is_test_mode())
@@ -319,13 +314,8 @@ def check_telegram_commands():
                 send_reply(get_tracked_summary(test_mode=True))
     
             elif text == "/cleartracked":
-                import ccxt
                 from utils.tracking import clear_tracked_tokens
-                exchange = ccxt.mexc({
-                    'apiKey': os.getenv("MEXC_API_KEY"),
-                    'secret': os.getenv("MEXC_API_SECRET"),
-                    'enableRateLimit': True
-                })
+                exchange = get_exchange()
                 removed = clear_tracked_tokens(exchange)
                 if removed:
                     send_reply(f"🧹 Notīrīti no track: {', '.join(removed)}")
@@ -341,13 +331,8 @@ def check_telegram_commands():
                     send_reply(f"❌ Neizdevās notīrīt test datus:\n`{e}`")
         
             elif text == "/balance":
-                import ccxt
                 from utils.tracking import get_usdt_balance
-                exchange = ccxt.mexc({
-                    'apiKey': os.getenv("MEXC_API_KEY"),
-                    'secret': os.getenv("MEXC_API_SECRET"),
-                    'enableRateLimit': True
-                })
+                exchange = get_exchange()
                 send_reply(get_usdt_balance(exchange))
 
             elif text == "/cleanup":